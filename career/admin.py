@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser, StudentProfile, JobPost, Application, CompanyWiki
+from django.utils import timezone
+from .models import CustomUser, StudentProfile, JobPost, Application, CompanyWiki, OutboundEmail, ChatSession, ChatMessage
 
 
 @admin.register(CustomUser)
@@ -24,7 +25,7 @@ class StudentProfileAdmin(admin.ModelAdmin):
 
 @admin.register(JobPost)
 class JobPostAdmin(admin.ModelAdmin):
-    list_display = ['company_name', 'role', 'package_lpa', 'min_cgpa_required', 'deadline', 'is_active']
+    list_display = ['company_name', 'role', 'package_lpa', 'min_cgpa_required', 'deadline', 'application_count', 'is_active']
     list_filter = ['is_active', 'posted_at']
     search_fields = ['company_name', 'role']
     date_hierarchy = 'posted_at'
@@ -44,3 +45,31 @@ class CompanyWikiAdmin(admin.ModelAdmin):
     list_filter = ['year']
     search_fields = ['company_name']
     date_hierarchy = 'created_at'
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['subject']
+    readonly_fields = ['created_at', 'sent_at']
+    actions = ['requeue']
+
+    @admin.action(description='Requeue selected emails')
+    def requeue(self, request, queryset):
+        updated = queryset.exclude(status='sent').update(status='pending', attempts=0, next_attempt_at=timezone.now())
+        self.message_user(request, f'{updated} email(s) requeued.')
+
+
+class ChatMessageInline(admin.TabularInline):
+    model = ChatMessage
+    extra = 0
+    readonly_fields = ['role', 'content', 'created_at']
+
+
+@admin.register(ChatSession)
+class ChatSessionAdmin(admin.ModelAdmin):
+    list_display = ['user', 'created_at', 'updated_at']
+    search_fields = ['user__username']
+    readonly_fields = ['context', 'summary', 'created_at', 'updated_at']
+    inlines = [ChatMessageInline]
@@ -0,0 +1,129 @@
+"""
+Applicant analytics for the job applicants page.
+
+The status breakdown, branch distribution and CGPA histogram come from one
+aggregate over the job's applications joined to the applicants' profiles
+and grouped by branch; application velocity is a second query grouped by
+day. The result is a plain dict cached per job. Signals drop the entry
+whenever one of the job's applications is created, changes or is deleted;
+profile edits show up once it expires after JOB_ANALYTICS_CACHE_TTL.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Application, StudentProfile
+
+CGPA_BANDS = [
+    ('Below 6', None, 6),
+    ('6 - 7', 6, 7),
+    ('7 - 8', 7, 8),
+    ('8 - 9', 8, 9),
+    ('9 and above', 9, None),
+]
+NO_PROFILE = 'No profile'
+
+
+def cache_key(job_id):
+    return f'job-analytics:{job_id}'
+
+
+def invalidate(job_id):
+    cache.delete(cache_key(job_id))
+
+
+def _percent(count, total):
+    return round(count * 100 / total, 1) if total else 0
+
+
+def _cgpa_filter(low, high):
+    band = Q()
+    if low is not None:
+        band &= Q(student__profile__current_cgpa__gte=low)
+    if high is not None:
+        band &= Q(student__profile__current_cgpa__lt=high)
+    return band
+
+
+def compute_analytics(job):
+    """Status, branch, CGPA and per-day breakdowns of a job's applications"""
+    applications = Application.objects.filter(job=job).order_by()
+    statuses = [code for code, _label in Application.STATUS_CHOICES]
+
+    aggregates = {'total': Count('id')}
+    for status in statuses:
+        aggregates[f'status_{status}'] = Count('id', filter=Q(status=status))
+    for index, (_label, low, high) in enumerate(CGPA_BANDS):
+        aggregates[f'cgpa_{index}'] = Count('id', filter=_cgpa_filter(low, high))
+    rows = list(applications.values(branch=F('student__profile__branch')).annotate(**aggregates))
+
+    total = sum(row['total'] for row in rows)
+    branch_labels = dict(StudentProfile.BRANCH_CHOICES)
+    branches = sorted(
+        (
+            {
+                'code': row['branch'] or NO_PROFILE,
+                'label': branch_labels.get(row['branch'], row['branch'] or NO_PROFILE),
+                'count': row['total'],
+                'shortlisted': row['status_Shortlisted'],
+                'percent': _percent(row['total'], total),
+            }
+            for row in rows
+        ),
+        key=lambda branch: branch['count'], reverse=True,
+    )
+    status_counts = [
+        {'status': status, 'count': sum(row[f'status_{status}'] for row in rows)} for status in statuses
+    ]
+    cgpa = [
+        {'label': label, 'count': sum(row[f'cgpa_{index}'] for row in rows)}
+        for index, (label, _low, _high) in enumerate(CGPA_BANDS)
+    ]
+    for bucket in status_counts + cgpa:
+        bucket['percent'] = _percent(bucket['count'], total)
+
+    return {
+        'total': total,
+        'status': status_counts,
+        'branches': branches,
+        'cgpa': cgpa,
+        'velocity': application_velocity(job, applications),
+        'computed_at': timezone.now(),
+    }
+
+
+def application_velocity(job, applications):
+    """Applications per day since the job was posted, with gaps filled in"""
+    per_day = dict(
+        applications.annotate(day=TruncDate('applied_at')).values_list('day').annotate(count=Count('id'))
+    )
+    if not per_day:
+        return {'days': [], 'per_day': 0, 'last_7_days': 0, 'peak': None}
+
+    today = timezone.localdate()
+    first = min(min(per_day), timezone.localtime(job.posted_at).date())
+    # Up to today while the job is open, or its deadline once it has closed
+    last = max(max(per_day), min(today, timezone.localtime(job.deadline).date()))
+    days = [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
+    total = sum(per_day.values())
+    peak = max(per_day, key=per_day.get)
+    return {
+        'days': [{'day': day, 'count': per_day.get(day, 0)} for day in days],
+        'per_day': round(total / len(days), 1),
+        'last_7_days': sum(count for day, count in per_day.items() if day > today - timedelta(days=7)),
+        'peak': {'day': peak, 'count': per_day[peak]},
+    }
+
+
+def job_analytics(job):
+    """Cached analytics for a job's applicants"""
+    key = cache_key(job.pk)
+    analytics = cache.get(key)
+    if analytics is None:
+        analytics = compute_analytics(job)
+        cache.set(key, analytics, timeout=settings.JOB_ANALYTICS_CACHE_TTL)
+    return analytics
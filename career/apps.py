@@ -6,4 +6,5 @@ class CareerConfig(AppConfig):
     name = 'career'
 
     def ready(self):
+        import career.checks
         import career.signals
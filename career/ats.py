@@ -0,0 +1,239 @@
+"""
+ATS resume scanning.
+
+Builds the ATS prompt, calls the configured LLM backend and caches the
+result. Results are keyed on the resume text hash, the job description
+hash, the model name and the prompt version, so rescanning the same
+resume against the same job is answered from the cache without spending
+API quota. Bump
+ATS_PROMPT_VERSION whenever the prompt changes to invalidate old results.
+The prompt sends the most useful resume sections and the job description
+within ATS_RESUME_TOKENS / ATS_JOB_TOKENS (see prompts.py).
+
+Placement officers can also queue an ATSScanBatch that scores every
+applicant to a job from their stored resume text; run_batch() processes
+it with bounded concurrency and the run_ats_batches command drives it.
+A running batch holds a lease that each scored applicant renews, so a
+batch whose worker died is picked up again once the lease runs out.
+"""
+import hashlib
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .llm import get_backend
+from .models import Application, ATSScanBatch
+from .prompts import measured, resume_excerpt, text_excerpt
+
+logger = logging.getLogger(__name__)
+
+ATS_MODEL = 'models/gemini-2.5-flash'
+ATS_PROMPT_VERSION = 2
+
+HITS_KEY = 'ats:stats:hits'
+MISSES_KEY = 'ats:stats:misses'
+
+SCORE_RE = re.compile(r'Score:\s*\**\s*(\d{1,3})', re.IGNORECASE)
+KEYWORDS_RE = re.compile(r'Missing Keywords:\s*\**\s*(.+)', re.IGNORECASE)
+
+
+def _sha256(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def get_cache():
+    return caches[settings.ATS_CACHE_ALIAS]
+
+
+def result_cache_key(resume_text, job_description, model=ATS_MODEL, prompt_version=ATS_PROMPT_VERSION):
+    """Cache key for an ATS result; hashed so it is safe for any backend"""
+    parts = [_sha256(resume_text), _sha256(job_description), model, str(prompt_version)]
+    return 'ats:result:' + _sha256(':'.join(parts))
+
+
+ATS_TEMPLATE = """Compare this resume against the job description and provide:
+1. A match score from 0-100
+2. List exactly 3 missing keywords that would improve the match
+
+Job Description:
+{job}
+
+Resume:
+{resume}
+
+Format your response as:
+Score: [number]
+Missing Keywords: [keyword1], [keyword2], [keyword3]"""
+
+
+def build_prompt(job_description, resume_text):
+    """ATS prompt with the job and resume trimmed to their token budgets"""
+    job = text_excerpt(job_description, settings.ATS_JOB_TOKENS)
+    resume = resume_excerpt(resume_text, settings.ATS_RESUME_TOKENS)
+    return measured(
+        'ats', ATS_TEMPLATE.format(job=job.text, resume=resume.text),
+        job=job.tokens, resume=resume.tokens,
+    )
+
+
+def _count(key):
+    cache = get_cache()
+    # add() is a no-op when the counter exists; incr() is atomic on shared backends
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def cache_stats():
+    """Hit/miss counters for the ATS result cache"""
+    cache = get_cache()
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else 0.0,
+    }
+
+
+def parse_result(result_text):
+    """Extract (score, keywords) from an ATS reply; score is None if absent"""
+    score_match = SCORE_RE.search(result_text)
+    keywords_match = KEYWORDS_RE.search(result_text)
+    score = min(int(score_match.group(1)), 100) if score_match else None
+    keywords = keywords_match.group(1).strip() if keywords_match else ''
+    return score, keywords
+
+
+def _backend_key(backend, resume_text, job_description):
+    # Stub results must never be served for real scans, so the backend is part of the key
+    return result_cache_key(resume_text, job_description, model=f'{backend.name}:{ATS_MODEL}')
+
+
+def scan_resume(resume_text, job_description):
+    """Return (result_text, from_cache) for a resume against a job description"""
+    backend = get_backend()
+    cache = get_cache()
+    key = _backend_key(backend, resume_text, job_description)
+    result = cache.get(key)
+    if result is not None:
+        _count(HITS_KEY)
+        return result, True
+
+    _count(MISSES_KEY)
+    result = backend.generate(build_prompt(job_description, resume_text).text, ATS_MODEL)
+    cache.set(key, result, timeout=settings.ATS_CACHE_TTL)
+    return result, False
+
+
+async def ascan_resume(resume_text, job_description):
+    """scan_resume() for async views; awaits the LLM instead of blocking"""
+    backend = get_backend()
+    cache = get_cache()
+    key = _backend_key(backend, resume_text, job_description)
+    result = await cache.aget(key)
+    if result is not None:
+        await sync_to_async(_count)(HITS_KEY)
+        return result, True
+
+    await sync_to_async(_count)(MISSES_KEY)
+    result = await backend.agenerate(build_prompt(job_description, resume_text).text, ATS_MODEL)
+    await cache.aset(key, result, timeout=settings.ATS_CACHE_TTL)
+    return result, False
+
+
+def batch_lease():
+    """Lease expiry for a batch a worker is running now"""
+    return timezone.now() + timedelta(seconds=settings.ATS_BATCH_LEASE_SECONDS)
+
+
+def stale_running():
+    """Filter for running batches whose worker stopped renewing the lease"""
+    return Q(status='running') & (Q(lease_until__lt=timezone.now()) | Q(lease_until__isnull=True))
+
+
+def queue_batch(job, requested_by=None):
+    """Queue a bulk scan for a job, reusing any batch that is queued or still being worked on"""
+    # A batch abandoned by a dead worker would otherwise block new scans of this job
+    ATSScanBatch.objects.filter(stale_running(), job=job).update(status='failed', finished_at=timezone.now())
+    batch = ATSScanBatch.objects.filter(job=job, status__in=['queued', 'running']).first()
+    if batch is None:
+        batch = ATSScanBatch.objects.create(
+            job=job,
+            requested_by=requested_by,
+            total=Application.objects.filter(job=job).count(),
+        )
+    return batch
+
+
+def _score(resume_text, job_description):
+    result_text, _from_cache = scan_resume(resume_text, job_description)
+    return parse_result(result_text)
+
+
+def run_batch(batch):
+    """Score every application in a batch, skipping resumes already scored against this job description"""
+    # A reclaimed batch starts its counts again; applicants already scored are now skipped
+    ATSScanBatch.objects.filter(pk=batch.pk).update(
+        status='running', started_at=timezone.now(), lease_until=batch_lease(), processed=0, failed=0,
+    )
+    job = batch.job
+    job_sha256 = _sha256(job.job_description)
+    applications = list(
+        Application.objects.filter(job=job)
+        .select_related('student__profile')
+        .only('id', 'ats_score', 'ats_resume_sha256', 'ats_job_sha256', 'student',
+              'student__profile__resume_text', 'student__profile__resume_sha256')
+    )
+    ATSScanBatch.objects.filter(pk=batch.pk).update(total=len(applications))
+
+    pending = []
+    skipped = 0
+    for application in applications:
+        profile = getattr(application.student, 'profile', None)
+        if profile is None or not profile.resume_text:
+            skipped += 1
+        elif (application.ats_score is not None
+              and application.ats_resume_sha256 == profile.resume_sha256
+              and application.ats_job_sha256 == job_sha256):
+            skipped += 1
+        else:
+            pending.append((application, profile))
+    ATSScanBatch.objects.filter(pk=batch.pk).update(skipped=skipped)
+
+    # Threads only talk to the LLM and cache; all database writes stay on this thread
+    with ThreadPoolExecutor(max_workers=settings.ATS_BATCH_CONCURRENCY) as executor:
+        futures = [
+            (application, profile, executor.submit(_score, profile.resume_text, job.job_description))
+            for application, profile in pending
+        ]
+        for application, profile, future in futures:
+            try:
+                score, keywords = future.result()
+            except Exception as e:
+                logger.warning("ATS scan failed for application %s: %s", application.pk, e)
+                ATSScanBatch.objects.filter(pk=batch.pk).update(failed=F('failed') + 1, lease_until=batch_lease())
+                continue
+            # update() rather than save() so status-change emails are not triggered
+            Application.objects.filter(pk=application.pk).update(
+                ats_score=score,
+                ats_keywords=keywords[:255],
+                ats_resume_sha256=profile.resume_sha256,
+                ats_job_sha256=job_sha256,
+                ats_scanned_at=timezone.now(),
+            )
+            ATSScanBatch.objects.filter(pk=batch.pk).update(processed=F('processed') + 1, lease_until=batch_lease())
+
+    ATSScanBatch.objects.filter(pk=batch.pk).update(status='done', finished_at=timezone.now())
+    batch.refresh_from_db()
+    return batch
@@ -0,0 +1,53 @@
+"""
+Audience resolution for job notifications.
+
+Works out which students should hear about a job with a single query
+instead of loading every profile and checking eligibility in Python.
+"""
+import logging
+import time
+from dataclasses import dataclass, field
+
+from django.db.models import Q
+
+from .models import CustomUser, branches_in_mask
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Audience:
+    """Recipients for a notification and how long resolving them took"""
+    emails: list = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    def __len__(self):
+        return len(self.emails)
+
+
+def eligible_students(job):
+    """Students with a profile that satisfies the job's CGPA and branch rules"""
+    return CustomUser.objects.filter(
+        profile__current_cgpa__gte=job.min_cgpa_required,
+        profile__branch__in=branches_in_mask(job.eligible_branch_mask),
+    )
+
+
+def opted_in(users):
+    """Narrow a user queryset to those with an email who accept notifications"""
+    # Users without a preferences row are treated as opted in, as before
+    return users.exclude(email='').filter(
+        Q(preferences__isnull=True) | Q(preferences__receive_emails=True)
+    )
+
+
+def resolve_job_audience(job):
+    """Return the opted-in, eligible recipients for a new job alert"""
+    started = time.perf_counter()
+    emails = list(opted_in(eligible_students(job)).values_list('email', flat=True))
+    audience = Audience(emails=emails, elapsed_ms=(time.perf_counter() - started) * 1000)
+    logger.info(
+        "Resolved %d recipients for job %s in %.1f ms",
+        len(audience), job.pk, audience.elapsed_ms,
+    )
+    return audience
@@ -0,0 +1,182 @@
+"""
+Chat sessions and prompt construction for the UniCareer AI chatbot.
+
+Conversations are stored server-side in ChatSession/ChatMessage and the
+current session id is kept in the Django session. The student context
+system prompt is built once per chat session and cached on it; a
+StudentProfile save clears the cache (see signals.py). Only the last
+CHAT_HISTORY_MESSAGES messages are sent verbatim; older ones are folded
+into a short summary capped at CHAT_SUMMARY_MAX_CHARS, so the prompt
+stays bounded however long the conversation runs. The resume part of the
+context is limited to CHAT_RESUME_TOKENS (see prompts.py).
+
+Used by the streaming endpoint on both its WSGI and ASGI paths, so both
+send the model exactly the same prompt.
+"""
+import re
+
+from django.conf import settings
+
+from .models import ChatMessage, ChatSession, StudentProfile
+from .prompts import count_tokens, measured, resume_excerpt
+from .resume import cached_resume_text
+
+CHAT_MODEL = 'models/gemini-2.5-flash'
+SESSION_KEY = 'chat_session_id'
+
+# Longest recent message quoted verbatim, and longest line per summarised message
+RECENT_MESSAGE_CHARS = 1000
+SUMMARY_LINE_CHARS = 160
+
+SPEAKERS = {'user': 'User', 'assistant': 'Assistant'}
+
+
+def build_student_context(user):
+    """Profile and resume summary for a student; empty for other roles"""
+    if user.role != 'student':
+        return ""
+    try:
+        profile = user.profile
+    except StudentProfile.DoesNotExist:
+        return f"Student Name: {user.username} (Profile incomplete)"
+
+    # The most useful sections of the resume text extracted when it was saved
+    resume_text = "Not available"
+    if profile.resume:
+        text = cached_resume_text(profile)
+        if text:
+            resume_text = resume_excerpt(text, settings.CHAT_RESUME_TOKENS).text or resume_text
+
+    return f"""Student Profile Context:
+- Name: {user.username}
+- Branch: {profile.get_branch_display()}
+- CGPA: {profile.current_cgpa}
+- Backlogs: {profile.backlogs}
+- Skills: {profile.skills}
+- Resume Content:
+{resume_text}"""
+
+
+def build_system_prompt(user):
+    """System instructions for the career mentor persona"""
+    student_context = build_student_context(user)
+    profile = getattr(user, 'profile', None) if user.role == 'student' else None
+    return f"""You are UniCareer AI, an expert career mentor and placement assistant dedicated to helping university students succeed in their career journey on the UniCareer portal.
+
+{student_context}
+
+Your Core Responsibilities:
+1. **Personalized Guidance**: Use the student's profile (Branch, CGPA, Skills) to give specific advice.
+ - If CGPA is low (< 7.0), suggest ways to compensate with projects/skills.
+ - If they have backlogs, advise on clearing them before placement season.
+ - Suggest roles relevant to their branch ({profile.branch if profile else 'their field'}).
+2. **Resume & Profile Optimization**: Provide actionable advice to make resumes ATS-friendly. Suggest strong action verbs and keywords for specific roles.
+3. **Internship & Job Strategy**: Guide students on how to prepare for internships and placements.
+4. **Interview Preparation**: Offer tips for Technical, HR, and Managerial rounds. Explain the STAR method for behavioral questions.
+5. **Portal Navigation**: Encourage them to use UniCareer features like the 'ATS Scanner' for resume checks and 'Company Wiki' for past interview experiences.
+
+**Tone & Style:**
+- Professional, motivating, and student-friendly.
+- Address the student by name if possible.
+- Use clear formatting (bullet points, bold text) for readability."""
+
+
+def get_session(request):
+    """The user's current chat session, started on first use"""
+    session_id = request.session.get(SESSION_KEY)
+    chat = None
+    if session_id:
+        chat = ChatSession.objects.filter(pk=session_id, user=request.user).first()
+    if chat is None:
+        chat = ChatSession.objects.create(user=request.user)
+        request.session[SESSION_KEY] = chat.pk
+    return chat
+
+
+def end_session(request):
+    """Start a fresh conversation on the next message"""
+    request.session.pop(SESSION_KEY, None)
+
+
+def session_history(request):
+    """Messages of the current chat session, oldest first, for redisplay"""
+    session_id = request.session.get(SESSION_KEY)
+    if not session_id:
+        return []
+    return list(
+        ChatMessage.objects.filter(session_id=session_id, session__user=request.user)
+        .values('role', 'content')
+    )
+
+
+def session_context(chat):
+    """The session's cached system prompt, rebuilt if the profile changed"""
+    if not chat.context:
+        chat.context = build_system_prompt(chat.user)
+        # update() so the cache write does not count as chat activity
+        ChatSession.objects.filter(pk=chat.pk).update(context=chat.context)
+    return chat.context
+
+
+def _clip(text, limit):
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text if len(text) <= limit else text[:limit - 3].rstrip() + '...'
+
+
+def build_session_prompt(chat, user_message):
+    """Prompt for the next turn: context, summary, recent messages, new message"""
+    context = session_context(chat)
+    parts = [context]
+    if chat.summary:
+        parts.append("Summary of the earlier conversation:\n" + chat.summary)
+    recent = "\n".join(
+        f"{SPEAKERS[message.role]}: {_clip(message.content, RECENT_MESSAGE_CHARS)}"
+        for message in chat.messages.all()
+    )
+    if recent:
+        parts.append("Recent conversation:\n" + recent)
+    parts.append("User: " + user_message)
+    return measured(
+        'chat', "\n\n".join(parts),
+        context=count_tokens(context), summary=count_tokens(chat.summary), recent=count_tokens(recent),
+    ).text
+
+
+def prepare_turn(request, user_message):
+    """Returns (chat, prompt) for a new user message"""
+    chat = get_session(request)
+    return chat, build_session_prompt(chat, user_message)
+
+
+def summarise_message(message):
+    label = 'Student asked' if message.role == 'user' else 'You answered'
+    return f"- {label}: {_clip(message.content, SUMMARY_LINE_CHARS)}"
+
+
+def compact_history(chat):
+    """Fold messages beyond the recent window into the summary and delete them"""
+    messages = list(chat.messages.all())
+    overflow = len(messages) - settings.CHAT_HISTORY_MESSAGES
+    if overflow <= 0:
+        return
+    folded = messages[:overflow]
+    lines = (chat.summary.splitlines() if chat.summary else []) + [summarise_message(m) for m in folded]
+    # Keep the newest lines that fit the summary budget
+    kept, size = [], 0
+    for line in reversed(lines):
+        size += len(line) + 1
+        if size > settings.CHAT_SUMMARY_MAX_CHARS:
+            break
+        kept.append(line)
+    chat.summary = "\n".join(reversed(kept))
+    ChatMessage.objects.filter(pk__in=[m.pk for m in folded]).delete()
+
+
+def record_turn(chat, user_message, reply):
+    """Store a completed exchange and keep the history bounded"""
+    ChatMessage.objects.bulk_create([
+        ChatMessage(session=chat, role='user', content=user_message),
+        ChatMessage(session=chat, role='assistant', content=reply),
+    ])
+    compact_history(chat)
+    chat.save(update_fields=['summary', 'updated_at'])
@@ -0,0 +1,22 @@
+"""
+System checks for settings the app cannot work correctly without.
+"""
+from django.conf import settings
+from django.core.checks import Error, register
+
+PER_PROCESS_CACHES = ['django.core.cache.backends.locmem.LocMemCache']
+
+
+@register()
+def check_page_cache_shared(app_configs, **kwargs):
+    """Cached page fragments need a cache that every worker process shares"""
+    backend = settings.CACHES['default']['BACKEND']
+    if settings.PAGE_CACHE_TTL and settings.WEB_CONCURRENCY > 1 and backend in PER_PROCESS_CACHES:
+        return [Error(
+            f"Page caching is enabled with {settings.WEB_CONCURRENCY} worker processes on a per-process cache, "
+            "so a worker keeps serving fragments another worker has invalidated.",
+            hint="Set CACHE_URL to a shared cache (redis://host:6379/0, or file:///path on one host), "
+                 "run a single worker, or set PAGE_CACHE_TTL=0.",
+            id='career.E001',
+        )]
+    return []
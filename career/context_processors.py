@@ -0,0 +1,30 @@
+"""
+Template context shared by every page.
+
+The user's theme is kept in the session: it is read once at login (and
+whenever the preferences page changes it), so base.html renders without a
+preferences query on each request.
+"""
+from .models import UserPreference
+
+THEME_SESSION_KEY = 'theme'
+DEFAULT_THEME = 'light'
+
+
+def remember_theme(request, user):
+    """Load the user's theme into the session and return it"""
+    theme = UserPreference.objects.filter(user=user).values_list('theme', flat=True).first() or DEFAULT_THEME
+    request.session[THEME_SESSION_KEY] = theme
+    return theme
+
+
+def theme(request):
+    """The current user's theme for base.html"""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {'theme': DEFAULT_THEME}
+    theme = request.session.get(THEME_SESSION_KEY)
+    if theme is None:
+        # Sessions started before the theme was stored there
+        theme = remember_theme(request, user)
+    return {'theme': theme}
@@ -0,0 +1,131 @@
+"""
+Denormalised counters for the admin dashboard and per-job applicant counts.
+
+Signals call these as jobs and applications are created, change status or
+active flag, and are deleted. Each change is one UPDATE with F()
+expressions, so concurrent requests add to the stored value instead of
+overwriting each other. Bulk operations (queryset.update(), bulk_create())
+bypass signals; the repair_counters management command recounts from the
+underlying rows and fixes any drift.
+"""
+import logging
+from dataclasses import dataclass, field
+
+from django.db.models import Count, F, Q
+
+from .models import Application, JobPost, PlacementTotals
+
+logger = logging.getLogger(__name__)
+
+TOTALS_PK = 1
+
+STATUS_COUNTERS = {
+    'Applied': 'applied_count',
+    'Shortlisted': 'shortlisted_count',
+    'Rejected': 'rejected_count',
+}
+JOB_COUNTERS = list(JobPost.COUNTER_FIELDS)
+
+
+def _bump(queryset, **deltas):
+    """Add each delta to its field in a single UPDATE; returns rows updated"""
+    changes = {name: F(name) + delta for name, delta in deltas.items() if delta}
+    return queryset.update(**changes) if changes else 0
+
+
+def _bump_totals(**deltas):
+    if not _bump(PlacementTotals.objects.filter(pk=TOTALS_PK), **deltas):
+        # No totals row yet: count everything once rather than start from zero
+        recount_totals()
+
+
+def totals():
+    """The site-wide totals row"""
+    try:
+        return PlacementTotals.objects.get(pk=TOTALS_PK)
+    except PlacementTotals.DoesNotExist:
+        return recount_totals()
+
+
+def add_application(job_id, status, delta=1):
+    """Count a new application, or uncount a deleted one with delta=-1"""
+    deltas = {'application_count': delta}
+    if status in STATUS_COUNTERS:
+        deltas[STATUS_COUNTERS[status]] = delta
+    _bump(JobPost.objects.filter(pk=job_id), **deltas)
+    _bump_totals(applications=delta)
+
+
+def move_application(job_id, old_status, new_status):
+    """Move an application from its old status count to the new one"""
+    deltas = {}
+    if old_status in STATUS_COUNTERS:
+        deltas[STATUS_COUNTERS[old_status]] = -1
+    if new_status in STATUS_COUNTERS:
+        deltas[STATUS_COUNTERS[new_status]] = 1
+    _bump(JobPost.objects.filter(pk=job_id), **deltas)
+
+
+def add_job(is_active, delta=1):
+    """Count a new job, or uncount a deleted one with delta=-1"""
+    _bump_totals(jobs=delta, active_jobs=delta if is_active else 0)
+
+
+def set_job_active(is_active):
+    """Count a job that was activated or deactivated"""
+    _bump_totals(active_jobs=1 if is_active else -1)
+
+
+def recount_totals():
+    """Recount the site-wide totals from the jobs and applications tables"""
+    counts = JobPost.objects.aggregate(jobs=Count('id'), active_jobs=Count('id', filter=Q(is_active=True)))
+    counts['applications'] = Application.objects.count()
+    placement_totals, _created = PlacementTotals.objects.update_or_create(pk=TOTALS_PK, defaults=counts)
+    return placement_totals
+
+
+@dataclass
+class RepairReport:
+    """What repair_counters found and fixed"""
+    jobs_checked: int = 0
+    jobs_fixed: list = field(default_factory=list)
+    totals_fixed: bool = False
+
+
+def repair_counters(batch_size=500):
+    """Recount every job's applicant counts and the totals, saving only the ones that drifted"""
+    report = RepairReport()
+    recounts = {
+        'real_application_count': Count('applications'),
+        **{
+            f'real_{name}': Count('applications', filter=Q(applications__status=status))
+            for status, name in STATUS_COUNTERS.items()
+        },
+    }
+    drifted = []
+    jobs = JobPost.objects.order_by().annotate(**recounts).only('id', *JOB_COUNTERS)
+    for job in jobs.iterator(chunk_size=batch_size):
+        report.jobs_checked += 1
+        stale = [name for name in JOB_COUNTERS if getattr(job, name) != getattr(job, f'real_{name}')]
+        if stale:
+            for name in stale:
+                setattr(job, name, getattr(job, f'real_{name}'))
+            drifted.append(job)
+            report.jobs_fixed.append(job.pk)
+        if len(drifted) >= batch_size:
+            JobPost.objects.bulk_update(drifted, JOB_COUNTERS)
+            drifted = []
+    if drifted:
+        JobPost.objects.bulk_update(drifted, JOB_COUNTERS)
+
+    before = PlacementTotals.objects.filter(pk=TOTALS_PK).values('jobs', 'active_jobs', 'applications').first()
+    after = recount_totals()
+    report.totals_fixed = before != {
+        'jobs': after.jobs, 'active_jobs': after.active_jobs, 'applications': after.applications,
+    }
+    if report.jobs_fixed or report.totals_fixed:
+        logger.warning(
+            "Repaired counters for %d jobs%s", len(report.jobs_fixed),
+            " and the site-wide totals" if report.totals_fixed else "",
+        )
+    return report
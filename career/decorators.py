@@ -1,35 +1,66 @@
+import asyncio
 from functools import wraps
+from asgiref.sync import sync_to_async
 from django.shortcuts import redirect
 from django.contrib import messages
+from django.contrib.auth.views import redirect_to_login
 
 
-def admin_required(view_func):
-    """Decorator to restrict view to admin users only"""
+def _gate(view_func, check):
+    """Wrap a sync or async view so `check(request)` runs first
+
+    `check` returns a response to short-circuit the view, or None to let it
+    run. It may touch the session and database, so for async views it runs
+    in a worker thread.
+    """
+    if asyncio.iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            denied = await sync_to_async(check)(request)
+            if denied is not None:
+                return denied
+            return await view_func(request, *args, **kwargs)
+        return async_wrapper
+
     @wraps(view_func)
     def wrapper(request, *args, **kwargs):
-        if not request.user.is_authenticated:
-            messages.error(request, "Please login to access this page.")
-            return redirect('login')
-        
-        if request.user.role != 'admin':
-            messages.error(request, "You don't have permission to access this page.")
-            return redirect('dashboard')
-        
+        denied = check(request)
+        if denied is not None:
+            return denied
         return view_func(request, *args, **kwargs)
     return wrapper
 
 
-def student_required(view_func):
-    """Decorator to restrict view to student users only"""
-    @wraps(view_func)
-    def wrapper(request, *args, **kwargs):
+def _role_check(role):
+    def check(request):
         if not request.user.is_authenticated:
             messages.error(request, "Please login to access this page.")
             return redirect('login')
-        
-        if request.user.role != 'student':
+
+        if request.user.role != role:
             messages.error(request, "You don't have permission to access this page.")
             return redirect('dashboard')
-        
-        return view_func(request, *args, **kwargs)
-    return wrapper
+
+        return None
+    return check
+
+
+def _login_check(request):
+    if not request.user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+    return None
+
+
+def admin_required(view_func):
+    """Decorator to restrict view to admin users only"""
+    return _gate(view_func, _role_check('admin'))
+
+
+def student_required(view_func):
+    """Decorator to restrict view to student users only"""
+    return _gate(view_func, _role_check('student'))
+
+
+def async_login_required(view_func):
+    """login_required that also wraps async views (Django 4.2's only wraps sync ones)"""
+    return _gate(view_func, _login_check)
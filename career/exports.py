@@ -0,0 +1,248 @@
+"""
+Applicant exports: one job's CSV as a download, or many jobs to a file.
+
+Rows are read with values_list(), so only the exported columns are
+fetched and no model instances are built, and are formatted by csv.writer
+into a pseudo-buffer that hands each chunk straight to the response. A
+StreamingHttpResponse sends the header as soon as the first chunk is
+ready and memory stays flat however many applicants a job has.
+
+On a database with server-side cursors, QuerySet.iterator() streams the
+rows. With DISABLE_SERVER_SIDE_CURSORS (Postgres behind PgBouncer in
+transaction mode) iterator() would pull the whole result set into the
+client, so rows are fetched in keyset-paginated chunks instead, each a range
+scan on app_job_applied_idx (job, -applied_at, -id).
+
+Exports across many jobs (ExportJob) run in the run_exports worker, which
+streams the same chunks into a ZIP of per-job CSVs or one combined CSV or
+XLSX file under MEDIA_ROOT and records progress after each job. A running
+export holds a lease that each finished job renews, so an export whose
+worker died is started over by the next worker once the lease runs out.
+"""
+import csv
+import io
+import logging
+import os
+import re
+import tempfile
+import zipfile
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+from openpyxl import Workbook
+
+from .models import Application, ExportJob, JobPost
+
+logger = logging.getLogger(__name__)
+
+# (CSV header, Application field path)
+APPLICANT_COLUMNS = [
+    ('Username', 'student__username'),
+    ('Email', 'student__email'),
+    ('Branch', 'student__profile__branch'),
+    ('CGPA', 'student__profile__current_cgpa'),
+    ('Backlogs', 'student__profile__backlogs'),
+    ('Skills', 'student__profile__skills'),
+    ('LinkedIn', 'student__profile__linkedin_url'),
+    ('Status', 'status'),
+    ('Applied At', 'applied_at'),
+]
+APPLIED_AT = len(APPLICANT_COLUMNS) - 1
+
+
+class Echo:
+    """File-like object whose write() returns the value, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def uses_server_side_cursors(queryset):
+    connection = connections[queryset.db]
+    return connection.vendor == 'postgresql' and not connection.settings_dict.get('DISABLE_SERVER_SIDE_CURSORS')
+
+
+def iter_chunks(queryset, fields, chunk_size):
+    """Lists of value tuples for `fields`, newest application first, `chunk_size` rows at a time"""
+    queryset = queryset.order_by('-applied_at', '-id')
+    if uses_server_side_cursors(queryset):
+        chunk = []
+        for row in queryset.values_list(*fields).iterator(chunk_size=chunk_size):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+        return
+
+    # Seek past the last (applied_at, id) of each chunk; the trailing id is dropped from the rows
+    rows = queryset.values_list(*fields, 'id')
+    position = Q()
+    while True:
+        chunk = list(rows.filter(position)[:chunk_size])
+        if chunk:
+            yield [row[:-1] for row in chunk]
+        if len(chunk) < chunk_size:
+            return
+        last = chunk[-1]
+        applied_at, pk = last[fields.index('applied_at')], last[-1]
+        position = Q(applied_at__lt=applied_at) | Q(applied_at=applied_at, id__lt=pk)
+
+
+def _applicant_row(row):
+    row = ['' if value is None else value for value in row]
+    row[APPLIED_AT] = row[APPLIED_AT].strftime('%Y-%m-%d %H:%M:%S')
+    return row
+
+
+def applicant_rows(job, chunk_size=None):
+    """Chunks of CSV rows (without the header) for a job's applicants, newest first"""
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    fields = [path for _header, path in APPLICANT_COLUMNS]
+    for chunk in iter_chunks(Application.objects.filter(job=job), fields, chunk_size):
+        yield [_applicant_row(row) for row in chunk]
+
+
+def ranked_applicant_rows(job, applications):
+    """Chunk of CSV rows for applications already ranked by rank_applications()"""
+    rows = []
+    for application in applications:
+        profile = application.student.profile
+        rows.append([
+            application.student.username,
+            application.student.email,
+            profile.branch,
+            profile.current_cgpa,
+            profile.backlogs,
+            profile.skills,
+            profile.linkedin_url or '',
+            application.status,
+            application.applied_at.strftime('%Y-%m-%d %H:%M:%S'),
+            application.match_score,
+        ])
+    yield rows
+
+
+def csv_stream(header, chunks):
+    """Encode the header and each chunk of rows as CSV text, one piece per chunk"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for rows in chunks:
+        yield ''.join(writer.writerow(row) for row in rows)
+
+
+def export_jobs(export):
+    """Jobs an ExportJob covers, oldest posting first"""
+    jobs = JobPost.objects.order_by('posted_at', 'id')
+    if export.posted_from:
+        jobs = jobs.filter(posted_at__gte=timezone.make_aware(datetime.combine(export.posted_from, time.min)))
+    if export.posted_to:
+        jobs = jobs.filter(posted_at__lte=timezone.make_aware(datetime.combine(export.posted_to, time.max)))
+    if export.company:
+        jobs = jobs.filter(company_name__icontains=export.company)
+    return jobs
+
+
+def _slug(text):
+    return re.sub(r'[^A-Za-z0-9]+', '_', text).strip('_') or 'job'
+
+
+def export_lease():
+    """Lease expiry for an export a worker is running now"""
+    return timezone.now() + timedelta(seconds=settings.EXPORT_LEASE_SECONDS)
+
+
+def stale_running():
+    """Filter for running exports whose worker stopped renewing the lease"""
+    return Q(status='running') & (Q(lease_until__lt=timezone.now()) | Q(lease_until__isnull=True))
+
+
+def _progress(export, rows):
+    ExportJob.objects.filter(pk=export.pk).update(
+        processed_jobs=export.processed_jobs + 1, rows_written=export.rows_written + rows,
+        lease_until=export_lease(),
+    )
+    export.processed_jobs += 1
+    export.rows_written += rows
+
+
+def _write_zip(export, jobs, handle):
+    header = [title for title, _path in APPLICANT_COLUMNS]
+    with zipfile.ZipFile(handle, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for job in jobs:
+            rows = 0
+            name = f'{job.pk}_{_slug(job.company_name)}_{_slug(job.role)}.csv'
+            with archive.open(name, 'w', force_zip64=True) as entry:
+                text = io.TextIOWrapper(entry, encoding='utf-8', newline='')
+                writer = csv.writer(text)
+                writer.writerow(header)
+                for chunk in applicant_rows(job):
+                    writer.writerows(chunk)
+                    rows += len(chunk)
+                text.flush()
+                text.detach()
+            _progress(export, rows)
+
+
+def _combined_rows(export, jobs):
+    """Chunks of rows across jobs, each prefixed with its job's company and role"""
+    for job in jobs:
+        rows = 0
+        for chunk in applicant_rows(job):
+            yield [[job.company_name, job.role, *row] for row in chunk]
+            rows += len(chunk)
+        _progress(export, rows)
+
+
+def _write_csv(export, jobs, handle):
+    text = io.TextIOWrapper(handle, encoding='utf-8', newline='')
+    writer = csv.writer(text)
+    writer.writerow(['Company', 'Role', *(title for title, _path in APPLICANT_COLUMNS)])
+    for chunk in _combined_rows(export, jobs):
+        writer.writerows(chunk)
+    text.flush()
+    text.detach()
+
+
+def _write_xlsx(export, jobs, handle):
+    # Write-only mode keeps one row in memory at a time
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Applicants')
+    sheet.append(['Company', 'Role', *(title for title, _path in APPLICANT_COLUMNS)])
+    for chunk in _combined_rows(export, jobs):
+        for row in chunk:
+            sheet.append(row)
+    workbook.save(handle)
+
+
+WRITERS = {'zip': _write_zip, 'csv': _write_csv, 'xlsx': _write_xlsx}
+
+
+def run_export(export):
+    """Write an ExportJob's file under MEDIA_ROOT and mark it done"""
+    jobs = export_jobs(export)
+    export.total_jobs = jobs.count()
+    export.processed_jobs = export.rows_written = 0
+    export.started_at = timezone.now()
+    export.lease_until = export_lease()
+    export.save(update_fields=['total_jobs', 'processed_jobs', 'rows_written', 'started_at', 'lease_until'])
+
+    stamp = timezone.localtime(export.started_at).strftime('%Y%m%d_%H%M')
+    filename = f'applicants_{stamp}.{export.format}'
+    # Spool to a temporary file next to MEDIA_ROOT, then hand it to the storage backend
+    os.makedirs(settings.MEDIA_ROOT, exist_ok=True)
+    with tempfile.TemporaryFile(dir=settings.MEDIA_ROOT) as handle:
+        WRITERS[export.format](export, jobs.iterator(), handle)
+        handle.seek(0)
+        export.file.save(filename, File(handle), save=False)
+
+    export.status = 'done'
+    export.finished_at = timezone.now()
+    export.save(update_fields=['file', 'status', 'finished_at'])
+    logger.info("Export %s: %d rows from %d jobs", export.pk, export.rows_written, export.processed_jobs)
+    return export
@@ -1,6 +1,8 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
-from .models import CustomUser, StudentProfile, JobPost, Application, CompanyWiki, JobUpdate, UserPreference
+from .models import CustomUser, StudentProfile, JobPost, Application, CompanyWiki, JobUpdate, UserPreference, ExportJob
+from django.core.files.uploadedfile import UploadedFile
+from .resume import ResumeParseError, file_sha256, parse_resume, refresh_resume_text
 
 
 class StudentRegistrationForm(UserCreationForm):
@@ -31,6 +33,30 @@ class StudentProfileForm(forms.ModelForm):
             'backlogs': forms.NumberInput(attrs={'min': '0'}),
         }
 
+    def clean_resume(self):
+        resume = self.cleaned_data.get('resume')
+        self.parsed_resume = None
+        if isinstance(resume, UploadedFile) and file_sha256(resume) != self.instance.resume_sha256:
+            # Parse up front so oversized or broken PDFs are reported on the form
+            try:
+                self.parsed_resume = parse_resume(resume)
+            except ResumeParseError as e:
+                raise forms.ValidationError(e.message, code=e.code)
+        return resume
+
+    def save(self, commit=True):
+        profile = super().save(commit=False)
+        # Extract resume text once per new file rather than on every AI request
+        if 'resume' in self.changed_data:
+            uploaded = self.cleaned_data.get('resume')
+            if isinstance(uploaded, UploadedFile):
+                refresh_resume_text(profile, uploaded, self.parsed_resume)
+            else:
+                refresh_resume_text(profile)
+        if commit:
+            profile.save()
+        return profile
+
 
 class JobPostForm(forms.ModelForm):
     """Form for creating/editing job posts"""
@@ -46,6 +72,23 @@ class JobPostForm(forms.ModelForm):
             'min_cgpa_required': forms.NumberInput(attrs={'step': '0.01', 'min': '0', 'max': '10'}),
         }
 
+    def clean_eligible_branches(self):
+        """Normalise branch codes so they map onto the eligibility bitmask"""
+        valid_codes = [code for code, _label in StudentProfile.BRANCH_CHOICES]
+        branches = []
+        for branch in self.cleaned_data['eligible_branches'].split(','):
+            branch = branch.strip().upper()
+            if not branch or branch in branches:
+                continue
+            if branch not in valid_codes:
+                raise forms.ValidationError(
+                    f"Unknown branch code '{branch}'. Valid codes are: {', '.join(valid_codes)}."
+                )
+            branches.append(branch)
+        if not branches:
+            raise forms.ValidationError("Enter at least one branch code.")
+        return ','.join(branches)
+
 
 class ApplicationStatusForm(forms.ModelForm):
     """Form for updating application status"""
@@ -70,11 +113,69 @@ class ResumeUploadForm(forms.Form):
     """Form for uploading resume for ATS scan"""
     resume = forms.FileField(
         label='Upload Resume (PDF)',
-        help_text='Upload your resume in PDF format for ATS scanning',
+        required=False,
+        help_text='Upload your resume in PDF format for ATS scanning, or leave empty to use your profile resume',
         widget=forms.FileInput(attrs={'accept': '.pdf'})
     )
 
 
+class JobSearchForm(forms.Form):
+    """Filters for the student job search"""
+    SORT_CHOICES = [
+        ('deadline', 'Deadline (soonest first)'),
+        ('package', 'Package (highest first)'),
+        ('newest', 'Newest first'),
+    ]
+
+    q = forms.CharField(required=False, max_length=200, label='Keywords',
+                        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Role, company or skills'}))
+    company = forms.CharField(required=False, max_length=200,
+                              widget=forms.TextInput(attrs={'class': 'form-control'}))
+    min_package = forms.FloatField(required=False, min_value=0, label='Min package (LPA)',
+                                   widget=forms.NumberInput(attrs={'class': 'form-control', 'step': '0.5'}))
+    max_package = forms.FloatField(required=False, min_value=0, label='Max package (LPA)',
+                                   widget=forms.NumberInput(attrs={'class': 'form-control', 'step': '0.5'}))
+    branch = forms.ChoiceField(required=False, choices=[('', 'Any branch')] + StudentProfile.BRANCH_CHOICES,
+                               widget=forms.Select(attrs={'class': 'form-select'}))
+    deadline_after = forms.DateField(required=False, label='Deadline from',
+                                     widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}))
+    deadline_before = forms.DateField(required=False, label='Deadline to',
+                                      widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}))
+    eligible_only = forms.BooleanField(required=False, label='Only jobs I am eligible for',
+                                       widget=forms.CheckboxInput(attrs={'class': 'form-check-input'}))
+    sort = forms.ChoiceField(required=False, choices=SORT_CHOICES,
+                             widget=forms.Select(attrs={'class': 'form-select'}))
+    cursor = forms.CharField(required=False, widget=forms.HiddenInput)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        low, high = cleaned_data.get('min_package'), cleaned_data.get('max_package')
+        if low is not None and high is not None and low > high:
+            raise forms.ValidationError('Min package cannot be more than max package.')
+        cleaned_data['sort'] = cleaned_data.get('sort') or 'deadline'
+        return cleaned_data
+
+
+class ExportJobForm(forms.ModelForm):
+    """Filters and format for a multi-job applicant export"""
+    class Meta:
+        model = ExportJob
+        fields = ['format', 'posted_from', 'posted_to', 'company']
+        widgets = {
+            'format': forms.Select(attrs={'class': 'form-select'}),
+            'posted_from': forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
+            'posted_to': forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
+            'company': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'All companies'}),
+        }
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start, end = cleaned_data.get('posted_from'), cleaned_data.get('posted_to')
+        if start and end and start > end:
+            raise forms.ValidationError('Posted from cannot be after posted to.')
+        return cleaned_data
+
+
 class JobUpdateForm(forms.ModelForm):
     """Form for posting job updates"""
     class Meta:
@@ -0,0 +1,225 @@
+"""
+Bulk CSV import of students and job postings.
+
+Each row is validated with the same forms as the registration and job
+pages, then valid rows are inserted with bulk_create, IMPORT_BATCH_SIZE
+at a time and each batch in its own transaction. bulk_create sends no
+post_save signals, so nothing runs per row: students get their
+UserPreference rows in the same batch, and once all jobs are in, the
+site totals, job search index and season company summaries are refreshed
+and optionally one digest email per eligible student is queued instead
+of one alert per job. New students and jobs have no applications, so the
+applicant counters, branch summaries and analytics are unaffected.
+
+Username uniqueness is checked with one query per batch rather than per
+row. Password hashing dominates a student import; the PBKDF2 hasher
+releases the GIL, so passwords are hashed in a thread pool.
+"""
+import csv
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+
+from . import counters, page_cache, seasons
+from .audience import resolve_job_audience
+from .forms import JobPostForm, StudentProfileForm, StudentRegistrationForm
+from .models import CustomUser, JobPost, OutboundEmail, StudentProfile, UserPreference, branch_mask
+from .search import JOB_INDEX, get_index
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ImportReport:
+    """Rows created and (line number, message) for each row skipped"""
+    created: list = field(default_factory=list)
+    errors: list = field(default_factory=list)
+
+    def error(self, line, message):
+        self.errors.append((line, message))
+
+
+class StudentImportForm(StudentRegistrationForm):
+    """Registration rules for one CSV row; usernames are checked per batch in import_students()"""
+
+    def clean_username(self):
+        return self.cleaned_data.get('username')
+
+    def validate_unique(self):
+        pass
+
+
+def read_rows(handle):
+    """(line number, row) for each CSV row, with lower-case column names and stripped values"""
+    reader = csv.DictReader(handle)
+    for row in reader:
+        yield reader.line_num, {
+            (key or '').strip().lower(): (value or '').strip() for key, value in row.items()
+        }
+
+
+def batched(rows, size):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def form_errors(*forms):
+    return '; '.join(
+        f"{name}: {' '.join(messages)}" for form in forms for name, messages in form.errors.items()
+    )
+
+
+def validate_student(row):
+    """(user, profile, password) for a valid row, or raise ValueError with the form errors"""
+    password = row.get('password', '')
+    user_form = StudentImportForm({**row, 'password1': password, 'password2': password})
+    # A missing or blank backlogs means none, the model default
+    profile_form = StudentProfileForm({**row, 'backlogs': row.get('backlogs') or '0'})
+    # Validate both forms so every problem with the row is reported at once
+    if not (user_form.is_valid() & profile_form.is_valid()):
+        raise ValueError(form_errors(user_form, profile_form))
+    user = CustomUser(username=user_form.cleaned_data['username'], email=user_form.cleaned_data['email'], role='student')
+    return user, profile_form.save(commit=False), password
+
+
+def _hash_passwords(passwords, workers):
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(make_password, passwords))
+
+
+def import_students(rows, batch_size=None, hash_workers=None, dry_run=False):
+    """Create a student account, profile and preferences for each valid row"""
+    report = ImportReport()
+    seen = set()
+    for batch in batched(rows, batch_size or settings.IMPORT_BATCH_SIZE):
+        valid = []
+        for line, row in batch:
+            try:
+                user, profile, password = validate_student(row)
+            except ValueError as e:
+                report.error(line, str(e))
+                continue
+            if user.username.lower() in seen:
+                report.error(line, f"username: {user.username} appears earlier in the file.")
+                continue
+            seen.add(user.username.lower())
+            valid.append((line, user, profile, password))
+
+        taken = set(
+            CustomUser.objects.annotate(name=Lower('username'))
+            .filter(name__in=[user.username.lower() for _line, user, _profile, _password in valid])
+            .values_list('name', flat=True)
+        )
+        for line, user, _profile, _password in valid:
+            if user.username.lower() in taken:
+                report.error(line, f"username: A user with username {user.username} already exists.")
+        valid = [entry for entry in valid if entry[1].username.lower() not in taken]
+        if dry_run or not valid:
+            report.created.extend(user for _line, user, _profile, _password in valid)
+            continue
+
+        hashes = _hash_passwords([password for *_rest, password in valid], hash_workers)
+        for (_line, user, _profile, _password), hashed in zip(valid, hashes):
+            user.password = hashed
+        try:
+            with transaction.atomic():
+                users = CustomUser.objects.bulk_create([user for _line, user, _profile, _password in valid])
+                profiles = []
+                for user, (_line, _user, profile, _password) in zip(users, valid):
+                    profile.user = user
+                    profiles.append(profile)
+                StudentProfile.objects.bulk_create(profiles)
+                UserPreference.objects.bulk_create(UserPreference(user=user) for user in users)
+        except IntegrityError as e:
+            # Someone registered one of these usernames since the check above
+            for line, *_rest in valid:
+                report.error(line, f"batch not imported: {e}")
+            continue
+        report.created.extend(users)
+    report.errors.sort()
+    return report
+
+
+def validate_job(row):
+    """An unsaved JobPost for a valid row, or raise ValueError with the form errors"""
+    # A missing or blank is_active means active, the model default
+    form = JobPostForm({**row, 'is_active': row.get('is_active') or 'true'})
+    if not form.is_valid():
+        raise ValueError(form_errors(form))
+    job = form.save(commit=False)
+    # bulk_create skips JobPost.save(), which normally derives the mask
+    job.eligible_branch_mask = branch_mask(job.get_eligible_branches_list())
+    return job
+
+
+def import_jobs(rows, batch_size=None, dry_run=False):
+    """Create a job posting for each valid row"""
+    report = ImportReport()
+    for batch in batched(rows, batch_size or settings.IMPORT_BATCH_SIZE):
+        jobs = []
+        for line, row in batch:
+            try:
+                jobs.append(validate_job(row))
+            except ValueError as e:
+                report.error(line, str(e))
+        if jobs and not dry_run:
+            with transaction.atomic():
+                jobs = JobPost.objects.bulk_create(jobs)
+        report.created.extend(jobs)
+    return report
+
+
+def finish_job_import(jobs):
+    """Bring totals, the admin stats, search index and season summaries up to date after import_jobs()"""
+    counters.recount_totals()
+    page_cache.invalidate_admin_stats()
+    get_index(JOB_INDEX).rebuild()
+    for season, company_name in {(seasons.season_of(job.posted_at), job.company_name) for job in jobs}:
+        seasons.refresh_company(season, company_name)
+
+
+def queue_job_digest(jobs):
+    """Queue one email per eligible, opted-in student listing every new job open to them
+
+    Returns the number of messages queued.
+    """
+    new_jobs = defaultdict(list)
+    for job in jobs:
+        if job.is_active:
+            for email in resolve_job_audience(job).emails:
+                new_jobs[email].append(job)
+
+    emails = []
+    for email, matches in new_jobs.items():
+        listing = '\n'.join(
+            f"            - {job.role} at {job.company_name}, {job.package_lpa} LPA, "
+            f"apply by {job.deadline.strftime('%Y-%m-%d')}"
+            for job in matches
+        )
+        message = f"""
+            Hello,
+
+            New job openings matching your profile have been posted on UniCareer:
+
+{listing}
+
+            Login to UniCareer to apply now!
+
+            Best regards,
+            UniCareer Team
+            """
+        emails.append(OutboundEmail(
+            subject=f'New Job Alerts: {len(matches)} new openings on UniCareer',
+            body=message, from_email=settings.DEFAULT_FROM_EMAIL, recipients=[email],
+        ))
+    OutboundEmail.objects.bulk_create(emails, batch_size=settings.EMAIL_OUTBOX_BATCH_SIZE)
+    logger.info("Queued job digests for %d students covering %d jobs", len(emails), len(jobs))
+    return len(emails)
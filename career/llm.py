@@ -0,0 +1,540 @@
+"""
+LLM gateway for the AI features.
+
+Views and batch jobs call get_backend() instead of talking to Gemini
+directly. It returns the process-wide Gateway for the backend selected by
+the LLM_BACKEND setting ('gemini', 'stub' or 'fake'; a DEBUG run without a
+GEMINI_API_KEY gets the stub), which:
+
+- reuses one configured client and model object per process
+- caps in-flight calls with a semaphore (LLM_MAX_CONCURRENCY)
+- applies a per-call timeout (LLM_TIMEOUT) and retries transient errors
+  with jittered exponential backoff (LLM_MAX_RETRIES)
+- opens a circuit breaker after LLM_BREAKER_THRESHOLD calls in a row fail
+  with a transient error (timeouts, rate limits, 5xx), so views fail fast
+  with LLMUnavailable until it resets; a prompt the provider rejects
+  shows it is up and does not count
+- records latency and token counts for every call (llm_stats())
+
+Gateways expose generate() for a complete reply, stream() for a reply
+delivered chunk by chunk, and agenerate() / astream() for async views. The stub
+simulates provider latency offline (LLM_STUB_FIRST_TOKEN_DELAY,
+LLM_STUB_TOKEN_DELAY); the fake backend replays scripted replies and
+errors for tests.
+"""
+import asyncio
+import hashlib
+import logging
+import random
+import statistics
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+import google.generativeai as genai
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from google.api_core import exceptions as google_exceptions
+
+from .prompts import count_tokens
+
+logger = logging.getLogger(__name__)
+
+TRANSIENT_ERRORS = (TimeoutError, asyncio.TimeoutError, ConnectionError)
+
+
+class LLMError(Exception):
+    """Base class for gateway errors"""
+
+
+class LLMUnavailable(LLMError):
+    """The gateway refused the call: circuit open or every slot busy"""
+
+
+@dataclass
+class Usage:
+    """Token counts for one call, filled in by the backend"""
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+
+
+@dataclass
+class CallRecord:
+    """Latency and token usage of one gateway call"""
+    backend: str
+    model: str
+    operation: str
+    usage: Usage = field(default_factory=Usage)
+    attempts: int = 0
+    latency_ms: float = 0.0
+    first_chunk_ms: float = None
+    error: str = ''
+
+
+def estimate_tokens(text):
+    """Local token estimate for backends that report none"""
+    return count_tokens(text)
+
+
+class GeminiBackend:
+    """Google Gemini via google-generativeai"""
+    name = 'gemini'
+    transient_errors = TRANSIENT_ERRORS + (
+        google_exceptions.ResourceExhausted,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.DeadlineExceeded,
+        google_exceptions.InternalServerError,
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._api_key = None
+        self._models = {}
+
+    def is_configured(self):
+        return bool(settings.GEMINI_API_KEY)
+
+    def _model(self, model):
+        with self._lock:
+            # genai.configure() is process-global; redo it only when the key changes
+            if self._api_key != settings.GEMINI_API_KEY:
+                genai.configure(api_key=settings.GEMINI_API_KEY)
+                self._api_key = settings.GEMINI_API_KEY
+                self._models = {}
+            if model not in self._models:
+                self._models[model] = genai.GenerativeModel(model)
+            return self._models[model]
+
+    @staticmethod
+    def _request_options(timeout):
+        # The gateway retries, so turn off the client library's own retry
+        return {'timeout': timeout, 'retry': None}
+
+    @staticmethod
+    def _record_usage(response, usage):
+        metadata = getattr(response, 'usage_metadata', None)
+        if metadata:
+            usage.prompt_tokens = metadata.prompt_token_count or 0
+            usage.output_tokens = metadata.candidates_token_count or 0
+
+    def generate(self, prompt, model, timeout, usage):
+        response = self._model(model).generate_content(
+            prompt, request_options=self._request_options(timeout)
+        )
+        self._record_usage(response, usage)
+        return response.text
+
+    async def agenerate(self, prompt, model, timeout, usage):
+        response = await self._model(model).generate_content_async(
+            prompt, request_options=self._request_options(timeout)
+        )
+        self._record_usage(response, usage)
+        return response.text
+
+    def stream(self, prompt, model, timeout, usage):
+        response = self._model(model).generate_content(
+            prompt, stream=True, request_options=self._request_options(timeout)
+        )
+        for chunk in response:
+            self._record_usage(chunk, usage)
+            if chunk.text:
+                yield chunk.text
+
+    async def astream(self, prompt, model, timeout, usage):
+        response = await self._model(model).generate_content_async(
+            prompt, stream=True, request_options=self._request_options(timeout)
+        )
+        async for chunk in response:
+            self._record_usage(chunk, usage)
+            if chunk.text:
+                yield chunk.text
+
+
+class StubBackend:
+    """Deterministic offline backend; the same prompt always gets the same reply"""
+    name = 'stub'
+    transient_errors = TRANSIENT_ERRORS
+
+    def is_configured(self):
+        return True
+
+    def reply(self, prompt):
+        digest = hashlib.sha256(prompt.encode('utf-8')).digest()
+        # Shaped like an ATS reply so callers that parse it keep working
+        return (
+            f"Score: {digest[0] % 101}\n"
+            f"Missing Keywords: stub-{digest[1] % 10}, stub-{digest[2] % 10}, stub-{digest[3] % 10}"
+        )
+
+    @staticmethod
+    def _words(text):
+        words = text.split(' ')
+        return [word if index == len(words) - 1 else word + ' ' for index, word in enumerate(words)]
+
+    def generate(self, prompt, model, timeout, usage):
+        return "".join(self.stream(prompt, model, timeout, usage))
+
+    async def agenerate(self, prompt, model, timeout, usage):
+        first_delay = settings.LLM_STUB_FIRST_TOKEN_DELAY
+        if first_delay > timeout:
+            await asyncio.sleep(timeout)
+            raise TimeoutError('Stub LLM call timed out')
+        await asyncio.sleep(first_delay)
+        words = self._words(self.reply(prompt))
+        await asyncio.sleep(settings.LLM_STUB_TOKEN_DELAY * (len(words) - 1))
+        text = "".join(words)
+        usage.prompt_tokens = estimate_tokens(prompt)
+        usage.output_tokens = estimate_tokens(text)
+        return text
+
+    def stream(self, prompt, model, timeout, usage):
+        first_delay = settings.LLM_STUB_FIRST_TOKEN_DELAY
+        if first_delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError('Stub LLM call timed out')
+        time.sleep(first_delay)
+        usage.prompt_tokens = estimate_tokens(prompt)
+        for index, word in enumerate(self._words(self.reply(prompt))):
+            if index:
+                time.sleep(settings.LLM_STUB_TOKEN_DELAY)
+            usage.output_tokens += estimate_tokens(word)
+            yield word
+
+    async def astream(self, prompt, model, timeout, usage):
+        first_delay = settings.LLM_STUB_FIRST_TOKEN_DELAY
+        if first_delay > timeout:
+            await asyncio.sleep(timeout)
+            raise TimeoutError('Stub LLM call timed out')
+        await asyncio.sleep(first_delay)
+        usage.prompt_tokens = estimate_tokens(prompt)
+        for index, word in enumerate(self._words(self.reply(prompt))):
+            if index:
+                await asyncio.sleep(settings.LLM_STUB_TOKEN_DELAY)
+            usage.output_tokens += estimate_tokens(word)
+            yield word
+
+
+class FakeBackend(StubBackend):
+    """Scripted backend for tests
+
+    Each call takes the next entry of FakeBackend.script: exceptions (or
+    exception classes) are raised, strings are returned as the reply. Once
+    the script is empty it answers like the stub, without simulated latency.
+    Prompts received are appended to FakeBackend.calls.
+    """
+    name = 'fake'
+    script = []
+    calls = []
+
+    def _next(self, prompt):
+        FakeBackend.calls.append(prompt)
+        entry = FakeBackend.script.pop(0) if FakeBackend.script else self.reply(prompt)
+        if isinstance(entry, BaseException) or (isinstance(entry, type) and issubclass(entry, BaseException)):
+            raise entry
+        return entry
+
+    def generate(self, prompt, model, timeout, usage):
+        text = self._next(prompt)
+        usage.prompt_tokens = estimate_tokens(prompt)
+        usage.output_tokens = estimate_tokens(text)
+        return text
+
+    async def agenerate(self, prompt, model, timeout, usage):
+        return self.generate(prompt, model, timeout, usage)
+
+    def stream(self, prompt, model, timeout, usage):
+        yield from self._words(self.generate(prompt, model, timeout, usage))
+
+    async def astream(self, prompt, model, timeout, usage):
+        for word in self._words(self.generate(prompt, model, timeout, usage)):
+            yield word
+
+
+BACKENDS = {
+    GeminiBackend.name: GeminiBackend,
+    StubBackend.name: StubBackend,
+    FakeBackend.name: FakeBackend,
+}
+
+
+class CircuitBreaker:
+    """Opens after `threshold` failed calls in a row
+
+    While open every call is refused. After `reset_after` seconds one trial
+    call is let through; its success closes the circuit, its failure opens
+    it again.
+    """
+
+    def __init__(self, threshold, reset_after):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.failures >= self.threshold:
+                if self.opened_at is None:
+                    logger.warning("LLM circuit opened after %d failed calls", self.failures)
+                self.opened_at = time.monotonic()
+
+
+class Metrics:
+    """Bounded log of recent gateway calls"""
+
+    def __init__(self, size=500):
+        self._calls = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def add(self, record):
+        with self._lock:
+            self._calls.append(record)
+
+    def reject(self):
+        with self._lock:
+            self.rejected += 1
+
+    def clear(self):
+        with self._lock:
+            self._calls.clear()
+            self.rejected = 0
+
+    def summary(self):
+        with self._lock:
+            calls = list(self._calls)
+            rejected = self.rejected
+        latencies = sorted(call.latency_ms for call in calls)
+        ok = [call for call in calls if not call.error]
+        return {
+            'calls': len(calls),
+            'failures': len(calls) - len(ok),
+            'rejected': rejected,
+            'latency_p50_ms': statistics.median(latencies) if latencies else 0.0,
+            'latency_p95_ms': latencies[int(len(latencies) * 0.95)] if latencies else 0.0,
+            'avg_prompt_tokens': sum(c.usage.prompt_tokens for c in ok) / len(ok) if ok else 0.0,
+            'avg_output_tokens': sum(c.usage.output_tokens for c in ok) / len(ok) if ok else 0.0,
+        }
+
+
+metrics = Metrics()
+
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff before retry number `attempt` (1-based)"""
+    return random.uniform(0, settings.LLM_RETRY_BASE_DELAY * 2 ** (attempt - 1))
+
+
+class Gateway:
+    """Concurrency cap, timeout, retry, circuit breaker and metrics around a backend"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.name = backend.name
+        self.breaker = CircuitBreaker(settings.LLM_BREAKER_THRESHOLD, settings.LLM_BREAKER_RESET)
+        self.slots = threading.BoundedSemaphore(settings.LLM_MAX_CONCURRENCY)
+
+    def is_configured(self):
+        return self.backend.is_configured()
+
+    def available(self):
+        """False while the circuit is open, so callers can fail before doing other work"""
+        return self.breaker.state != 'open'
+
+    def _begin(self, operation, model, acquired):
+        """Check the breaker for a caller that tried to take a slot"""
+        if not acquired:
+            metrics.reject()
+            raise LLMUnavailable('Too many AI requests are in progress. Please try again shortly.')
+        if not self.breaker.allow():
+            self.slots.release()
+            metrics.reject()
+            raise LLMUnavailable('The AI service is temporarily unavailable. Please try again shortly.')
+        return CallRecord(self.name, model, operation), time.perf_counter()
+
+    def _end(self, record, started, error=None):
+        record.latency_ms = (time.perf_counter() - started) * 1000
+        if error is not None:
+            record.error = type(error).__name__
+        # Only the errors worth retrying say the provider is down; a rejected prompt is the caller's problem
+        if isinstance(error, self.backend.transient_errors):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        self.slots.release()
+        metrics.add(record)
+        logger.info(
+            "LLM %s %s %s: %.0f ms, %d prompt / %d output tokens, %d attempt(s)%s",
+            record.backend, record.operation, record.model, record.latency_ms,
+            record.usage.prompt_tokens, record.usage.output_tokens, record.attempts,
+            f", failed: {record.error}" if record.error else "",
+        )
+
+    def _should_retry(self, error, attempt):
+        return isinstance(error, self.backend.transient_errors) and attempt < settings.LLM_MAX_RETRIES
+
+    def generate(self, prompt, model):
+        acquired = self.slots.acquire(timeout=settings.LLM_QUEUE_TIMEOUT)
+        record, started = self._begin('generate', model, acquired)
+        try:
+            for attempt in range(settings.LLM_MAX_RETRIES + 1):
+                record.attempts = attempt + 1
+                record.usage = Usage()
+                try:
+                    text = self.backend.generate(prompt, model, settings.LLM_TIMEOUT, record.usage)
+                    break
+                except Exception as e:
+                    if not self._should_retry(e, attempt):
+                        raise
+                    time.sleep(backoff_delay(attempt + 1))
+        except Exception as e:
+            self._end(record, started, e)
+            raise
+        self._end(record, started)
+        return text
+
+    async def agenerate(self, prompt, model):
+        # A thread waits for the slot so the cap is shared with sync callers
+        acquired = await sync_to_async(self.slots.acquire, thread_sensitive=False)(
+            timeout=settings.LLM_QUEUE_TIMEOUT
+        )
+        record, started = self._begin('agenerate', model, acquired)
+        try:
+            for attempt in range(settings.LLM_MAX_RETRIES + 1):
+                record.attempts = attempt + 1
+                record.usage = Usage()
+                try:
+                    text = await asyncio.wait_for(
+                        self.backend.agenerate(prompt, model, settings.LLM_TIMEOUT, record.usage),
+                        settings.LLM_TIMEOUT,
+                    )
+                    break
+                except Exception as e:
+                    if not self._should_retry(e, attempt):
+                        raise
+                    await asyncio.sleep(backoff_delay(attempt + 1))
+        except Exception as e:
+            self._end(record, started, e)
+            raise
+        self._end(record, started)
+        return text
+
+    def stream(self, prompt, model):
+        acquired = self.slots.acquire(timeout=settings.LLM_QUEUE_TIMEOUT)
+        record, started = self._begin('stream', model, acquired)
+        error = None
+        try:
+            # Retry only until the first chunk; after that the caller has seen output
+            for attempt in range(settings.LLM_MAX_RETRIES + 1):
+                record.attempts = attempt + 1
+                record.usage = Usage()
+                chunks = self.backend.stream(prompt, model, settings.LLM_TIMEOUT, record.usage)
+                try:
+                    first = next(chunks, None)
+                    break
+                except Exception as e:
+                    if not self._should_retry(e, attempt):
+                        raise
+                    time.sleep(backoff_delay(attempt + 1))
+            record.first_chunk_ms = (time.perf_counter() - started) * 1000
+            if first is not None:
+                yield first
+            yield from chunks
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._end(record, started, error)
+
+    async def astream(self, prompt, model):
+        acquired = await sync_to_async(self.slots.acquire, thread_sensitive=False)(
+            timeout=settings.LLM_QUEUE_TIMEOUT
+        )
+        record, started = self._begin('astream', model, acquired)
+        error = None
+        try:
+            for attempt in range(settings.LLM_MAX_RETRIES + 1):
+                record.attempts = attempt + 1
+                record.usage = Usage()
+                chunks = self.backend.astream(prompt, model, settings.LLM_TIMEOUT, record.usage)
+                try:
+                    first = await asyncio.wait_for(anext(chunks, None), settings.LLM_TIMEOUT)
+                    break
+                except Exception as e:
+                    if not self._should_retry(e, attempt):
+                        raise
+                    await asyncio.sleep(backoff_delay(attempt + 1))
+            record.first_chunk_ms = (time.perf_counter() - started) * 1000
+            if first is not None:
+                yield first
+            async for chunk in chunks:
+                yield chunk
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._end(record, started, error)
+
+
+_gateways = {}
+_gateways_lock = threading.Lock()
+
+
+def backend_name():
+    """LLM_BACKEND, or the stub for a DEBUG run with no Gemini key"""
+    name = settings.LLM_BACKEND
+    if name == GeminiBackend.name and settings.DEBUG and not settings.GEMINI_API_KEY:
+        return StubBackend.name
+    return name
+
+
+def get_backend():
+    """Process-wide gateway for the backend named by backend_name()"""
+    name = backend_name()
+    with _gateways_lock:
+        if name not in _gateways:
+            _gateways[name] = Gateway(BACKENDS[name]())
+        return _gateways[name]
+
+
+def reset_gateways():
+    """Drop the process-wide gateways and metrics (for tests and settings changes)"""
+    with _gateways_lock:
+        _gateways.clear()
+    metrics.clear()
+
+
+def llm_stats():
+    """Recent call metrics plus the circuit state of the active gateway"""
+    stats = metrics.summary()
+    stats['circuit'] = get_backend().breaker.state
+    return stats
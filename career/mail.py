@@ -0,0 +1,178 @@
+"""
+Email outbox for UniCareer.
+
+Signals and views call queue_email() to write a row to the outbox inside
+the current request's transaction, or queue_mass_email() to fan an
+announcement out as one message per recipient. The send_queued_emails
+management command drains the outbox in batches over a single SMTP
+connection per batch, honouring a per-minute rate limit, retrying
+failures with exponential backoff and dead-lettering messages that keep
+failing.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DeliveryReport:
+    """Counts for one outbox drain pass"""
+    sent: int = 0
+    retried: int = 0
+    dead: int = 0
+
+    def __add__(self, other):
+        return DeliveryReport(self.sent + other.sent, self.retried + other.retried, self.dead + other.dead)
+
+    @property
+    def failed(self):
+        return self.retried + self.dead
+
+    @property
+    def processed(self):
+        return self.sent + self.failed
+
+
+class RateLimiter:
+    """Spaces out sends so no more than `per_minute` go out in any minute"""
+
+    def __init__(self, per_minute, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self.clock = clock
+        self.sleep = sleep
+        self.next_slot = None
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = self.clock()
+        if self.next_slot is not None and now < self.next_slot:
+            self.sleep(self.next_slot - now)
+            now = self.next_slot
+        self.next_slot = now + self.interval
+
+
+def queue_email(subject, message, recipient_list, from_email=None):
+    """Queue an email for background delivery and return the outbox row"""
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=list(recipient_list),
+    )
+
+
+def queue_mass_email(subject, message, recipient_list, from_email=None):
+    """Queue one message per recipient so addresses are never shared
+
+    Returns the number of messages queued.
+    """
+    from_email = from_email or settings.DEFAULT_FROM_EMAIL
+    emails = [
+        OutboundEmail(subject=subject, body=message, from_email=from_email, recipients=[recipient])
+        for recipient in dict.fromkeys(recipient_list)
+    ]
+    OutboundEmail.objects.bulk_create(emails, batch_size=settings.EMAIL_OUTBOX_BATCH_SIZE)
+    return len(emails)
+
+
+def backoff_delay(attempts):
+    """Delay before the next attempt, doubling per attempt up to a ceiling"""
+    base = settings.EMAIL_OUTBOX_BACKOFF_SECONDS
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), settings.EMAIL_OUTBOX_MAX_BACKOFF_SECONDS))
+
+
+def claim_batch(batch_size):
+    """Lease a batch of due messages so concurrent workers skip them"""
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        if batch:
+            lease_until = now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS)
+            OutboundEmail.objects.filter(id__in=[email.id for email in batch]).update(next_attempt_at=lease_until)
+    return batch
+
+
+def record_failure(email, error, max_attempts):
+    """Schedule a retry for a failed message, or dead-letter it"""
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= max_attempts:
+        email.status = 'dead'
+        logger.error("Dead-lettered email %s after %d attempts: %s", email.pk, email.attempts, error)
+    else:
+        email.next_attempt_at = timezone.now() + backoff_delay(email.attempts)
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+
+
+def deliver_batch(batch, max_attempts=None, rate_limiter=None):
+    """Send a batch of outbox rows over one reused connection"""
+    max_attempts = max_attempts or settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+    rate_limiter = rate_limiter or RateLimiter(settings.EMAIL_RATE_PER_MINUTE)
+    report = DeliveryReport()
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        # The whole batch is retried when the server cannot be reached
+        for email in batch:
+            record_failure(email, e, max_attempts)
+        report.retried = sum(1 for email in batch if email.status == 'pending')
+        report.dead = len(batch) - report.retried
+        return report
+
+    try:
+        for email in batch:
+            message = EmailMessage(
+                email.subject, email.body, email.from_email, email.recipients, connection=connection
+            )
+            rate_limiter.wait()
+            try:
+                message.send()
+            except Exception as e:
+                record_failure(email, e, max_attempts)
+                if email.status == 'dead':
+                    report.dead += 1
+                else:
+                    report.retried += 1
+                continue
+            email.status = 'sent'
+            email.attempts += 1
+            email.sent_at = timezone.now()
+            email.last_error = ''
+            email.save(update_fields=['status', 'attempts', 'sent_at', 'last_error'])
+            report.sent += 1
+    finally:
+        connection.close()
+    return report
+
+
+def drain_outbox(batch_size=None, max_attempts=None, max_batches=None, rate_per_minute=None):
+    """Deliver due messages batch by batch until the outbox is empty"""
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    if rate_per_minute is None:
+        rate_per_minute = settings.EMAIL_RATE_PER_MINUTE
+    rate_limiter = RateLimiter(rate_per_minute)
+    report = DeliveryReport()
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        batch = claim_batch(batch_size)
+        if not batch:
+            break
+        report += deliver_batch(batch, max_attempts, rate_limiter)
+        batches += 1
+    return report
@@ -0,0 +1,72 @@
+"""
+Management command to measure chatbot streaming time-to-first-byte
+
+Runs the streaming endpoint on its WSGI path (blocking stream) and its
+ASGI path (async stream). The total time is what the student would wait
+for the first byte if the reply were not streamed.
+"""
+import json
+import statistics
+import time
+
+from asgiref.sync import async_to_sync
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import AsyncRequestFactory, RequestFactory, override_settings
+
+from career.models import CustomUser
+from career.views import chatbot_stream
+
+
+async def first_byte_and_total(request):
+    """Seconds until the first body byte and until the full body, for one request"""
+    started = time.perf_counter()
+    response = await chatbot_stream(request)
+    if response.is_async:
+        iterator = aiter(response.streaming_content)
+        await anext(iterator, b'')
+        first_byte = time.perf_counter() - started
+        async for _chunk in iterator:
+            pass
+    else:
+        iterator = iter(response.streaming_content)
+        next(iterator, b'')
+        first_byte = time.perf_counter() - started
+        for _chunk in iterator:
+            pass
+    return first_byte, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = 'Benchmark chatbot streaming time-to-first-byte on the WSGI and ASGI paths using the stub LLM backend'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=5, help='Requests per path')
+        parser.add_argument('--first-token-delay', type=float, default=0.5, help='Simulated seconds before the first token')
+        parser.add_argument('--token-delay', type=float, default=0.05, help='Simulated seconds between tokens')
+
+    def handle(self, *args, **options):
+        body = json.dumps({'message': 'How do I prepare for a technical interview?'})
+
+        # Chat sessions are stored, so run inside a transaction that is rolled back
+        with transaction.atomic(), override_settings(
+            LLM_BACKEND='stub',
+            LLM_STUB_FIRST_TOKEN_DELAY=options['first_token_delay'],
+            LLM_STUB_TOKEN_DELAY=options['token_delay'],
+        ):
+            user = CustomUser.objects.create_user(username='chat-benchmark', role='admin')
+            for label, factory in [('wsgi', RequestFactory()), ('asgi', AsyncRequestFactory())]:
+                first_bytes, totals = [], []
+                for _ in range(options['requests']):
+                    request = factory.post('/chatbot/stream/', body, content_type='application/json')
+                    request.user = user
+                    request.session = SessionStore()
+                    first_byte, total = async_to_sync(first_byte_and_total)(request)
+                    first_bytes.append(first_byte)
+                    totals.append(total)
+                self.stdout.write(
+                    f'{label:>4}: TTFB median {statistics.median(first_bytes) * 1000:.0f} ms, '
+                    f'total median {statistics.median(totals) * 1000:.0f} ms'
+                )
+            transaction.set_rollback(True)
@@ -0,0 +1,82 @@
+"""
+Management command to compare prompt sizes before and after the prompt builder
+"""
+import logging
+import statistics
+
+from django.core.management.base import BaseCommand, CommandError
+
+from career.ats import build_prompt as build_ats_prompt
+from career.chat import build_student_context
+from career.models import JobPost, StudentProfile
+from career.prompts import count_tokens
+
+
+def legacy_ats_prompt(job_description, resume_text):
+    """The ATS prompt as it was built before token budgeting"""
+    return f"""
+    Compare this resume against the job description and provide:
+    1. A match score from 0-100
+    2. List exactly 3 missing keywords that would improve the match
+
+    Job Description:
+    {job_description}
+
+    Resume Text:
+    {resume_text[:4000]}
+
+    Format your response as:
+    Score: [number]
+    Missing Keywords: [keyword1], [keyword2], [keyword3]
+    """
+
+
+def legacy_chat_resume(resume_text):
+    """The chat context's resume part as it was built before token budgeting"""
+    return resume_text[:2000] + "..." if len(resume_text) > 2000 else resume_text
+
+
+class Command(BaseCommand):
+    help = 'Report estimated prompt tokens for stored resumes with the legacy slicing and the prompt builder'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--job', type=int, help='Job to build ATS prompts against (default: latest active job)')
+        parser.add_argument('--limit', type=int, default=500, help='Resumes to sample')
+
+    def report(self, label, before, after):
+        if not before:
+            return
+        saved = 1 - sum(after) / sum(before) if sum(before) else 0
+        self.stdout.write(
+            f'{label}: median {statistics.median(before):.0f} -> {statistics.median(after):.0f} tokens, '
+            f'mean {statistics.mean(before):.0f} -> {statistics.mean(after):.0f} ({saved:.0%} fewer)'
+        )
+
+    def handle(self, *args, **options):
+        # Per-prompt log lines would drown the report
+        logging.getLogger('career.prompts').setLevel(logging.WARNING)
+        jobs = JobPost.objects.all()
+        job = jobs.filter(pk=options['job']).first() if options['job'] else jobs.filter(is_active=True).first()
+        if job is None:
+            raise CommandError('No job found to build ATS prompts against.')
+
+        profiles = (
+            StudentProfile.objects.exclude(resume_text='')
+            .select_related('user')[:options['limit']]
+        )
+        ats_before, ats_after, chat_before, chat_after = [], [], [], []
+        for profile in profiles:
+            ats_before.append(count_tokens(legacy_ats_prompt(job.job_description, profile.resume_text)))
+            ats_after.append(build_ats_prompt(job.job_description, profile.resume_text).tokens)
+            context = build_student_context(profile.user)
+            chat_after.append(count_tokens(context))
+            resume_part = context.split('- Resume Content:', 1)[-1]
+            chat_before.append(
+                count_tokens(context) - count_tokens(resume_part) + count_tokens(legacy_chat_resume(profile.resume_text))
+            )
+
+        if not ats_before:
+            raise CommandError('No stored resume text to measure.')
+        self.stdout.write(f'{len(ats_before)} resumes against "{job}"')
+        self.report('ATS prompt', ats_before, ats_after)
+        self.report('Chat context', chat_before, chat_after)
@@ -0,0 +1,45 @@
+"""
+Management command to bulk import job postings from a CSV file
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from career.imports import finish_job_import, import_jobs, queue_job_digest, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Create job postings from a CSV with the columns company_name, role, package_lpa, min_cgpa_required, '
+        'eligible_branches, deadline, job_description and optionally is_active'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help='Path to the CSV file')
+        parser.add_argument('--batch-size', type=int, help='Rows per transaction (default: IMPORT_BATCH_SIZE)')
+        parser.add_argument('--notify', action='store_true',
+                            help='Queue one email per eligible student listing all the new jobs')
+        parser.add_argument('--dry-run', action='store_true', help='Validate the file without creating anything')
+
+    def handle(self, *args, **options):
+        try:
+            handle = open(options['csv_file'], newline='', encoding='utf-8-sig')
+        except OSError as e:
+            raise CommandError(f'Cannot read {options["csv_file"]}: {e}')
+        with handle:
+            report = import_jobs(read_rows(handle), batch_size=options['batch_size'], dry_run=options['dry_run'])
+
+        for line, message in report.errors:
+            self.stdout.write(self.style.WARNING(f'Line {line}: {message}'))
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(
+                f'Would import {len(report.created)} jobs, skipped {len(report.errors)} rows.'
+            ))
+            return
+
+        if report.created:
+            finish_job_import(report.created)
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {len(report.created)} jobs, skipped {len(report.errors)} rows.'
+        ))
+        if options['notify'] and report.created:
+            queued = queue_job_digest(report.created)
+            self.stdout.write(f'Queued {queued} job digest emails.')
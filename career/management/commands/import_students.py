@@ -0,0 +1,40 @@
+"""
+Management command to bulk import students from a CSV file
+"""
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from career.imports import import_students, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Create student accounts and profiles from a CSV with the columns username, email, password, '
+        'branch, current_cgpa and optionally backlogs, skills and linkedin_url'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help='Path to the CSV file')
+        parser.add_argument('--batch-size', type=int, help='Rows per transaction (default: IMPORT_BATCH_SIZE)')
+        parser.add_argument('--hash-workers', type=int, default=os.cpu_count(),
+                            help='Threads hashing passwords (default: one per CPU)')
+        parser.add_argument('--dry-run', action='store_true', help='Validate the file without creating anything')
+
+    def handle(self, *args, **options):
+        try:
+            handle = open(options['csv_file'], newline='', encoding='utf-8-sig')
+        except OSError as e:
+            raise CommandError(f'Cannot read {options["csv_file"]}: {e}')
+        with handle:
+            report = import_students(
+                read_rows(handle), batch_size=options['batch_size'],
+                hash_workers=options['hash_workers'], dry_run=options['dry_run'],
+            )
+
+        for line, message in report.errors:
+            self.stdout.write(self.style.WARNING(f'Line {line}: {message}'))
+        verb = 'Would import' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {len(report.created)} students, skipped {len(report.errors)} rows.'
+        ))
@@ -0,0 +1,100 @@
+"""
+Management command to load-test chatbot throughput against a running server
+
+Start the server with one worker and the stub backend simulating Gemini
+latency, then run this command against it. For example, a sync worker:
+
+    LLM_BACKEND=stub LLM_STUB_FIRST_TOKEN_DELAY=2 gunicorn -w 1 unicareer.wsgi
+    python manage.py loadtest_chat --username student1 --password ...
+
+and an ASGI worker:
+
+    LLM_BACKEND=stub LLM_STUB_FIRST_TOKEN_DELAY=2 uvicorn --workers 1 unicareer.asgi:application
+    python manage.py loadtest_chat --username student1 --password ...
+
+A sync worker completes roughly one chat per LLM round-trip; an ASGI
+worker overlaps the waits, so throughput scales with --concurrency.
+"""
+import http.cookiejar
+import json
+import statistics
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+
+class Command(BaseCommand):
+    help = 'Measure concurrent chatbot throughput of a running server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Base URL of the server')
+        parser.add_argument('--username', required=True)
+        parser.add_argument('--password', required=True)
+        parser.add_argument('--concurrency', type=int, default=20, help='Requests in flight at once')
+        parser.add_argument('--requests', type=int, default=100, help='Total chat requests to send')
+        parser.add_argument('--message', default='How do I prepare for a technical interview?')
+
+    def login(self, base_url, username, password):
+        """Log in through the login form; returns (cookie header, csrf token)"""
+        jar = http.cookiejar.CookieJar()
+        opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+        login_url = base_url + reverse('login')
+        opener.open(login_url).read()
+        csrftoken = next((c.value for c in jar if c.name == 'csrftoken'), '')
+        form = urllib.parse.urlencode({
+            'username': username,
+            'password': password,
+            'csrfmiddlewaretoken': csrftoken,
+        }).encode()
+        request = urllib.request.Request(login_url, data=form, headers={'Referer': login_url})
+        opener.open(request).read()
+
+        cookies = {c.name: c.value for c in jar}
+        if 'sessionid' not in cookies:
+            raise CommandError('Login failed; check --username and --password.')
+        cookie_header = '; '.join(f'{name}={value}' for name, value in cookies.items())
+        return cookie_header, cookies.get('csrftoken', csrftoken)
+
+    def handle(self, *args, **options):
+        base_url = options['url'].rstrip('/')
+        cookie_header, csrftoken = self.login(base_url, options['username'], options['password'])
+        chat_url = base_url + reverse('chatbot_stream')
+        body = json.dumps({'message': options['message']}).encode()
+
+        def send(_index):
+            request = urllib.request.Request(chat_url, data=body, headers={
+                'Content-Type': 'application/json',
+                'Cookie': cookie_header,
+                'X-CSRFToken': csrftoken,
+                'Referer': chat_url,
+            })
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=120) as response:
+                    # The reply streams as server-sent events ending with a done event
+                    ok = b'event: done' in response.read()
+            except (urllib.error.URLError, OSError):
+                ok = False
+            return ok, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            results = list(executor.map(send, range(options['requests'])))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for ok, latency in results if ok)
+        failed = len(results) - len(latencies)
+        self.stdout.write(
+            f"{len(latencies)} ok, {failed} failed in {elapsed:.1f}s "
+            f"({len(latencies) / elapsed:.2f} chats/s at concurrency {options['concurrency']})"
+        )
+        if latencies:
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            self.stdout.write(
+                f"latency median {statistics.median(latencies) * 1000:.0f} ms, p95 {p95 * 1000:.0f} ms"
+            )
@@ -0,0 +1,15 @@
+"""
+Management command to rebuild the full-text search indexes
+"""
+from django.core.management.base import BaseCommand
+
+from career.search import JOB_INDEX, WIKI_INDEX, get_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search indexes for company wiki entries and job postings'
+
+    def handle(self, *args, **options):
+        for label, spec in [('wiki entries', WIKI_INDEX), ('job postings', JOB_INDEX)]:
+            indexed = get_index(spec).rebuild()
+            self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} {label}.'))
@@ -0,0 +1,20 @@
+"""
+Management command to rebuild the placement-season summary tables
+"""
+from django.core.management.base import BaseCommand
+
+from career.seasons import rebuild_season, season_label, seasons
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-branch and per-company placement-season summaries from applications and jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--season', type=int, action='append',
+                            help='Starting year of a season to rebuild; repeatable (default: every season with jobs)')
+
+    def handle(self, *args, **options):
+        for season in options['season'] or seasons():
+            branch_rows, company_rows = rebuild_season(season)
+            self.stdout.write(f'{season_label(season)}: {branch_rows} branches, {company_rows} companies')
+        self.stdout.write(self.style.SUCCESS('Season summaries rebuilt.'))
@@ -0,0 +1,26 @@
+"""
+Management command to recount the denormalised job and dashboard counters
+"""
+from django.core.management.base import BaseCommand
+
+from career.counters import repair_counters
+from career.page_cache import invalidate_admin_stats
+
+
+class Command(BaseCommand):
+    help = 'Recount applicant counts per job and the dashboard totals, fixing any that drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Jobs checked and saved per batch')
+
+    def handle(self, *args, **options):
+        report = repair_counters(batch_size=options['batch_size'])
+        if report.jobs_fixed:
+            shown = ', '.join(str(pk) for pk in report.jobs_fixed[:20])
+            more = f' and {len(report.jobs_fixed) - 20} more' if len(report.jobs_fixed) > 20 else ''
+            self.stdout.write(f'Fixed counts for {len(report.jobs_fixed)} jobs: {shown}{more}')
+        if report.totals_fixed:
+            self.stdout.write('Fixed the dashboard totals.')
+        if report.jobs_fixed or report.totals_fixed:
+            invalidate_admin_stats()
+        self.stdout.write(self.style.SUCCESS(f'Checked {report.jobs_checked} jobs.'))
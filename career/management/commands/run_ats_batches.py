@@ -0,0 +1,56 @@
+"""
+Management command to process queued bulk ATS scans
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from career.ats import batch_lease, run_batch, stale_running
+from career.models import ATSScanBatch
+
+
+def claim_next_batch():
+    """Lease the oldest queued batch, or a running one whose worker died, and return it"""
+    with transaction.atomic():
+        batch = (
+            ATSScanBatch.objects.select_for_update(skip_locked=True)
+            .filter(Q(status='queued') | stale_running())
+            .order_by('created_at')
+            .first()
+        )
+        if batch is not None:
+            batch.status = 'running'
+            batch.lease_until = batch_lease()
+            batch.save(update_fields=['status', 'lease_until'])
+    return batch
+
+
+class Command(BaseCommand):
+    help = 'Score all applicants of queued ATS scan batches against their job description'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new batches instead of exiting')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep between polls with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            batch = claim_next_batch()
+            if batch is None:
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+                continue
+
+            self.stdout.write(f'Scanning applicants for {batch.job}...')
+            try:
+                batch = run_batch(batch)
+            except Exception as e:
+                ATSScanBatch.objects.filter(pk=batch.pk).update(status='failed', finished_at=timezone.now())
+                self.stdout.write(self.style.ERROR(f'Batch {batch.pk} failed: {e}'))
+                continue
+            self.stdout.write(self.style.SUCCESS(
+                f'Batch {batch.pk}: scored {batch.processed}, skipped {batch.skipped}, failed {batch.failed}'
+            ))
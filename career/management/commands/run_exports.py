@@ -0,0 +1,58 @@
+"""
+Management command to write queued multi-job applicant exports
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from career.exports import export_lease, run_export, stale_running
+from career.models import ExportJob
+
+
+def claim_next_export():
+    """Lease the oldest queued export, or a running one whose worker died, and return it"""
+    with transaction.atomic():
+        export = (
+            ExportJob.objects.select_for_update(skip_locked=True)
+            .filter(Q(status='queued') | stale_running())
+            .order_by('created_at')
+            .first()
+        )
+        if export is not None:
+            export.status = 'running'
+            export.lease_until = export_lease()
+            export.save(update_fields=['status', 'lease_until'])
+    return export
+
+
+class Command(BaseCommand):
+    help = 'Write queued applicant exports (ZIP of per-job CSVs, combined CSV or XLSX) to MEDIA_ROOT'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new exports instead of exiting')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep between polls with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            export = claim_next_export()
+            if export is None:
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+                continue
+
+            self.stdout.write(f'Exporting applicants ({export.get_format_display()})...')
+            try:
+                export = run_export(export)
+            except Exception as e:
+                ExportJob.objects.filter(pk=export.pk).update(
+                    status='failed', error=str(e), finished_at=timezone.now(),
+                )
+                self.stdout.write(self.style.ERROR(f'Export {export.pk} failed: {e}'))
+                continue
+            self.stdout.write(self.style.SUCCESS(
+                f'Export {export.pk}: {export.rows_written} rows from {export.processed_jobs} jobs'
+            ))
@@ -0,0 +1,37 @@
+"""
+Management command to deliver emails queued in the UniCareer outbox
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from career.mail import drain_outbox
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued outbox emails in rate-limited batches over a reused connection, with retries and dead-lettering'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Messages sent per connection (default: EMAIL_OUTBOX_BATCH_SIZE)')
+        parser.add_argument('--max-attempts', type=int, help='Attempts before a message is dead-lettered (default: EMAIL_OUTBOX_MAX_ATTEMPTS)')
+        parser.add_argument('--rate', type=int, help='Maximum messages per minute, 0 for unlimited (default: EMAIL_RATE_PER_MINUTE)')
+        parser.add_argument('--loop', action='store_true', help='Keep polling the outbox instead of exiting when it is empty')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep between polls with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            report = drain_outbox(
+                batch_size=options['batch_size'],
+                max_attempts=options['max_attempts'],
+                rate_per_minute=options['rate'],
+            )
+            if report.processed:
+                self.stdout.write(
+                    f'Delivered: {report.sent}, failed: {report.failed} '
+                    f'(retrying: {report.retried}, dead-lettered: {report.dead})'
+                )
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS('Outbox drained.'))
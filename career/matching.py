@@ -0,0 +1,85 @@
+"""
+Local resume-to-job match scoring.
+
+Ranks applicants by how well their stored resume text and profile skills
+match a job description using Okapi BM25. Term counts for every
+applicant are gathered into one documents x query-terms matrix and
+scored in a single NumPy pass, so ranking thousands of applicants needs
+no external calls.
+"""
+from collections import Counter
+
+import numpy as np
+
+# Byte translation table that turns everything except [a-z0-9+#] into spaces,
+# so tokenising is a C-level translate() + split() rather than a regex scan
+TOKEN_CHARS = b'abcdefghijklmnopqrstuvwxyz0123456789+#'
+SEPARATORS = bytes(byte if byte in TOKEN_CHARS else 0x20 for byte in range(256))
+
+STOPWORDS = frozenset(b"""
+a an and are as at be by for from has have in is it its of on or that the to was
+were will with we you your our this their they them who what which should must
+can able work working experience years year role candidate candidates job team
+""".split())
+
+# Standard BM25 parameters
+K1 = 1.5
+B = 0.75
+
+
+def tokenize(text):
+    """Lower-cased ASCII byte tokens, keeping tech terms such as c++ and c#"""
+    return text.lower().encode('ascii', 'ignore').translate(SEPARATORS).split()
+
+
+def score_documents(query, documents):
+    """BM25 score of each document against the query, as a NumPy array"""
+    query_terms = list(dict.fromkeys(term for term in tokenize(query) if term not in STOPWORDS))
+    if not documents or not query_terms:
+        return np.zeros(len(documents))
+
+    counts = np.zeros((len(documents), len(query_terms)), dtype=np.float32)
+    lengths = np.zeros(len(documents), dtype=np.float32)
+    for row, document in enumerate(documents):
+        tokens = tokenize(document)
+        lengths[row] = len(tokens)
+        term_counts = Counter(tokens)
+        counts[row] = [term_counts[term] for term in query_terms]
+
+    n_docs = len(documents)
+    doc_freq = np.count_nonzero(counts, axis=0)
+    idf = np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+    avg_length = lengths.mean() or 1.0
+    norm = K1 * (1 - B + B * lengths / avg_length)
+    tf = counts * (K1 + 1) / (counts + norm[:, None])
+    return tf @ idf
+
+
+def normalise(scores):
+    """Scale raw scores to 0-100 relative to the best match"""
+    top = scores.max() if len(scores) else 0
+    if top <= 0:
+        return np.zeros_like(scores)
+    return np.round(scores / top * 100, 1)
+
+
+def applicant_document(profile):
+    """Text used to match an applicant: stored resume text plus skills"""
+    return f"{profile.skills}\n{profile.resume_text}"
+
+
+def rank_applications(job, applications):
+    """Attach match_score to each application and return them best-first
+
+    Applications must have student__profile selected; students without a
+    profile score 0.
+    """
+    applications = list(applications)
+    documents = []
+    for application in applications:
+        profile = getattr(application.student, 'profile', None)
+        documents.append(applicant_document(profile) if profile else "")
+    scores = normalise(score_documents(job.job_description, documents))
+    for application, score in zip(applications, scores):
+        application.match_score = float(score)
+    return sorted(applications, key=lambda application: application.match_score, reverse=True)
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:17
+
+from django.db import migrations, models
+
+# Snapshot of StudentProfile.BRANCH_CHOICES order at the time of this migration
+BRANCH_CODES = ['CSE', 'ECE', 'EEE', 'ME', 'CE', 'IT', 'OTHER']
+
+
+def populate_branch_masks(apps, schema_editor):
+    JobPost = apps.get_model('career', 'JobPost')
+    for job in JobPost.objects.only('id', 'eligible_branches').iterator():
+        mask = 0
+        for branch in job.eligible_branches.split(','):
+            branch = branch.strip()
+            if branch in BRANCH_CODES:
+                mask |= 1 << BRANCH_CODES.index(branch)
+        JobPost.objects.filter(pk=job.pk).update(eligible_branch_mask=mask)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career', '0003_userpreference'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobpost',
+            name='eligible_branch_mask',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Bitmask of eligible branches, derived from eligible_branches'),
+        ),
+        migrations.RunPython(populate_branch_masks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career', '0005_outboundemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentprofile',
+            name='resume_sha256',
+            field=models.CharField(blank=True, editable=False, help_text='SHA-256 of the extracted resume file', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='studentprofile',
+            name='resume_text',
+            field=models.TextField(blank=True, editable=False, help_text='Text extracted from the resume PDF'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:25
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career', '0006_studentprofile_resume_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='ats_keywords',
+            field=models.CharField(blank=True, help_text='Missing keywords from the latest ATS scan', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='ats_resume_sha256',
+            field=models.CharField(blank=True, help_text='Hash of the resume the ATS score was computed from', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='ats_scanned_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='ats_score',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Latest ATS match score (0-100)', null=True),
+        ),
+        migrations.CreateModel(
+            name='ATSScanBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('processed', models.PositiveIntegerField(default=0)),
+                ('skipped', models.PositiveIntegerField(default=0)),
+                ('failed', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ats_batches', to='career.jobpost')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Full-text search index for CompanyWiki; see career/search.py
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS career_companywiki_fts USING fts5("
+            "company_name, interview_questions, senior_tips, tokenize='porter unicode61')"
+        )
+        schema_editor.execute(
+            "INSERT INTO career_companywiki_fts (rowid, company_name, interview_questions, senior_tips) "
+            "SELECT id, company_name, interview_questions, senior_tips FROM career_companywiki"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute("ALTER TABLE career_companywiki ADD COLUMN IF NOT EXISTS search_vector tsvector")
+        schema_editor.execute(
+            "UPDATE career_companywiki SET search_vector = "
+            "setweight(to_tsvector('english', coalesce(company_name, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(interview_questions, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(senior_tips, '')), 'C')"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS companywiki_search_idx ON career_companywiki USING GIN (search_vector)"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS career_companywiki_fts")
+    elif vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS companywiki_search_idx")
+        schema_editor.execute("ALTER TABLE career_companywiki DROP COLUMN IF EXISTS search_vector")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career', '0008_chat_sessions'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,51 @@
+# Job listing index and full-text search index for JobPost; see career/search.py
+
+from django.db import migrations, models
+
+
+def create_job_text_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS career_jobpost_fts USING fts5("
+            "company_name, role, job_description, tokenize='porter unicode61')"
+        )
+        schema_editor.execute(
+            "INSERT INTO career_jobpost_fts (rowid, company_name, role, job_description) "
+            "SELECT id, company_name, role, job_description FROM career_jobpost"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute("ALTER TABLE career_jobpost ADD COLUMN IF NOT EXISTS search_vector tsvector")
+        schema_editor.execute(
+            "UPDATE career_jobpost SET search_vector = "
+            "setweight(to_tsvector('english', coalesce(company_name, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(role, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(job_description, '')), 'C')"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS jobpost_search_idx ON career_jobpost USING GIN (search_vector)"
+        )
+
+
+def drop_job_text_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS career_jobpost_fts")
+    elif vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS jobpost_search_idx")
+        schema_editor.execute("ALTER TABLE career_jobpost DROP COLUMN IF EXISTS search_vector")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career', '0009_companywiki_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobpost',
+            index=models.Index(fields=['is_active', 'deadline', 'package_lpa'], name='job_active_deadline_pkg_idx'),
+        ),
+        migrations.RunPython(create_job_text_index, drop_job_text_index),
+    ]
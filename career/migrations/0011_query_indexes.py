@@ -0,0 +1,43 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career', '0010_job_search'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='application',
+            name='job',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='applications', to='career.jobpost'),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['student', '-applied_at'], name='app_student_applied_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['job', 'status'], name='app_job_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='companywiki',
+            index=models.Index(fields=['-year', '-created_at'], name='wiki_year_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobpost',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-posted_at', 'deadline'], name='job_open_posted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobupdate',
+            index=models.Index(fields=['job', '-created_at'], name='jobupdate_job_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentprofile',
+            index=models.Index(fields=['branch', 'current_cgpa'], name='profile_branch_cgpa_idx'),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:50
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def count_existing(apps, schema_editor):
+    JobPost = apps.get_model('career', 'JobPost')
+    Application = apps.get_model('career', 'Application')
+    PlacementTotals = apps.get_model('career', 'PlacementTotals')
+    recounted = JobPost.objects.order_by().annotate(
+        total=Count('applications'),
+        applied=Count('applications', filter=Q(applications__status='Applied')),
+        shortlisted=Count('applications', filter=Q(applications__status='Shortlisted')),
+        rejected=Count('applications', filter=Q(applications__status='Rejected')),
+    )
+    for job in recounted.filter(total__gt=0):
+        JobPost.objects.filter(pk=job.pk).update(
+            application_count=job.total, applied_count=job.applied,
+            shortlisted_count=job.shortlisted, rejected_count=job.rejected,
+        )
+    PlacementTotals.objects.create(
+        pk=1,
+        jobs=JobPost.objects.count(),
+        active_jobs=JobPost.objects.filter(is_active=True).count(),
+        applications=Application.objects.count(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career', '0011_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlacementTotals',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jobs', models.IntegerField(default=0)),
+                ('active_jobs', models.IntegerField(default=0)),
+                ('applications', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'placement totals',
+            },
+        ),
+        migrations.AddField(
+            model_name='jobpost',
+            name='application_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobpost',
+            name='applied_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobpost',
+            name='rejected_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobpost',
+            name='shortlisted_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_existing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career', '0012_job_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeasonCompanySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season', models.PositiveSmallIntegerField(help_text='Year the season starts in')),
+                ('company_name', models.CharField(max_length=200)),
+                ('jobs', models.IntegerField(default=0)),
+                ('applications', models.IntegerField(default=0)),
+                ('offers', models.IntegerField(default=0)),
+                ('max_package', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-season', '-offers', 'company_name'],
+                'unique_together': {('season', 'company_name')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SeasonBranchSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season', models.PositiveSmallIntegerField(help_text='Year the season starts in')),
+                ('branch', models.CharField(choices=[('CSE', 'Computer Science and Engineering'), ('ECE', 'Electronics and Communication Engineering'), ('EEE', 'Electrical and Electronics Engineering'), ('ME', 'Mechanical Engineering'), ('CE', 'Civil Engineering'), ('IT', 'Information Technology'), ('OTHER', 'Other')], max_length=10)),
+                ('students', models.IntegerField(default=0, help_text='Students who applied to a job this season')),
+                ('placed', models.IntegerField(default=0, help_text='Students with at least one offer')),
+                ('offers', models.IntegerField(default=0)),
+                ('median_package', models.FloatField(blank=True, help_text='Median package of offers, in LPA', null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-season', 'branch'],
+                'unique_together': {('season', 'branch')},
+            },
+        ),
+    ]
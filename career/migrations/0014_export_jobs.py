@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:00
+
+import career.models
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career', '0013_season_summaries'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('format', models.CharField(choices=[('zip', 'ZIP of per-job CSVs'), ('csv', 'Combined CSV'), ('xlsx', 'Combined XLSX')], default='zip', max_length=4)),
+                ('posted_from', models.DateField(blank=True, help_text='Jobs posted on or after this date', null=True)),
+                ('posted_to', models.DateField(blank=True, help_text='Jobs posted on or before this date', null=True)),
+                ('company', models.CharField(blank=True, help_text='Only companies whose name contains this', max_length=200)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('total_jobs', models.PositiveIntegerField(default=0)),
+                ('processed_jobs', models.PositiveIntegerField(default=0)),
+                ('rows_written', models.PositiveIntegerField(default=0)),
+                ('file', models.FileField(blank=True, upload_to=career.models.export_upload_path)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career', '0014_export_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='ats_job_sha256',
+            field=models.CharField(blank=True, help_text='Hash of the job description the ATS score was computed against', max_length=64),
+        ),
+    ]
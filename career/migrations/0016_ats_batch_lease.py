@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career', '0015_application_ats_job_sha256'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='atsscanbatch',
+            name='lease_until',
+            field=models.DateTimeField(blank=True, help_text='A running batch whose lease has passed is reclaimed by another worker', null=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career', '0016_ats_batch_lease'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['job', '-applied_at', '-id'], name='app_job_applied_idx'),
+        ),
+    ]
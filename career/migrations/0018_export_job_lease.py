@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career', '0017_application_job_applied_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportjob',
+            name='lease_until',
+            field=models.DateTimeField(blank=True, help_text='A running export whose lease has passed is reclaimed by another worker', null=True),
+        ),
+    ]
@@ -1,5 +1,9 @@
+import uuid
+
 from django.db import models
+from django.db.models import BooleanField, Exists, ExpressionWrapper, F, OuterRef, Q
 from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
@@ -51,13 +55,71 @@ class StudentProfile(models.Model):
         help_text="Number of active backlogs"
     )
     resume = models.FileField(upload_to='resumes/', blank=True, null=True)
+    resume_text = models.TextField(blank=True, editable=False, help_text="Text extracted from the resume PDF")
+    resume_sha256 = models.CharField(max_length=64, blank=True, editable=False, help_text="SHA-256 of the extracted resume file")
     skills = models.TextField(blank=True, help_text="Comma-separated skills")
     linkedin_url = models.URLField(blank=True, null=True)
     
+    class Meta:
+        indexes = [
+            # New-job alert audience: branch list plus a CGPA floor
+            models.Index(fields=['branch', 'current_cgpa'], name='profile_branch_cgpa_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.user.username} - {self.branch}"
 
 
+def branch_bit(branch):
+    """Returns the bitmask bit for a branch code (0 for unknown codes)"""
+    # Bit positions follow BRANCH_CHOICES order, so new branches must be appended
+    for index, (code, _label) in enumerate(StudentProfile.BRANCH_CHOICES):
+        if code == branch:
+            return 1 << index
+    return 0
+
+
+def branch_mask(branches):
+    """Returns the combined bitmask for an iterable of branch codes"""
+    mask = 0
+    for branch in branches:
+        mask |= branch_bit(branch)
+    return mask
+
+
+def branches_in_mask(mask):
+    """Returns the branch codes whose bits are set in a bitmask"""
+    return [code for code, _label in StudentProfile.BRANCH_CHOICES if mask & branch_bit(code)]
+
+
+class JobPostQuerySet(models.QuerySet):
+    """QuerySet with eligibility helpers evaluated in the database"""
+
+    def open(self):
+        """Active jobs whose deadline has not passed"""
+        return self.filter(is_active=True, deadline__gte=timezone.now())
+
+    def for_branch(self, branch):
+        """Jobs open to a branch code"""
+        return self.alias(
+            branch_hit=F('eligible_branch_mask').bitand(branch_bit(branch)),
+        ).filter(branch_hit__gt=0)
+
+    def eligible_for(self, student_profile):
+        """Annotate each job with is_eligible and has_applied for a student"""
+        return self.alias(
+            branch_match=F('eligible_branch_mask').bitand(branch_bit(student_profile.branch)),
+        ).annotate(
+            is_eligible=ExpressionWrapper(
+                Q(min_cgpa_required__lte=student_profile.current_cgpa) & Q(branch_match__gt=0),
+                output_field=BooleanField(),
+            ),
+            has_applied=Exists(
+                Application.objects.filter(job=OuterRef('pk'), student_id=student_profile.user_id)
+            ),
+        )
+
+
 class JobPost(models.Model):
     """Job posting by admin/T&P Cell"""
     company_name = models.CharField(max_length=200)
@@ -74,16 +136,58 @@ class JobPost(models.Model):
         max_length=500,
         help_text="Comma-separated branch codes (e.g., CSE,ECE,IT)"
     )
+    eligible_branch_mask = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Bitmask of eligible branches, derived from eligible_branches"
+    )
     deadline = models.DateTimeField()
     job_description = models.TextField()
     posted_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
+    # Applicant counts kept current by career/counters.py
+    application_count = models.IntegerField(default=0, editable=False)
+    applied_count = models.IntegerField(default=0, editable=False)
+    shortlisted_count = models.IntegerField(default=0, editable=False)
+    rejected_count = models.IntegerField(default=0, editable=False)
+    COUNTER_FIELDS = ('application_count', 'applied_count', 'shortlisted_count', 'rejected_count')
+
+    objects = JobPostQuerySet.as_manager()
     
     class Meta:
         ordering = ['-posted_at']
+        indexes = [
+            # Open-job filters and the job search sorts
+            models.Index(fields=['is_active', 'deadline', 'package_lpa'], name='job_active_deadline_pkg_idx'),
+            # Open jobs newest first (student dashboard); closed jobs stay out of the index
+            models.Index(fields=['-posted_at', 'deadline'], condition=Q(is_active=True), name='job_open_posted_idx'),
+        ]
     
     def __str__(self):
         return f"{self.company_name} - {self.role}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Stored values, so signals can tell when a save (de)activates, renames or reprices the job
+        instance._loaded_is_active = instance.__dict__.get('is_active')
+        instance._loaded_company_name = instance.__dict__.get('company_name')
+        instance._loaded_package_lpa = instance.__dict__.get('package_lpa')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Keep the bitmask in sync with the comma-separated branch list
+        self.eligible_branch_mask = branch_mask(self.get_eligible_branches_list())
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'eligible_branches' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'eligible_branch_mask'}
+        elif update_fields is None and not self._state.adding and not kwargs.get('force_insert'):
+            # Counters may have moved since this row was loaded; only their F() updates write them
+            skipped = {*self.COUNTER_FIELDS, *self.get_deferred_fields()}
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields if not f.primary_key and f.attname not in skipped
+            ]
+        super().save(*args, **kwargs)
     
     def get_eligible_branches_list(self):
         """Returns list of eligible branches"""
@@ -96,8 +200,7 @@ class JobPost(models.Model):
             return False
         
         # Check branch
-        eligible_branches = self.get_eligible_branches_list()
-        if student_profile.branch not in eligible_branches:
+        if not self.eligible_branch_mask & branch_bit(student_profile.branch):
             return False
         
         return True
@@ -112,17 +215,38 @@ class Application(models.Model):
     ]
     
     student = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='applications')
-    job = models.ForeignKey(JobPost, on_delete=models.CASCADE, related_name='applications')
+    # Lookups by job use the composite indexes below, so the FK needs no index of its own
+    job = models.ForeignKey(JobPost, on_delete=models.CASCADE, related_name='applications', db_index=False)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Applied')
     applied_at = models.DateTimeField(auto_now_add=True)
+    ats_score = models.PositiveSmallIntegerField(blank=True, null=True, help_text="Latest ATS match score (0-100)")
+    ats_keywords = models.CharField(max_length=255, blank=True, help_text="Missing keywords from the latest ATS scan")
+    ats_resume_sha256 = models.CharField(max_length=64, blank=True, help_text="Hash of the resume the ATS score was computed from")
+    ats_job_sha256 = models.CharField(max_length=64, blank=True, help_text="Hash of the job description the ATS score was computed against")
+    ats_scanned_at = models.DateTimeField(blank=True, null=True)
     
     class Meta:
         unique_together = ['student', 'job']
         ordering = ['-applied_at']
+        indexes = [
+            # A student's applications, newest first
+            models.Index(fields=['student', '-applied_at'], name='app_student_applied_idx'),
+            # Applicants of a job, optionally by status
+            models.Index(fields=['job', 'status'], name='app_job_status_idx'),
+            # Applicant exports seek through a job's applications by (applied_at, id), newest first
+            models.Index(fields=['job', '-applied_at', '-id'], name='app_job_applied_idx'),
+        ]
     
     def __str__(self):
         return f"{self.student.username} - {self.job.company_name} ({self.status})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Stored status, so the counters signal can move a changed application between status counts
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
 
 class JobUpdate(models.Model):
     """Updates posted by T&P cell for a specific job"""
@@ -132,11 +256,104 @@ class JobUpdate(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['job', '-created_at'], name='jobupdate_job_created_idx'),
+        ]
 
     def __str__(self):
         return f"Update for {self.job.role} - {self.created_at.date()}"
 
 
+class ATSScanBatch(models.Model):
+    """Bulk ATS scan of every applicant to a job, run by the run_ats_batches worker"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    job = models.ForeignKey(JobPost, on_delete=models.CASCADE, related_name='ats_batches')
+    requested_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, blank=True, null=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    lease_until = models.DateTimeField(
+        blank=True, null=True, help_text="A running batch whose lease has passed is reclaimed by another worker"
+    )
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"ATS scan for {self.job} ({self.status})"
+
+    @property
+    def completed(self):
+        return self.processed + self.skipped + self.failed
+
+    @property
+    def progress_percent(self):
+        if not self.total:
+            return 100 if self.status == 'done' else 0
+        return min(100, round(self.completed * 100 / self.total))
+
+
+def export_upload_path(instance, filename):
+    # A random directory per export so files under MEDIA_URL cannot be guessed
+    return f'exports/{uuid.uuid4().hex}/{filename}'
+
+
+class ExportJob(models.Model):
+    """Applicant export across many jobs, written to a file by the run_exports worker"""
+    FORMAT_CHOICES = [
+        ('zip', 'ZIP of per-job CSVs'),
+        ('csv', 'Combined CSV'),
+        ('xlsx', 'Combined XLSX'),
+    ]
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    requested_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, blank=True, null=True)
+    format = models.CharField(max_length=4, choices=FORMAT_CHOICES, default='zip')
+    posted_from = models.DateField(blank=True, null=True, help_text="Jobs posted on or after this date")
+    posted_to = models.DateField(blank=True, null=True, help_text="Jobs posted on or before this date")
+    company = models.CharField(max_length=200, blank=True, help_text="Only companies whose name contains this")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    total_jobs = models.PositiveIntegerField(default=0)
+    processed_jobs = models.PositiveIntegerField(default=0)
+    rows_written = models.PositiveIntegerField(default=0)
+    file = models.FileField(upload_to=export_upload_path, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    lease_until = models.DateTimeField(
+        blank=True, null=True, help_text="A running export whose lease has passed is reclaimed by another worker"
+    )
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.get_format_display()} export ({self.status})"
+
+    @property
+    def progress_percent(self):
+        if not self.total_jobs:
+            return 100 if self.status == 'done' else 0
+        return min(100, round(self.processed_jobs * 100 / self.total_jobs))
+
+
 class CompanyWiki(models.Model):
     """Company interview experience and tips"""
     company_name = models.CharField(max_length=200)
@@ -147,6 +364,9 @@ class CompanyWiki(models.Model):
     
     class Meta:
         ordering = ['-year', '-created_at']
+        indexes = [
+            models.Index(fields=['-year', '-created_at'], name='wiki_year_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.company_name} - {self.year}"
@@ -165,3 +385,128 @@ class UserPreference(models.Model):
     
     def __str__(self):
         return f"{self.user.username}'s Preferences"
+
+
+class PlacementTotals(models.Model):
+    """Site-wide totals for the admin dashboard; a single row kept current by career/counters.py"""
+    jobs = models.IntegerField(default=0)
+    active_jobs = models.IntegerField(default=0)
+    applications = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'placement totals'
+
+    def __str__(self):
+        return f"{self.jobs} jobs ({self.active_jobs} active), {self.applications} applications"
+
+
+class SeasonBranchSummary(models.Model):
+    """Placement outcomes of one branch in one season; maintained by career/seasons.py"""
+    season = models.PositiveSmallIntegerField(help_text="Year the season starts in")
+    branch = models.CharField(max_length=10, choices=StudentProfile.BRANCH_CHOICES)
+    students = models.IntegerField(default=0, help_text="Students who applied to a job this season")
+    placed = models.IntegerField(default=0, help_text="Students with at least one offer")
+    offers = models.IntegerField(default=0)
+    median_package = models.FloatField(blank=True, null=True, help_text="Median package of offers, in LPA")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['season', 'branch']
+        ordering = ['-season', 'branch']
+
+    def __str__(self):
+        return f"{self.branch} {self.season}: {self.placed}/{self.students} placed"
+
+    @property
+    def unplaced(self):
+        return self.students - self.placed
+
+
+class SeasonCompanySummary(models.Model):
+    """Applications and offers for one company in one season; maintained by career/seasons.py"""
+    season = models.PositiveSmallIntegerField(help_text="Year the season starts in")
+    company_name = models.CharField(max_length=200)
+    jobs = models.IntegerField(default=0)
+    applications = models.IntegerField(default=0)
+    offers = models.IntegerField(default=0)
+    max_package = models.FloatField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['season', 'company_name']
+        ordering = ['-season', '-offers', 'company_name']
+
+    def __str__(self):
+        return f"{self.company_name} {self.season}: {self.offers}/{self.applications} offers"
+
+    @property
+    def conversion_percent(self):
+        return round(self.offers * 100 / self.applications, 1) if self.applications else 0
+
+
+class OutboundEmail(models.Model):
+    """Email queued by signals/views and delivered by the send_queued_emails worker"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('dead', 'Dead'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    recipients = models.JSONField(default=list, help_text="List of recipient addresses")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} ({self.status})"
+
+
+class ChatSession(models.Model):
+    """Server-side chatbot conversation with bounded history
+
+    `context` caches the student context system prompt for the session and
+    is cleared whenever the student's profile changes. Messages beyond the
+    recent window are folded into `summary`.
+    """
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='chat_sessions')
+    context = models.TextField(blank=True)
+    summary = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-updated_at']
+
+    def __str__(self):
+        return f"Chat with {self.user.username} ({self.created_at.date()})"
+
+
+class ChatMessage(models.Model):
+    """One turn of a ChatSession"""
+    ROLE_CHOICES = [
+        ('user', 'User'),
+        ('assistant', 'Assistant'),
+    ]
+
+    session = models.ForeignKey(ChatSession, on_delete=models.CASCADE, related_name='messages')
+    role = models.CharField(max_length=10, choices=ROLE_CHOICES)
+    content = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+
+    def __str__(self):
+        return f"{self.role}: {self.content[:50]}"
@@ -0,0 +1,159 @@
+"""
+Cached page fragments for the student job pages, the wiki and the admin dashboard.
+
+A student's job card (dashboard) and job detail body depend only on the job
+and on whether the student is eligible and has applied, which the job
+queries already compute in SQL. They are cached under the job's version
+and those two flags, so every student with the same outcome shares an
+entry. The wiki browse pages are cached under a wiki-wide version, and the
+admin dashboard stats as one entry.
+
+Versions are stamps kept in the cache. Signals replace a job's stamp when
+it or one of its updates is saved or deleted, and the wiki stamp when an
+entry changes, so stale fragments are never read again and expire after
+PAGE_CACHE_TTL; the admin stats entry is deleted on job and application
+changes. Hits and misses per fragment are counted for the admin dashboard.
+Because invalidation goes through the cache, every worker process must
+share it; the career.E001 system check (checks.py) enforces that.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .counters import totals
+from .models import JobPost
+
+FRAGMENTS = ['job_card', 'job_detail', 'wiki_list', 'admin_stats']
+WIKI_VERSION_KEY = 'page-cache:wiki-version'
+ADMIN_STATS_KEY = 'page-cache:admin-stats'
+
+
+def _job_version_key(job_id):
+    return f'page-cache:job-version:{job_id}'
+
+
+def _stamp():
+    return time.time_ns()
+
+
+def _count(fragment, hits=0, misses=0):
+    for outcome, delta in [('hits', hits), ('misses', misses)]:
+        if not delta:
+            continue
+        key = f'page-cache:stats:{fragment}:{outcome}'
+        # add() is a no-op when the counter exists; incr() is atomic on shared backends
+        cache.add(key, 0, timeout=None)
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            cache.set(key, delta, timeout=None)
+
+
+def job_versions(job_ids):
+    """Current version stamp of each job, starting a fresh one where none is cached"""
+    keys = {job_id: _job_version_key(job_id) for job_id in job_ids}
+    found = cache.get_many(keys.values())
+    # A fresh stamp rather than a fixed first version, so an evicted stamp never revives old fragments
+    fresh = {key: _stamp() for key in keys.values() if key not in found}
+    if fresh:
+        cache.set_many(fresh, timeout=None)
+        found.update(fresh)
+    return {job_id: found[key] for job_id, key in keys.items()}
+
+
+def bump_job(job_id):
+    """Retire every cached fragment of a job"""
+    cache.set(_job_version_key(job_id), _stamp(), timeout=None)
+
+
+def bump_wiki():
+    """Retire every cached wiki list page"""
+    cache.set(WIKI_VERSION_KEY, _stamp(), timeout=None)
+
+
+def _outcome(job):
+    return f"{int(bool(getattr(job, 'is_eligible', False)))}{int(bool(getattr(job, 'has_applied', False)))}"
+
+
+def fragment(name, key, render):
+    """Cached HTML under `key`, rendering and storing it with `render()` on a miss"""
+    html = cache.get(key)
+    if html is None:
+        html = render()
+        cache.set(key, html, timeout=settings.PAGE_CACHE_TTL)
+        _count(name, misses=1)
+    else:
+        _count(name, hits=1)
+    return mark_safe(html)
+
+
+def job_cards(jobs):
+    """(job, card HTML) for each job of an eligible_for() queryset, with one cache read for them all"""
+    jobs = list(jobs)
+    versions = job_versions([job.pk for job in jobs])
+    keys = [f'page-cache:job-card:{job.pk}:{versions[job.pk]}:{_outcome(job)}' for job in jobs]
+    found = cache.get_many(keys)
+    rendered = {}
+    for job, key in zip(jobs, keys):
+        if key not in found:
+            rendered[key] = render_to_string('career/job_card.html', {'job': job})
+    if rendered:
+        cache.set_many(rendered, timeout=settings.PAGE_CACHE_TTL)
+    _count('job_card', hits=len(jobs) - len(rendered), misses=len(rendered))
+    return [(job, mark_safe(found.get(key) or rendered[key])) for job, key in zip(jobs, keys)]
+
+
+def job_detail_body(job, render):
+    """A student's job detail body for an eligible_for() job"""
+    version = job_versions([job.pk])[job.pk]
+    return fragment('job_detail', f'page-cache:job-detail:{job.pk}:{version}:{_outcome(job)}', render)
+
+
+def wiki_list(page_number, render):
+    """One page of the wiki browse list"""
+    version = cache.get_or_set(WIKI_VERSION_KEY, _stamp, timeout=None)
+    return fragment('wiki_list', f'page-cache:wiki-list:{version}:{page_number}', render)
+
+
+def admin_stats():
+    """Site totals and the latest jobs for the admin dashboard"""
+    stats = cache.get(ADMIN_STATS_KEY)
+    if stats is None:
+        placement_totals = totals()
+        stats = {
+            'total_jobs': placement_totals.jobs,
+            'active_jobs': placement_totals.active_jobs,
+            'total_applications': placement_totals.applications,
+            'jobs': list(JobPost.objects.all()[:10]),
+        }
+        cache.set(ADMIN_STATS_KEY, stats, timeout=settings.PAGE_CACHE_TTL)
+        _count('admin_stats', misses=1)
+    else:
+        _count('admin_stats', hits=1)
+    return stats
+
+
+def invalidate_admin_stats():
+    cache.delete(ADMIN_STATS_KEY)
+
+
+def cache_stats():
+    """Hit/miss counters for each cached fragment"""
+    counts = cache.get_many(
+        [f'page-cache:stats:{name}:{outcome}' for name in FRAGMENTS for outcome in ('hits', 'misses')]
+    )
+    stats = []
+    for name in FRAGMENTS:
+        hits = counts.get(f'page-cache:stats:{name}:hits', 0)
+        misses = counts.get(f'page-cache:stats:{name}:misses', 0)
+        total = hits + misses
+        stats.append({
+            'name': name.replace('_', ' '),
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / total if total else 0.0,
+        })
+    return stats
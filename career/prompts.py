@@ -0,0 +1,167 @@
+"""
+Token-budgeted prompt building for the AI features.
+
+Extracted PDF text is noisy: ligatures, bullet glyphs, hyphenated line
+breaks, page numbers, repeated headers and runs of whitespace all cost
+tokens without telling the model anything. The helpers here normalise
+that text, drop duplicate lines, and fit it into a token budget measured
+with a local tokenizer estimate (no API call).
+
+resume_excerpt() splits a resume into its sections and fills the budget
+with the most useful ones first (skills, experience, projects) instead of
+cutting the document at a fixed character offset. measured() wraps a
+finished prompt with its token count and logs it, so prompt size can be
+tracked per feature.
+"""
+import logging
+import re
+import unicodedata
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+BULLET_RE = re.compile(r"^[•‣⁃∙▪▫●○◦■□►▶✓✔➢·*-]+\s*")
+PAGE_NUMBER_RE = re.compile(r"^(page\s*)?\d{1,3}(\s*(of|/)\s*\d{1,3})?$", re.IGNORECASE)
+HYPHEN_BREAK_RE = re.compile(r"(\w)-\n(\w)")
+SPACE_RE = re.compile(r"[ \t ]+")
+
+# Section headings and how useful each section is to the model (lower is more useful)
+SECTIONS = {
+    'skills': (0, ['skills', 'technical skills', 'key skills', 'core competencies', 'technologies',
+                   'tools', 'tech stack', 'technical proficiency']),
+    'experience': (1, ['experience', 'work experience', 'professional experience', 'internships',
+                       'internship', 'employment', 'work history']),
+    'projects': (2, ['projects', 'academic projects', 'personal projects', 'key projects']),
+    'achievements': (3, ['achievements', 'awards', 'certifications', 'certificates',
+                         'accomplishments', 'publications', 'competitions']),
+    'summary': (4, ['summary', 'objective', 'career objective', 'profile', 'about me', 'about']),
+    'education': (5, ['education', 'academics', 'academic background', 'qualifications']),
+    'other': (7, ['hobbies', 'interests', 'languages', 'references', 'declaration',
+                  'extracurricular activities', 'activities', 'personal details']),
+}
+PREAMBLE_PRIORITY = 6
+HEADINGS = {
+    heading: name for name, (_priority, headings) in SECTIONS.items() for heading in headings
+}
+
+# First pass caps each section at this share of the budget so one long
+# section cannot crowd out the rest; the second pass fills what is left
+SECTION_SHARE = 0.4
+
+
+def count_tokens(text):
+    """Local estimate of LLM tokens: one per short word or symbol, more for long words"""
+    return sum(1 + (len(piece) - 1) // 6 for piece in TOKEN_RE.findall(text))
+
+
+def normalise_text(text):
+    """Clean extracted PDF text into deduplicated, whitespace-normalised lines"""
+    text = unicodedata.normalize('NFKC', text)  # also expands ligatures such as "fi"
+    text = HYPHEN_BREAK_RE.sub(r"\1\2", text)
+    lines = []
+    seen = set()
+    for raw in text.splitlines():
+        line = SPACE_RE.sub(' ', raw).strip()
+        bullet = BULLET_RE.match(line)
+        if bullet:
+            line = '- ' + line[bullet.end():]
+        if not line or line == '-' or PAGE_NUMBER_RE.match(line):
+            continue
+        key = re.sub(r'\W+', '', line.lower())
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+    return lines
+
+
+def _heading(line):
+    """Section name if the line looks like a resume heading"""
+    if len(line) > 40:
+        return None
+    key = re.sub(r'[^a-z ]+', '', line.lower()).strip()
+    return HEADINGS.get(key)
+
+
+def split_sections(lines):
+    """Group normalised lines into (section, priority, lines), in document order"""
+    sections = [('preamble', PREAMBLE_PRIORITY, [])]
+    for line in lines:
+        name = _heading(line)
+        if name:
+            sections.append((name, SECTIONS[name][0], []))
+        else:
+            sections[-1][2].append(line)
+    return [section for section in sections if section[2]]
+
+
+@dataclass
+class Excerpt:
+    """Text cut to a token budget, with the sections it kept"""
+    text: str
+    tokens: int
+    sections: list = field(default_factory=list)
+
+
+def _take(lines, budget):
+    """Leading lines that fit in `budget` tokens, and the tokens they use"""
+    taken, used = [], 0
+    for line in lines:
+        cost = count_tokens(line) + 1
+        if used + cost > budget:
+            break
+        taken.append(line)
+        used += cost
+    return taken, used
+
+
+def text_excerpt(text, budget):
+    """Normalised, deduplicated text cut to `budget` tokens at a line boundary"""
+    lines, used = _take(normalise_text(text), budget)
+    return Excerpt('\n'.join(lines), used)
+
+
+def resume_excerpt(text, budget):
+    """The most useful resume sections that fit in `budget` tokens"""
+    sections = sorted(split_sections(normalise_text(text)), key=lambda section: section[1])
+    kept = {name: [] for name, _priority, _lines in sections}
+    remaining = budget
+
+    for share in (SECTION_SHARE, 1.0):
+        for name, _priority, lines in sections:
+            rest = lines[len(kept[name]):]
+            if not rest or remaining <= 0:
+                continue
+            header_cost = 0 if kept[name] else count_tokens(name) + 2
+            allowance = min(remaining, int(budget * share)) - header_cost
+            taken, used = _take(rest, allowance)
+            if taken:
+                kept[name].extend(taken)
+                remaining -= used + header_cost
+
+    blocks = [
+        f"{name.upper()}:\n" + '\n'.join(kept[name]) if name != 'preamble' else '\n'.join(kept[name])
+        for name, _priority, _lines in sections if kept[name]
+    ]
+    return Excerpt('\n\n'.join(blocks), budget - remaining, [name for name in kept if kept[name]])
+
+
+@dataclass
+class Prompt:
+    """A finished prompt and its estimated size"""
+    name: str
+    text: str
+    tokens: int
+    parts: dict
+
+
+def measured(name, text, **parts):
+    """Wrap a finished prompt with its token count and log it; `parts` are token counts per piece"""
+    prompt = Prompt(name, text, count_tokens(text), parts)
+    logger.info(
+        "%s prompt: %d tokens%s", name, prompt.tokens,
+        f" ({', '.join(f'{key} {value}' for key, value in parts.items())})" if parts else "",
+    )
+    return prompt
@@ -0,0 +1,225 @@
+"""
+Resume text extraction for the AI features.
+
+Text is extracted from a student's PDF once, when a new resume is saved,
+and stored on the profile alongside a SHA-256 of the file. The ATS
+scanner and chatbot read the stored text instead of re-parsing the PDF
+on every request.
+
+Each parse runs in its own short-lived process, at most
+RESUME_PARSE_WORKERS at a time, so a huge or malformed PDF cannot pin a
+web worker: uploads are capped by byte size and page count, extraction
+stops once the prompt text budget is filled, and callers get a
+ResumeParseError when a limit is hit or the wall-clock timeout expires.
+Only the process of a parse that times out is killed, so other uploads
+being parsed at the same moment are unaffected. Async views use
+aparse_resume(), which waits for the process from a worker thread.
+"""
+import hashlib
+import io
+import multiprocessing
+import threading
+import time
+from dataclasses import dataclass
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from pypdf import PdfReader
+
+
+class ResumeParseError(Exception):
+    """Raised when a resume cannot be parsed within the configured limits"""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+@dataclass
+class ParsedResume:
+    """Extracted resume text and how much of the document was read"""
+    text: str
+    pages_read: int
+    page_count: int
+
+    @property
+    def truncated(self):
+        return self.pages_read < self.page_count
+
+
+_slots = None
+_slots_lock = threading.Lock()
+
+
+def _get_slots():
+    """Semaphore bounding how many parse processes run at once"""
+    global _slots
+    with _slots_lock:
+        if _slots is None:
+            _slots = threading.BoundedSemaphore(settings.RESUME_PARSE_WORKERS)
+        return _slots
+
+
+def _extract(data, max_pages, max_chars):
+    """Extract text page by page until the char budget is met"""
+    try:
+        reader = PdfReader(io.BytesIO(data))
+        page_count = len(reader.pages)
+    except Exception as e:
+        return {'error': 'unreadable', 'message': f'Could not read PDF: {e}'}
+    if page_count > max_pages:
+        return {
+            'error': 'too_many_pages',
+            'message': f'Resume has {page_count} pages; the limit is {max_pages}.',
+        }
+
+    parts = []
+    length = 0
+    pages_read = 0
+    try:
+        for page in reader.pages:
+            text = page.extract_text() or ""
+            parts.append(text)
+            length += len(text)
+            pages_read += 1
+            if length >= max_chars:
+                break
+    except Exception as e:
+        return {'error': 'unreadable', 'message': f'Could not read PDF: {e}'}
+    return {'text': "".join(parts)[:max_chars], 'pages_read': pages_read, 'page_count': page_count}
+
+
+def _extract_to(connection, data, max_pages, max_chars):
+    """Parse process: send _extract()'s result back to the parent"""
+    try:
+        connection.send(_extract(data, max_pages, max_chars))
+    finally:
+        connection.close()
+
+
+def _extract_isolated(data, max_chars):
+    """Run _extract() in a process of its own, killing just that process on timeout"""
+    deadline = time.monotonic() + settings.RESUME_PARSE_TIMEOUT
+    slots = _get_slots()
+    if not slots.acquire(timeout=settings.RESUME_PARSE_TIMEOUT):
+        raise ResumeParseError('timeout', 'Resume took too long to process.')
+    try:
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(
+            target=_extract_to, args=(sender, data, settings.RESUME_MAX_PAGES, max_chars), daemon=True,
+        )
+        process.start()
+        sender.close()
+        try:
+            if not receiver.poll(max(0.0, deadline - time.monotonic())):
+                process.kill()
+                raise ResumeParseError('timeout', 'Resume took too long to process.')
+            try:
+                return receiver.recv()
+            except EOFError:
+                raise ResumeParseError('unreadable', 'Could not read PDF: the parser stopped unexpectedly.')
+        finally:
+            receiver.close()
+            process.join()
+    finally:
+        slots.release()
+
+
+def _read_limited(fileobj):
+    fileobj.seek(0)
+    data = fileobj.read(settings.RESUME_MAX_BYTES + 1)
+    fileobj.seek(0)
+    if len(data) > settings.RESUME_MAX_BYTES:
+        raise ResumeParseError(
+            'too_large', f'Resume is larger than {settings.RESUME_MAX_BYTES // (1024 * 1024)} MB.'
+        )
+    return data
+
+
+def _parsed(result):
+    if 'error' in result:
+        raise ResumeParseError(result['error'], result['message'])
+    return ParsedResume(**result)
+
+
+def parse_resume(fileobj, max_chars=None):
+    """Extract resume text within the configured size, page and time limits"""
+    max_chars = max_chars or settings.RESUME_TEXT_MAX_CHARS
+    data = _read_limited(fileobj)
+
+    if settings.RESUME_PARSE_WORKERS:
+        result = _extract_isolated(data, max_chars)
+    else:
+        result = _extract(data, settings.RESUME_MAX_PAGES, max_chars)
+
+    return _parsed(result)
+
+
+async def aparse_resume(fileobj, max_chars=None):
+    """parse_resume() for async views: waits in a worker thread instead of blocking the event loop"""
+    max_chars = max_chars or settings.RESUME_TEXT_MAX_CHARS
+    data = _read_limited(fileobj)
+
+    if settings.RESUME_PARSE_WORKERS:
+        result = await sync_to_async(_extract_isolated, thread_sensitive=False)(data, max_chars)
+    else:
+        # No parse processes configured: still keep pypdf off the event loop
+        result = await sync_to_async(_extract, thread_sensitive=False)(
+            data, settings.RESUME_MAX_PAGES, max_chars
+        )
+
+    return _parsed(result)
+
+
+def file_sha256(fileobj):
+    """Returns the hex SHA-256 of a file object, leaving it rewound"""
+    digest = hashlib.sha256()
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(64 * 1024), b''):
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def refresh_resume_text(profile, fileobj=None, parsed=None):
+    """Re-extract the profile's resume text if the file content changed
+
+    Sets resume_text and resume_sha256 on the profile without saving it and
+    returns True when they changed. `fileobj` defaults to the stored resume;
+    `parsed` may carry a ParsedResume the caller already produced for it.
+    """
+    if not profile.resume and fileobj is None:
+        changed = bool(profile.resume_sha256 or profile.resume_text)
+        profile.resume_text = ''
+        profile.resume_sha256 = ''
+        return changed
+
+    if fileobj is None:
+        with profile.resume.open('rb') as stored:
+            return _refresh_from(profile, stored, parsed)
+    return _refresh_from(profile, fileobj, parsed)
+
+
+def _refresh_from(profile, fileobj, parsed):
+    sha256 = file_sha256(fileobj)
+    if sha256 == profile.resume_sha256:
+        return False
+    try:
+        profile.resume_text = (parsed or parse_resume(fileobj)).text
+    except ResumeParseError:
+        # Remember the hash so an unreadable file is not re-parsed on every request
+        profile.resume_text = ''
+    profile.resume_sha256 = sha256
+    return True
+
+
+def cached_resume_text(profile):
+    """Returns the stored resume text, backfilling profiles saved before caching"""
+    if profile.resume and not profile.resume_sha256:
+        try:
+            if refresh_resume_text(profile):
+                profile.save(update_fields=['resume_text', 'resume_sha256'])
+        except (OSError, ValueError):
+            return ''
+    return profile.resume_text
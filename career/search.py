@@ -0,0 +1,372 @@
+"""
+Search for the company wiki and the job board.
+
+CompanyWiki entries are indexed on company name, interview questions and
+senior tips, and JobPosts on company, role and description, each with
+per-column weights. The indexes live outside the ORM and are created by
+migrations 0009 and 0010:
+
+- SQLite: an FTS5 table (<table>_fts) ranked with bm25()
+- PostgreSQL: a weighted search_vector tsvector column with a GIN index,
+  ranked with ts_rank_cd()
+- anything else: icontains over the indexed columns
+
+Signals keep the indexes current on every save and delete; the
+rebuild_search_index command rebuilds them from scratch. Wiki results come
+back as a lazy WikiSearchResults that Paginator can page through, so only
+one page of entries is ever loaded.
+
+Job search combines the text index with filters on package, branch,
+deadline and eligibility, pages with a signed keyset cursor, and computes
+its facet counts in a single aggregate query.
+"""
+import re
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+
+from django.core import signing
+from django.db import connection, transaction
+from django.db.models import Count, F, Q
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from .models import CompanyWiki, JobPost, StudentProfile, branch_bit
+
+WORD_RE = re.compile(r'[^\W_]+')
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """A table's full-text index: the text columns and their relative weights"""
+    model: type
+    columns: tuple
+    sqlite_weights: tuple  # bm25() weight per column
+    pg_weights: tuple  # setweight() class per column, 'A' highest
+
+    @property
+    def table(self):
+        return self.model._meta.db_table
+
+    @property
+    def fts_table(self):
+        return f'{self.table}_fts'
+
+    def pg_vector(self):
+        return ' || '.join(
+            f"setweight(to_tsvector('english', coalesce({column}, '')), '{weight}')"
+            for column, weight in zip(self.columns, self.pg_weights)
+        )
+
+
+WIKI_INDEX = IndexSpec(
+    CompanyWiki, ('company_name', 'interview_questions', 'senior_tips'), (10.0, 2.0, 1.0), ('A', 'B', 'C'),
+)
+JOB_INDEX = IndexSpec(
+    JobPost, ('company_name', 'role', 'job_description'), (10.0, 10.0, 1.0), ('A', 'A', 'C'),
+)
+
+
+def query_terms(text):
+    """Words of a user query; punctuation and operators are dropped"""
+    return WORD_RE.findall(text.lower())[:16]
+
+
+class SQLiteTextIndex:
+    """SQLite FTS5 index in its own table, keyed by rowid = primary key"""
+
+    def __init__(self, spec):
+        self.spec = spec
+
+    def index(self, obj):
+        columns = ', '.join(self.spec.columns)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.spec.fts_table} WHERE rowid = %s", [obj.pk])
+            cursor.execute(
+                f"INSERT INTO {self.spec.fts_table} (rowid, {columns}) "
+                f"VALUES (%s, {', '.join(['%s'] * len(self.spec.columns))})",
+                [obj.pk] + [getattr(obj, column) for column in self.spec.columns],
+            )
+
+    def remove(self, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.spec.fts_table} WHERE rowid = %s", [pk])
+
+    def rebuild(self):
+        columns = ', '.join(self.spec.columns)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.spec.fts_table}")
+            cursor.execute(
+                f"INSERT INTO {self.spec.fts_table} (rowid, {columns}) "
+                f"SELECT id, {columns} FROM {self.spec.table}"
+            )
+            return cursor.rowcount
+
+    @staticmethod
+    def _match(terms):
+        # Each word as a quoted prefix term, all required
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    def filter(self, queryset, terms):
+        fts = self.spec.fts_table
+        return queryset.filter(pk__in=RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", [self._match(terms)]))
+
+    def count(self, terms):
+        fts = self.spec.fts_table
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {fts} WHERE {fts} MATCH %s", [self._match(terms)])
+            return cursor.fetchone()[0]
+
+    def ranked_ids(self, terms, offset, limit):
+        fts = self.spec.fts_table
+        weights = ', '.join(str(weight) for weight in self.spec.sqlite_weights)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s "
+                f"ORDER BY bm25({fts}, {weights}), rowid DESC LIMIT %s OFFSET %s",
+                [self._match(terms), limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class PostgresTextIndex:
+    """search_vector tsvector column with a GIN index on the table itself"""
+
+    def __init__(self, spec):
+        self.spec = spec
+
+    def index(self, obj):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {self.spec.table} SET search_vector = {self.spec.pg_vector()} WHERE id = %s", [obj.pk]
+            )
+
+    def remove(self, pk):
+        pass  # The vector is deleted with its row
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"UPDATE {self.spec.table} SET search_vector = {self.spec.pg_vector()}")
+            return cursor.rowcount
+
+    @staticmethod
+    def _tsquery(terms):
+        return ' & '.join(f'{term}:*' for term in terms)
+
+    def filter(self, queryset, terms):
+        return queryset.filter(pk__in=RawSQL(
+            f"SELECT id FROM {self.spec.table} WHERE search_vector @@ to_tsquery('english', %s)",
+            [self._tsquery(terms)],
+        ))
+
+    def count(self, terms):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT count(*) FROM {self.spec.table} WHERE search_vector @@ to_tsquery('english', %s)",
+                [self._tsquery(terms)],
+            )
+            return cursor.fetchone()[0]
+
+    def ranked_ids(self, terms, offset, limit):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT id FROM {self.spec.table}, to_tsquery('english', %s) query "
+                "WHERE search_vector @@ query "
+                "ORDER BY ts_rank_cd(search_vector, query) DESC, id DESC LIMIT %s OFFSET %s",
+                [self._tsquery(terms), limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class BasicTextIndex:
+    """Unindexed icontains fallback for other databases"""
+
+    def __init__(self, spec):
+        self.spec = spec
+
+    def index(self, obj):
+        pass
+
+    def remove(self, pk):
+        pass
+
+    def rebuild(self):
+        return self.spec.model.objects.count()
+
+    def filter(self, queryset, terms):
+        for term in terms:
+            condition = Q()
+            for column in self.spec.columns:
+                condition |= Q(**{f'{column}__icontains': term})
+            queryset = queryset.filter(condition)
+        return queryset
+
+    def count(self, terms):
+        return self.filter(self.spec.model.objects.all(), terms).count()
+
+    def ranked_ids(self, terms, offset, limit):
+        matches = self.filter(self.spec.model.objects.all(), terms)
+        return list(matches.values_list('id', flat=True)[offset:offset + limit])
+
+
+def get_index(spec):
+    """Full-text index backend for a table on the default database"""
+    if connection.vendor == 'sqlite':
+        return SQLiteTextIndex(spec)
+    if connection.vendor == 'postgresql':
+        return PostgresTextIndex(spec)
+    return BasicTextIndex(spec)
+
+
+class WikiSearchResults:
+    """Ranked search results that load one slice at a time, for Paginator"""
+
+    def __init__(self, text):
+        self.terms = query_terms(text)
+        self.backend = get_index(WIKI_INDEX)
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            self._count = self.backend.count(self.terms) if self.terms else 0
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        offset = index.start or 0
+        limit = (index.stop if index.stop is not None else self.count()) - offset
+        if not self.terms or limit <= 0:
+            return []
+        ids = self.backend.ranked_ids(self.terms, offset, limit)
+        wikis = CompanyWiki.objects.in_bulk(ids)
+        return [wikis[wiki_id] for wiki_id in ids if wiki_id in wikis]
+
+
+# Job search sorts: (field, descending); id breaks ties so the keyset is unique
+JOB_SORTS = {
+    'deadline': ('deadline', False),
+    'package': ('package_lpa', True),
+    'newest': ('posted_at', True),
+}
+PACKAGE_BANDS = [
+    ('Under 5 LPA', 0, 5),
+    ('5-10 LPA', 5, 10),
+    ('10-20 LPA', 10, 20),
+    ('20+ LPA', 20, None),
+]
+DEADLINE_WINDOWS = [
+    ('Next 7 days', 7),
+    ('Next 30 days', 30),
+]
+CURSOR_SALT = 'career.job-search'
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def filter_jobs(queryset, filters, profile=None):
+    """Apply cleaned JobSearchForm data to a JobPost queryset"""
+    if filters.get('q'):
+        terms = query_terms(filters['q'])
+        if terms:
+            queryset = get_index(JOB_INDEX).filter(queryset, terms)
+    if filters.get('company'):
+        queryset = queryset.filter(company_name__icontains=filters['company'])
+    if filters.get('min_package') is not None:
+        queryset = queryset.filter(package_lpa__gte=filters['min_package'])
+    if filters.get('max_package') is not None:
+        queryset = queryset.filter(package_lpa__lte=filters['max_package'])
+    if filters.get('branch'):
+        queryset = queryset.for_branch(filters['branch'])
+    if filters.get('deadline_after'):
+        queryset = queryset.filter(deadline__gte=_day_start(filters['deadline_after']))
+    if filters.get('deadline_before'):
+        queryset = queryset.filter(deadline__lt=_day_start(filters['deadline_before'] + timedelta(days=1)))
+    if filters.get('eligible_only') and profile is not None:
+        queryset = queryset.for_branch(profile.branch).filter(min_cgpa_required__lte=profile.current_cgpa)
+    return queryset
+
+
+def job_facets(queryset, profile=None):
+    """Counts per package band, branch and deadline window, in one aggregate query"""
+    now = timezone.now()
+    branches = StudentProfile.BRANCH_CHOICES
+    queryset = queryset.alias(**{
+        f'branch_{code.lower()}': F('eligible_branch_mask').bitand(branch_bit(code)) for code, _label in branches
+    })
+
+    aggregates = {'total': Count('id')}
+    for index, (_label, low, high) in enumerate(PACKAGE_BANDS):
+        band = Q(package_lpa__gte=low) & (Q(package_lpa__lt=high) if high is not None else Q())
+        aggregates[f'package_{index}'] = Count('id', filter=band)
+    for code, _label in branches:
+        aggregates[f'branch_{code}'] = Count('id', filter=Q(**{f'branch_{code.lower()}__gt': 0}))
+    for index, (_label, days) in enumerate(DEADLINE_WINDOWS):
+        aggregates[f'deadline_{index}'] = Count('id', filter=Q(deadline__lt=now + timedelta(days=days)))
+    if profile is not None:
+        aggregates['eligible'] = Count('id', filter=(
+            Q(min_cgpa_required__lte=profile.current_cgpa)
+            & Q(**{f'branch_{profile.branch.lower()}__gt': 0})
+        ))
+    counts = queryset.aggregate(**aggregates)
+
+    return {
+        'total': counts['total'],
+        'eligible': counts.get('eligible'),
+        'package': [
+            {'label': label, 'min': low, 'max': high, 'count': counts[f'package_{index}']}
+            for index, (label, low, high) in enumerate(PACKAGE_BANDS)
+        ],
+        'branch': [
+            {'code': code, 'label': label, 'count': counts[f'branch_{code}']} for code, label in branches
+        ],
+        'deadline': [
+            {'label': label, 'days': days, 'count': counts[f'deadline_{index}']}
+            for index, (label, days) in enumerate(DEADLINE_WINDOWS)
+        ],
+    }
+
+
+def encode_cursor(sort, job):
+    field, _descending = JOB_SORTS[sort]
+    value = getattr(job, field)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return signing.dumps([sort, value, job.pk], salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(sort, cursor):
+    """(value, id) of the last row on the previous page, or None if invalid"""
+    try:
+        cursor_sort, value, pk = signing.loads(cursor, salt=CURSOR_SALT)
+    except (signing.BadSignature, ValueError, TypeError):
+        return None
+    if cursor_sort != sort:
+        return None
+    if JOB_SORTS[sort][0] in ('deadline', 'posted_at'):
+        value = datetime.fromisoformat(value)
+    return value, pk
+
+
+def keyset_page(queryset, sort, cursor=None, size=20):
+    """One page of jobs after `cursor`; returns (jobs, next_cursor or None)
+
+    Seeks past the previous page's last (sort value, id) instead of using
+    OFFSET, so deep pages cost the same as the first.
+    """
+    field, descending = JOB_SORTS[sort]
+    position = decode_cursor(sort, cursor) if cursor else None
+    if position is not None:
+        value, pk = position
+        after = 'lt' if descending else 'gt'
+        queryset = queryset.filter(
+            Q(**{f'{field}__{after}': value}) | Q(**{field: value, f'id__{after}': pk})
+        )
+    order = [f'-{field}', '-id'] if descending else [field, 'id']
+    jobs = list(queryset.order_by(*order)[:size + 1])
+    next_cursor = encode_cursor(sort, jobs[size - 1]) if len(jobs) > size else None
+    return jobs[:size], next_cursor
@@ -0,0 +1,250 @@
+"""
+Placement-season summary tables.
+
+A season runs for a year from PLACEMENT_SEASON_START_MONTH, and a job
+belongs to the season it was posted in. A Shortlisted application counts
+as an offer. SeasonBranchSummary holds per-branch outcomes (students who
+applied, placed and unplaced students, offers, median package) and
+SeasonCompanySummary per-company conversion, so the season report never
+touches the applications table.
+
+Applications are applied as F() deltas to the (season, branch) and
+(season, company) rows they touch: a new, changed or deleted application
+adds to or subtracts from the counts, with an indexed look at the
+student's other applications that season to decide whether the student
+(or their placement) is new. The branch median is recomputed only when
+an offer is added or removed, or an offered job's package changes. A job
+change recounts its company, and a deleted job recounts just the
+branches that applied to it once the delete commits. The
+rebuild_season_summaries command recomputes everything, for example
+after bulk imports or when a student changes branch.
+"""
+import statistics
+from collections import defaultdict
+from datetime import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max, Q
+from django.utils import timezone
+
+from .models import Application, JobPost, SeasonBranchSummary, SeasonCompanySummary, StudentProfile
+
+OFFER = 'Shortlisted'
+
+
+def season_of(moment):
+    """Season (its starting year) that a datetime falls in"""
+    moment = timezone.localtime(moment)
+    return moment.year if moment.month >= settings.PLACEMENT_SEASON_START_MONTH else moment.year - 1
+
+
+def season_bounds(season):
+    """[start, end) datetimes of a season"""
+    month = settings.PLACEMENT_SEASON_START_MONTH
+    return (
+        timezone.make_aware(datetime(season, month, 1)),
+        timezone.make_aware(datetime(season + 1, month, 1)),
+    )
+
+
+def season_label(season):
+    return f"{season}-{(season + 1) % 100:02d}"
+
+
+def season_applications(season):
+    start, end = season_bounds(season)
+    return Application.objects.filter(job__posted_at__gte=start, job__posted_at__lt=end).order_by()
+
+
+def season_jobs(season):
+    start, end = season_bounds(season)
+    return JobPost.objects.filter(posted_at__gte=start, posted_at__lt=end).order_by()
+
+
+def _branch_counts(applications):
+    return applications.aggregate(
+        students=Count('student', distinct=True),
+        placed=Count('student', distinct=True, filter=Q(status=OFFER)),
+        offers=Count('id', filter=Q(status=OFFER)),
+    )
+
+
+def _median(values):
+    return statistics.median(values) if values else None
+
+
+def _offer_packages(season, branch):
+    offers = season_applications(season).filter(student__profile__branch=branch, status=OFFER)
+    return list(offers.values_list('job__package_lpa', flat=True))
+
+
+def _add(queryset, **deltas):
+    """Add each non-zero delta to its field in one UPDATE; returns rows updated"""
+    changes = {name: F(name) + delta for name, delta in deltas.items() if delta}
+    return queryset.update(**changes, updated_at=timezone.now())
+
+
+def refresh_branch(season, branch):
+    """Recount one season's outcomes for one branch"""
+    applications = season_applications(season).filter(student__profile__branch=branch)
+    counts = _branch_counts(applications)
+    if not counts['students']:
+        SeasonBranchSummary.objects.filter(season=season, branch=branch).delete()
+        return
+    SeasonBranchSummary.objects.update_or_create(
+        season=season, branch=branch, defaults={**counts, 'median_package': _median(_offer_packages(season, branch))},
+    )
+
+
+def refresh_median(season, branch):
+    """Recompute one branch's median offer package"""
+    SeasonBranchSummary.objects.filter(season=season, branch=branch).update(
+        median_package=_median(_offer_packages(season, branch)), updated_at=timezone.now(),
+    )
+
+
+def _company_counts(season, company_name):
+    jobs = season_jobs(season).filter(company_name=company_name)
+    counts = jobs.aggregate(jobs=Count('id'), max_package=Max('package_lpa'))
+    counts.update(
+        season_applications(season).filter(job__company_name=company_name).aggregate(
+            applications=Count('id'), offers=Count('id', filter=Q(status=OFFER)),
+        )
+    )
+    return counts
+
+
+def refresh_company(season, company_name):
+    """Recount one season's conversion for one company"""
+    counts = _company_counts(season, company_name)
+    if not counts['jobs']:
+        SeasonCompanySummary.objects.filter(season=season, company_name=company_name).delete()
+        return
+    SeasonCompanySummary.objects.update_or_create(season=season, company_name=company_name, defaults=counts)
+
+
+def _has_other_application(application, season, **filters):
+    """Whether the student has another application this season (matching `filters`)"""
+    start, end = season_bounds(season)
+    return Application.objects.filter(
+        student_id=application.student_id, job__posted_at__gte=start, job__posted_at__lt=end, **filters,
+    ).exclude(pk=application.pk).exists()
+
+
+def application_changed(application, old_status, new_status):
+    """Apply an application's create (old_status None), status change or delete (new_status None)"""
+    job = JobPost.objects.filter(pk=application.job_id).values('posted_at', 'company_name').first()
+    if job is None:
+        return
+    season = season_of(job['posted_at'])
+    created, deleted = old_status is None, new_status is None
+    offers = (new_status == OFFER) - (old_status == OFFER)
+
+    company = {'applications': created - deleted, 'offers': offers}
+    if any(company.values()):
+        rows = SeasonCompanySummary.objects.filter(season=season, company_name=job['company_name'])
+        if not _add(rows, **company):
+            refresh_company(season, job['company_name'])
+
+    branch = StudentProfile.objects.filter(user_id=application.student_id).values_list('branch', flat=True).first()
+    if not branch:
+        return
+    deltas = {'offers': offers}
+    # Of two first applications made at once, only the lower id counts the student
+    if created and not _has_other_application(application, season, pk__lt=application.pk):
+        deltas['students'] = 1
+    elif deleted and not _has_other_application(application, season):
+        deltas['students'] = -1
+    if offers and not _has_other_application(application, season, status=OFFER):
+        deltas['placed'] = offers
+    if not any(deltas.values()):
+        return
+    rows = SeasonBranchSummary.objects.filter(season=season, branch=branch)
+    if not _add(rows, **deltas):
+        # No row yet (or one lost to a concurrent delete): count the branch from scratch
+        refresh_branch(season, branch)
+        return
+    if deltas.get('students', 0) < 0:
+        rows.filter(students__lte=0).delete()
+    if offers:
+        refresh_median(season, branch)
+
+
+def applicant_branches(job):
+    """Branches of a job's applicants, noted before a delete takes its applications"""
+    return set(
+        Application.objects.filter(job=job).order_by()
+        .values_list('student__profile__branch', flat=True).distinct()
+    ) - {None}
+
+
+def job_changed(job, old_company_name=None, old_package=None, deleted=False):
+    """Refresh the slices a job's create, edit or delete affects"""
+    season = season_of(job.posted_at)
+    refresh_company(season, job.company_name)
+    if old_company_name and old_company_name != job.company_name:
+        refresh_company(season, old_company_name)
+    if deleted:
+        # Its applications went with it; recount the branches that applied once the delete commits
+        branches = getattr(job, '_applicant_branches', set())
+        transaction.on_commit(lambda: [refresh_branch(season, branch) for branch in branches])
+    elif old_package is not None and old_package != job.package_lpa:
+        # A new package moves the median of branches with offers here
+        branches = (
+            Application.objects.filter(job=job, status=OFFER).order_by()
+            .values_list('student__profile__branch', flat=True).distinct()
+        )
+        for branch in branches:
+            if branch:
+                refresh_median(season, branch)
+
+
+def seasons():
+    """Seasons that have at least one job, newest first"""
+    return sorted({season_of(posted_at) for posted_at in JobPost.objects.datetimes('posted_at', 'month')}, reverse=True)
+
+
+@transaction.atomic
+def rebuild_season(season):
+    """Recompute every summary row of one season from scratch; returns (branch rows, company rows)"""
+    applications = season_applications(season)
+    branch_rows = {
+        row['student__profile__branch']: row
+        for row in applications.exclude(student__profile__isnull=True)
+        .values('student__profile__branch').annotate(
+            students=Count('student', distinct=True),
+            placed=Count('student', distinct=True, filter=Q(status=OFFER)),
+            offers=Count('id', filter=Q(status=OFFER)),
+        )
+    }
+    packages = defaultdict(list)
+    for branch, package in applications.filter(status=OFFER).values_list('student__profile__branch', 'job__package_lpa'):
+        packages[branch].append(package)
+
+    company_rows = {
+        row['company_name']: {**row, 'applications': 0, 'offers': 0}
+        for row in season_jobs(season).values('company_name').annotate(jobs=Count('id'), max_package=Max('package_lpa'))
+    }
+    for row in applications.values('job__company_name').annotate(
+        applications=Count('id'), offers=Count('id', filter=Q(status=OFFER)),
+    ):
+        company_rows[row['job__company_name']].update(applications=row['applications'], offers=row['offers'])
+
+    SeasonBranchSummary.objects.filter(season=season).delete()
+    SeasonCompanySummary.objects.filter(season=season).delete()
+    SeasonBranchSummary.objects.bulk_create(
+        SeasonBranchSummary(
+            season=season, branch=branch, students=row['students'], placed=row['placed'],
+            offers=row['offers'], median_package=_median(packages[branch]),
+        )
+        for branch, row in branch_rows.items()
+    )
+    SeasonCompanySummary.objects.bulk_create(
+        SeasonCompanySummary(
+            season=season, company_name=company_name, jobs=row['jobs'], applications=row['applications'],
+            offers=row['offers'], max_package=row['max_package'],
+        )
+        for company_name, row in company_rows.items()
+    )
+    return len(branch_rows), len(company_rows)
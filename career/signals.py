@@ -1,13 +1,17 @@
-from django.db.models.signals import post_save
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
-from django.core.mail import send_mail
-from django.conf import settings
-from .models import Application, JobPost, StudentProfile, CustomUser, UserPreference
+from .models import Application, ChatSession, CompanyWiki, JobPost, JobUpdate, StudentProfile, CustomUser, UserPreference
+from .audience import resolve_job_audience
+from .context_processors import remember_theme
+from . import analytics, counters, page_cache, seasons
+from .mail import queue_email, queue_mass_email
+from .search import JOB_INDEX, WIKI_INDEX, get_index
 
 @receiver(post_save, sender=Application)
 def send_application_email(sender, instance, created, **kwargs):
     """
-    Signal to send email when an application is created or updated.
+    Signal to queue an email when an application is created or updated.
     """
     student = instance.student
     job = instance.job
@@ -31,13 +35,7 @@ def send_application_email(sender, instance, created, **kwargs):
         Best regards,
         UniCareer Team
         """
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [student.email],
-            fail_silently=False,
-        )
+        queue_email(subject, message, [student.email])
     else:
         # Case 2: Admin updates an application status
         # We assume any update to an existing application is a status change for now
@@ -55,33 +53,17 @@ def send_application_email(sender, instance, created, **kwargs):
         Best regards,
         UniCareer Team
         """
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [student.email],
-            fail_silently=False,
-        )
+        queue_email(subject, message, [student.email])
 
 @receiver(post_save, sender=JobPost)
 def send_new_job_notification(sender, instance, created, **kwargs):
     """
-    Signal to send email to eligible students when a new job is posted.
+    Signal to queue an email to eligible students when a new job is posted.
     """
     if created and instance.is_active:
         # Case 3: A new job is posted
-        # Find eligible students
-        eligible_emails = []
-        profiles = StudentProfile.objects.select_related('user').all()
-        
-        for profile in profiles:
-            # Check preferences
-            if hasattr(profile.user, 'preferences') and not profile.user.preferences.receive_emails:
-                continue
-
-            if instance.is_student_eligible(profile):
-                if profile.user.email:
-                    eligible_emails.append(profile.user.email)
+        # Find eligible, opted-in students in a single query
+        eligible_emails = resolve_job_audience(instance).emails
         
         if eligible_emails:
             subject = f'New Job Alert: {instance.role} at {instance.company_name}'
@@ -101,15 +83,117 @@ def send_new_job_notification(sender, instance, created, **kwargs):
             UniCareer Team
             """
             
-            # Send individual emails to protect privacy (or use bcc)
-            # For simplicity in this demo, we loop. For production, use send_mass_mail or BCC.
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                eligible_emails,
-                fail_silently=False,
-            )
+            queue_mass_email(subject, message, eligible_emails)
+
+
+@receiver(post_save, sender=Application)
+def count_application(sender, instance, created, **kwargs):
+    """Keep the job's applicant counts, the site totals and the season summaries current"""
+    old_status = None if created else getattr(instance, '_loaded_status', instance.status)
+    if created:
+        counters.add_application(instance.job_id, instance.status)
+    elif old_status != instance.status:
+        counters.move_application(instance.job_id, old_status, instance.status)
+    instance._loaded_status = instance.status
+    analytics.invalidate(instance.job_id)
+    if old_status != instance.status:
+        seasons.application_changed(instance, old_status, instance.status)
+
+
+@receiver(post_delete, sender=Application)
+def uncount_application(sender, instance, **kwargs):
+    """Drop a deleted application from the counts under the status it was stored with"""
+    status = getattr(instance, '_loaded_status', instance.status)
+    counters.add_application(instance.job_id, status, delta=-1)
+    analytics.invalidate(instance.job_id)
+    if not isinstance(kwargs.get('origin'), JobPost):
+        # A deleted job recounts its applicants' branches once instead of once per application
+        seasons.application_changed(instance, status, None)
+
+
+@receiver(post_save, sender=JobPost)
+def count_job_post(sender, instance, created, **kwargs):
+    """Keep the site-wide job totals and the season summaries current"""
+    if created:
+        counters.add_job(instance.is_active)
+    elif getattr(instance, '_loaded_is_active', instance.is_active) != instance.is_active:
+        counters.set_job_active(instance.is_active)
+    instance._loaded_is_active = instance.is_active
+    seasons.job_changed(
+        instance,
+        old_company_name=getattr(instance, '_loaded_company_name', None),
+        old_package=getattr(instance, '_loaded_package_lpa', None),
+    )
+    instance._loaded_company_name = instance.company_name
+    instance._loaded_package_lpa = instance.package_lpa
+
+
+@receiver(pre_delete, sender=JobPost)
+def note_applicant_branches(sender, instance, **kwargs):
+    """Remember which branches applied, for the season summaries once the applications are gone"""
+    instance._applicant_branches = seasons.applicant_branches(instance)
+
+
+@receiver(post_delete, sender=JobPost)
+def uncount_job_post(sender, instance, **kwargs):
+    """Drop a deleted job from the site-wide totals and the season summaries"""
+    counters.add_job(getattr(instance, '_loaded_is_active', instance.is_active), delta=-1)
+    seasons.job_changed(instance, deleted=True)
+
+
+@receiver(post_save, sender=StudentProfile)
+def invalidate_chat_context(sender, instance, **kwargs):
+    """Rebuild the chatbot's cached student context after a profile change"""
+    ChatSession.objects.filter(user_id=instance.user_id).exclude(context='').update(context='')
+
+
+@receiver(post_save, sender=CompanyWiki)
+def index_company_wiki(sender, instance, **kwargs):
+    """Keep the wiki full-text index in step with the entry"""
+    get_index(WIKI_INDEX).index(instance)
+
+
+@receiver(post_delete, sender=CompanyWiki)
+def unindex_company_wiki(sender, instance, **kwargs):
+    """Drop a deleted entry from the wiki full-text index"""
+    get_index(WIKI_INDEX).remove(instance.pk)
+
+
+@receiver(post_save, sender=JobPost)
+def index_job_post(sender, instance, **kwargs):
+    """Keep the job search text index in step with the posting"""
+    get_index(JOB_INDEX).index(instance)
+
+
+@receiver(post_delete, sender=JobPost)
+def unindex_job_post(sender, instance, **kwargs):
+    """Drop a deleted posting from the job search text index"""
+    get_index(JOB_INDEX).remove(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=JobPost)
+def refresh_job_fragments(sender, instance, **kwargs):
+    """Retire the job's cached cards and detail body, and the admin dashboard stats"""
+    page_cache.bump_job(instance.pk)
+    page_cache.invalidate_admin_stats()
+
+
+@receiver([post_save, post_delete], sender=JobUpdate)
+def refresh_job_detail(sender, instance, **kwargs):
+    """Retire the cached detail body that lists the job's updates"""
+    page_cache.bump_job(instance.job_id)
+
+
+@receiver([post_save, post_delete], sender=Application)
+def refresh_admin_stats(sender, instance, **kwargs):
+    """Drop the cached admin dashboard stats, which show applicant counts"""
+    page_cache.invalidate_admin_stats()
+
+
+@receiver([post_save, post_delete], sender=CompanyWiki)
+def refresh_wiki_list(sender, instance, **kwargs):
+    """Retire the cached wiki list pages"""
+    page_cache.bump_wiki()
 
 
 @receiver(post_save, sender=CustomUser)
@@ -118,8 +202,8 @@ def create_user_preferences(sender, instance, created, **kwargs):
     if created:
         UserPreference.objects.create(user=instance)
 
-@receiver(post_save, sender=CustomUser)
-def save_user_preferences(sender, instance, **kwargs):
-    """Save UserPreference when User is saved"""
-    if hasattr(instance, 'preferences'):
-        instance.preferences.save()
+
+@receiver(user_logged_in)
+def load_theme_into_session(sender, request, user, **kwargs):
+    """Carry the user's theme in the session so pages render without reading preferences"""
+    remember_theme(request, user)
@@ -1,3 +1,1787 @@
-from django.test import TestCase
+import csv
+import json
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.paginator import Paginator
+from django.db import connection, connections, transaction
+from django.contrib.sessions.backends.db import SessionStore
+from django.test import AsyncClient, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import load_workbook
+from pypdf import PdfWriter
+
+from . import page_cache, resume
+from .analytics import job_analytics
+from .ats import get_cache as ats_cache, queue_batch, run_batch
+from .audience import eligible_students, opted_in
+from .chat import build_session_prompt, prepare_turn, record_turn
+from .checks import check_page_cache_shared
+from .counters import repair_counters, totals
+from .exports import APPLICANT_COLUMNS, applicant_rows, export_jobs, iter_chunks, run_export
+from .forms import JobPostForm, StudentProfileForm
+from .imports import import_jobs, import_students, read_rows
+from .llm import FakeBackend, LLMUnavailable, get_backend, llm_stats, reset_gateways
+from .mail import claim_batch, deliver_batch, drain_outbox, queue_email, queue_mass_email
+from .management.commands.run_ats_batches import claim_next_batch
+from .management.commands.run_exports import claim_next_export
+from .matching import rank_applications, score_documents
+from .models import (Application, ATSScanBatch, ChatMessage, ChatSession, CompanyWiki, CustomUser, ExportJob, JobPost,
+                     JobUpdate, OutboundEmail, PlacementTotals, SeasonBranchSummary, SeasonCompanySummary,
+                     StudentProfile, UserPreference, branch_mask, branches_in_mask)
+from .prompts import count_tokens, normalise_text, resume_excerpt, text_excerpt
+from .resume import ResumeParseError, cached_resume_text, parse_resume
+from .search import WikiSearchResults, filter_jobs, keyset_page
+from .seasons import rebuild_season, refresh_branch, season_of
+
+SQLITE_PLAN_RE = re.compile(r'\b(SCAN|SEARCH) (\S+)(?: USING (?:COVERING )?(INDEX (\S+)|INTEGER PRIMARY KEY))?')
+POSTGRES_PLAN_RE = re.compile(
+    r'(Seq Scan|Index Scan|Index Only Scan|Bitmap Heap Scan)(?: Backward)?(?: using (\S+))? on (\S+)'
+)
+POSTGRES_BITMAP_RE = re.compile(r'Bitmap Index Scan on (\S+)')
+
+
+def table_reads(queryset):
+    """(table, index or None for a full scan) for each table read in the query plan"""
+    plan = queryset.explain()
+    reads = []
+    if connection.vendor == 'sqlite':
+        for match in SQLITE_PLAN_RE.finditer(plan):
+            _how, table, using, index = match.groups()
+            if using is None:
+                reads.append((table, None))
+            else:
+                reads.append((table, index or 'pk'))
+    elif connection.vendor == 'postgresql':
+        lines = plan.splitlines()
+        for number, line in enumerate(lines):
+            match = POSTGRES_PLAN_RE.search(line)
+            if not match:
+                continue
+            how, index, table = match.groups()
+            if how == 'Bitmap Heap Scan':
+                bitmap = next(filter(None, map(POSTGRES_BITMAP_RE.search, lines[number + 1:])), None)
+                index = bitmap.group(1) if bitmap else None
+            reads.append((table, None if how == 'Seq Scan' else index))
+    return plan, reads
+
+
+class QueryPlanTests(TestCase):
+    """The hot queries in views.py and signals.py read their tables through an index
+
+    Seeds a few placement seasons of data and refreshes the planner statistics,
+    then checks each query's EXPLAIN output on SQLite or Postgres.
+    """
+    SEASONS = 5
+    JOBS_PER_SEASON = 300
+    STUDENTS = 2000
+    APPLICATIONS_PER_STUDENT = 10
+    # Either serves the open-jobs filter; which one wins depends on how many jobs are open
+    OPEN_JOB_INDEXES = ['job_open_posted_idx', 'job_active_deadline_pkg_idx']
+    # Both lead with job_id; the second also serves the newest-first ordering
+    JOB_APPLICATION_INDEXES = ['app_job_status_idx', 'app_job_applied_idx']
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        branches = [code for code, _label in StudentProfile.BRANCH_CHOICES]
+
+        CustomUser.objects.bulk_create(
+            CustomUser(username=f'student{i}', email=f'student{i}@example.com', password='!', role='student')
+            for i in range(cls.STUDENTS)
+        )
+        students = list(CustomUser.objects.filter(role='student').order_by('id'))
+        StudentProfile.objects.bulk_create(
+            StudentProfile(user=user, branch=branches[i % len(branches)], current_cgpa=5 + (i % 50) / 10)
+            for i, user in enumerate(students)
+        )
+        UserPreference.objects.bulk_create(
+            UserPreference(user=user, receive_emails=i % 7 != 0) for i, user in enumerate(students)
+        )
+        ChatSession.objects.bulk_create(ChatSession(user=user) for user in students[::3])
+
+        for season in range(cls.SEASONS):
+            current = season == cls.SEASONS - 1
+            posted = now - timedelta(days=365 * (cls.SEASONS - 1 - season))
+            jobs = JobPost.objects.bulk_create(
+                JobPost(
+                    company_name=f'Company {i % 120}', role=f'Role {i % 40}', package_lpa=3 + i % 30,
+                    min_cgpa_required=6 + (i % 30) / 10, eligible_branches='CSE, IT',
+                    eligible_branch_mask=branch_mask(['CSE', 'IT']), job_description='Build and ship software.',
+                    deadline=posted + timedelta(days=30 + i % 60),
+                    is_active=current and i % 3 != 0,
+                )
+                for i in range(cls.JOBS_PER_SEASON)
+            )
+            for i, job in enumerate(jobs):
+                job.posted_at = posted + timedelta(hours=i)
+            # bulk_update skips auto_now_add, so the postings get spread-out timestamps
+            JobPost.objects.bulk_update(jobs, ['posted_at'])
+            ATSScanBatch.objects.bulk_create(
+                ATSScanBatch(job=job, status='queued' if current and i % 50 == 0 else 'done')
+                for i, job in enumerate(jobs)
+            )
+            JobUpdate.objects.bulk_create(
+                JobUpdate(job=job, message=f'Update {n}') for job in jobs for n in range(2)
+            )
+
+        job_ids = list(JobPost.objects.values_list('id', flat=True))
+        Application.objects.bulk_create(
+            Application(student=user, job_id=job_ids[(i * 37 + n * 101) % len(job_ids)],
+                        status=['Applied', 'Shortlisted', 'Rejected'][n % 3])
+            for i, user in enumerate(students) for n in range(cls.APPLICATIONS_PER_STUDENT)
+        )
+        CompanyWiki.objects.bulk_create(
+            CompanyWiki(company_name=f'Company {i}', year=2015 + i % 10, interview_questions='DSA', senior_tips='Practice')
+            for i in range(400)
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        cls.student = students[0]
+        cls.job = JobPost.objects.filter(is_active=True).first()
+
+    def assertIndexed(self, queryset, table, indexes=()):
+        """Every read of `table` goes through an index (one of `indexes`, if given)"""
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            self.skipTest(f'No query plan parser for {connection.vendor}')
+        plan, reads = table_reads(queryset)
+        used = [index for name, index in reads if name == table]
+        self.assertTrue(used, f'{table} is not read in plan:\n{plan}')
+        self.assertNotIn(None, used, f'{table} is fully scanned:\n{plan}')
+        if indexes:
+            self.assertTrue(set(used) & set(indexes), f'{table} does not use {indexes}:\n{plan}')
+
+    def test_student_dashboard_open_jobs(self):
+        profile = self.student.profile
+        jobs = JobPost.objects.open().eligible_for(profile)
+        self.assertIndexed(jobs, 'career_jobpost', self.OPEN_JOB_INDEXES)
+        has_applied = Application.objects.filter(job=self.job, student_id=profile.user_id)
+        self.assertIndexed(has_applied, 'career_application')
+
+    def test_student_dashboard_applications(self):
+        applications = Application.objects.filter(student=self.student).select_related('job')
+        self.assertIndexed(applications, 'career_application', ['app_student_applied_idx'])
+        self.assertIndexed(applications, 'career_jobpost')
+
+    def test_job_applicants(self):
+        applications = Application.objects.filter(job=self.job).select_related('student', 'student__profile')
+        self.assertIndexed(applications, 'career_application', ['app_job_applied_idx'])
+        self.assertIndexed(applications, 'career_customuser')
+
+    def test_job_applicants_by_status(self):
+        shortlisted = Application.objects.filter(job=self.job, status='Shortlisted')
+        self.assertIndexed(shortlisted, 'career_application', self.JOB_APPLICATION_INDEXES)
+
+    def test_applicant_export_chunks(self):
+        fields = [path for _header, path in APPLICANT_COLUMNS]
+        # Capture the query iter_chunks() evaluates for the chunk after the first
+        issued = []
+        with mock.patch('career.exports.list', create=True,
+                        side_effect=lambda queryset: issued.append(queryset) or list(queryset)):
+            chunks = iter_chunks(Application.objects.filter(job=self.job), fields, 1)
+            next(chunks), next(chunks)
+        first, seek = issued
+        self.assertIndexed(first, 'career_application', ['app_job_applied_idx'])
+        self.assertIndexed(seek, 'career_application', ['app_job_applied_idx'])
+
+    def test_job_detail_updates(self):
+        self.assertIndexed(self.job.updates.all(), 'career_jobupdate', ['jobupdate_job_created_idx'])
+
+    def test_job_update_recipients(self):
+        recipients = opted_in(CustomUser.objects.filter(applications__job=self.job))
+        self.assertIndexed(recipients, 'career_application', self.JOB_APPLICATION_INDEXES)
+        self.assertIndexed(recipients, 'career_customuser')
+
+    def test_new_job_alert_audience(self):
+        job = JobPost(min_cgpa_required=9, eligible_branch_mask=branch_mask(['ME']))
+        audience = eligible_students(job)
+        self.assertIndexed(audience, 'career_studentprofile', ['profile_branch_cgpa_idx'])
+
+    def test_chat_context_invalidation(self):
+        sessions = ChatSession.objects.filter(user_id=self.student.pk).exclude(context='')
+        self.assertIndexed(sessions, 'career_chatsession')
+
+    def test_company_wiki_list(self):
+        self.assertIndexed(CompanyWiki.objects.all()[:12], 'career_companywiki', ['wiki_year_created_idx'])
+
+    def test_job_search_first_page(self):
+        jobs = filter_jobs(JobPost.objects.open(), {'min_package': 10})
+        self.assertIndexed(jobs.order_by('deadline', 'id')[:21], 'career_jobpost', self.OPEN_JOB_INDEXES)
+
+    def test_job_search_next_page(self):
+        jobs, cursor = keyset_page(JobPost.objects.open(), 'deadline', size=5)
+        self.assertTrue(cursor)
+        # Capture the page query keyset_page() evaluates for the second page
+        issued = []
+        with mock.patch('career.search.list', create=True,
+                        side_effect=lambda queryset: issued.append(queryset) or list(queryset)):
+            next_jobs, _cursor = keyset_page(JobPost.objects.open(), 'deadline', cursor=cursor, size=5)
+        seek, = issued
+        self.assertRegex(
+            str(seek.query),
+            r'\("career_jobpost"\."deadline" > .+ OR \("career_jobpost"\."deadline" = .+ AND "career_jobpost"\."id" > \d+\)\)',
+        )
+        self.assertGreater((next_jobs[0].deadline, next_jobs[0].pk), (jobs[-1].deadline, jobs[-1].pk))
+        self.assertIndexed(seek, 'career_jobpost', self.OPEN_JOB_INDEXES)
+
+def make_student(username, branch='CSE', cgpa=8.0, **extra):
+    user = CustomUser.objects.create_user(
+        username=username, email=f'{username}@example.com', password='placement-Season-2026', role='student',
+    )
+    StudentProfile.objects.create(user=user, branch=branch, current_cgpa=cgpa, **extra)
+    return user
+
+
+def make_job(**fields):
+    fields = {
+        'company_name': 'Acme', 'role': 'Backend Engineer', 'package_lpa': 12, 'min_cgpa_required': 7,
+        'eligible_branches': 'CSE,IT', 'job_description': 'Python, Django and SQL',
+        'deadline': timezone.now() + timedelta(days=7), **fields,
+    }
+    return JobPost.objects.create(**fields)
+
+
+class EligibilityTests(TestCase):
+    """Branch bitmask and the eligibility annotations resolved in SQL"""
+
+    def test_branch_mask_follows_branch_choices(self):
+        self.assertEqual(branch_mask(['CSE', 'IT']), 0b100001)
+        self.assertEqual(branches_in_mask(branch_mask(['ME', 'OTHER'])), ['ME', 'OTHER'])
+        self.assertEqual(branch_mask(['XYZ']), 0)
+
+    def test_save_keeps_mask_in_sync(self):
+        job = make_job(eligible_branches='CSE, ECE')
+        self.assertEqual(branches_in_mask(job.eligible_branch_mask), ['CSE', 'ECE'])
+        job.eligible_branches = 'ME'
+        job.save(update_fields=['eligible_branches'])
+        job.refresh_from_db()
+        self.assertEqual(branches_in_mask(job.eligible_branch_mask), ['ME'])
+
+    def test_eligible_for_matches_python_check(self):
+        jobs = [
+            make_job(company_name='Open'),
+            make_job(company_name='High bar', min_cgpa_required=9),
+            make_job(company_name='Mechanical', eligible_branches='ME'),
+        ]
+        for student in [make_student('cse'), make_student('me', branch='ME', cgpa=9.5), make_student('low', cgpa=6)]:
+            annotated = {job.pk: job for job in JobPost.objects.eligible_for(student.profile)}
+            for job in jobs:
+                self.assertEqual(
+                    annotated[job.pk].is_eligible, job.is_student_eligible(student.profile),
+                    f'{student.username} / {job.company_name}',
+                )
+
+    def test_has_applied_is_per_student(self):
+        job = make_job()
+        applicant, other = make_student('applicant'), make_student('other')
+        Application.objects.create(student=applicant, job=job)
+        self.assertTrue(JobPost.objects.eligible_for(applicant.profile).get(pk=job.pk).has_applied)
+        self.assertFalse(JobPost.objects.eligible_for(other.profile).get(pk=job.pk).has_applied)
+
+    def test_open_excludes_closed_and_expired_jobs(self):
+        open_job = make_job()
+        make_job(is_active=False)
+        make_job(deadline=timezone.now() - timedelta(days=1))
+        self.assertEqual(list(JobPost.objects.open()), [open_job])
+
+    def test_form_normalises_branch_codes(self):
+        form = JobPostForm({
+            'company_name': 'Acme', 'role': 'SDE', 'package_lpa': 10, 'min_cgpa_required': 7,
+            'eligible_branches': ' cse, it ,CSE', 'deadline': '2030-01-01 10:00', 'job_description': 'x',
+        })
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data['eligible_branches'], 'CSE,IT')
+        form = JobPostForm({**form.data, 'eligible_branches': 'CSE,XYZ'})
+        self.assertIn('eligible_branches', form.errors)
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', EMAIL_RATE_PER_MINUTE=0,
+    EMAIL_OUTBOX_MAX_ATTEMPTS=3, EMAIL_OUTBOX_BACKOFF_SECONDS=60, EMAIL_OUTBOX_MAX_BACKOFF_SECONDS=3600,
+)
+class OutboxTests(TestCase):
+    """Signals queue mail in the outbox; send_queued_emails delivers, retries and dead-letters it"""
+
+    def failing_backend(self):
+        return mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('SMTP down'),
+        )
+
+    def make_due(self):
+        OutboundEmail.objects.filter(status='pending').update(next_attempt_at=timezone.now())
+
+    def test_signals_queue_instead_of_sending(self):
+        student = make_student('applicant')
+        make_student('bystander')
+        job = make_job()
+        # One new-job alert per eligible, opted-in student
+        self.assertEqual(OutboundEmail.objects.count(), 2)
+        application = Application.objects.create(student=student, job=job)
+        application.status = 'Shortlisted'
+        application.save()
+        self.assertEqual(len(mail.outbox), 0)
+        subjects = list(OutboundEmail.objects.filter(recipients=['applicant@example.com']).values_list('subject', flat=True))
+        self.assertEqual(subjects, [
+            'New Job Alert: Backend Engineer at Acme',
+            'Application Received: Backend Engineer at Acme',
+            'Application Update: Backend Engineer at Acme',
+        ])
+
+    def test_opted_out_students_get_nothing(self):
+        student = make_student('quiet')
+        UserPreference.objects.filter(user=student).update(receive_emails=False)
+        Application.objects.create(student=CustomUser.objects.get(pk=student.pk), job=make_job())
+        self.assertFalse(OutboundEmail.objects.exists())
+
+    def test_command_delivers_queue(self):
+        queue_email('Hello', 'Body', ['one@example.com'])
+        queue_mass_email('News', 'Body', ['a@example.com', 'b@example.com', 'a@example.com'])
+        call_command('send_queued_emails', stdout=StringIO())
+        self.assertEqual(sorted(tuple(message.to) for message in mail.outbox),
+                         [('a@example.com',), ('b@example.com',), ('one@example.com',)])
+        self.assertEqual(OutboundEmail.objects.filter(status='sent', attempts=1).count(), 3)
+        call_command('send_queued_emails', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_failures_back_off_exponentially(self):
+        email = queue_email('Hello', 'Body', ['one@example.com'])
+        with self.failing_backend():
+            started = timezone.now()
+            self.assertEqual(drain_outbox().retried, 1)
+            email.refresh_from_db()
+            self.assertEqual((email.status, email.attempts, email.last_error), ('pending', 1, 'SMTP down'))
+            self.assertAlmostEqual((email.next_attempt_at - started).total_seconds(), 60, delta=5)
+            # Not due yet, so a second pass leaves it alone
+            self.assertEqual(drain_outbox().processed, 0)
+            self.make_due()
+            started = timezone.now()
+            drain_outbox()
+            email.refresh_from_db()
+            self.assertAlmostEqual((email.next_attempt_at - started).total_seconds(), 120, delta=5)
+        self.make_due()
+        self.assertEqual(drain_outbox().sent, 1)
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts, email.last_error), ('sent', 3, ''))
+
+    def test_dead_letter_after_max_attempts(self):
+        email = queue_email('Hello', 'Body', ['one@example.com'])
+        with self.failing_backend():
+            for _attempt in range(3):
+                self.make_due()
+                report = drain_outbox()
+        self.assertEqual(report.dead, 1)
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('dead', 3))
+        self.make_due()
+        self.assertEqual(drain_outbox().processed, 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_claimed_batch_is_leased(self):
+        for n in range(3):
+            queue_email(f'Message {n}', 'Body', [f'{n}@example.com'])
+        first = claim_batch(2)
+        self.assertEqual(len(first), 2)
+        # A second worker only sees what the first one has not leased
+        second = claim_batch(10)
+        self.assertEqual([email.subject for email in second], ['Message 2'])
+        self.assertEqual(claim_batch(10), [])
+        deliver_batch(first)
+        deliver_batch(second)
+        self.assertEqual(len(mail.outbox), 3)
+
+
+@skipUnlessDBFeature('has_select_for_update_skip_locked')
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', EMAIL_RATE_PER_MINUTE=0)
+class OutboxConcurrencyTests(TransactionTestCase):
+    """Rows locked by one worker's claim are skipped by another's"""
+
+    def test_skip_locked_claims_are_disjoint(self):
+        for n in range(4):
+            queue_email(f'Message {n}', 'Body', [f'{n}@example.com'])
+        locked, release = threading.Event(), threading.Event()
+        held = []
+
+        def hold_lock():
+            try:
+                with transaction.atomic():
+                    held.extend(OutboundEmail.objects.select_for_update(skip_locked=True).order_by('id')[:2])
+                    locked.set()
+                    release.wait(10)
+            finally:
+                connections.close_all()
+
+        worker = threading.Thread(target=hold_lock)
+        worker.start()
+        locked.wait(10)
+        claimed = claim_batch(10)
+        release.set()
+        worker.join()
+        self.assertEqual(len(claimed), 2)
+        self.assertFalse({email.pk for email in claimed} & {email.pk for email in held})
+
+
+def preference_queries(queries):
+    return [query['sql'] for query in queries if 'career_userpreference' in query['sql']]
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class QueryCountTests(TestCase):
+    """Login and page renders keep the theme in the session instead of re-reading and re-saving preferences"""
+    PASSWORD = 'placement-Season-2026'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = CustomUser.objects.create_user(
+            username='student', email='student@example.com', password=cls.PASSWORD, role='student',
+        )
+        StudentProfile.objects.create(user=cls.student, branch='CSE', current_cgpa=8)
+        UserPreference.objects.filter(user=cls.student).update(theme='dark')
+
+    def setUp(self):
+        cache.clear()
+
+    def login(self):
+        return self.client.post(reverse('login'), {'username': 'student', 'password': self.PASSWORD})
+
+    def test_login_reads_theme_once_and_writes_no_preferences(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.login()
+        self.assertRedirects(response, reverse('dashboard'), fetch_redirect_response=False)
+        preferences = preference_queries(queries)
+        self.assertEqual(len(preferences), 1, preferences)
+        self.assertTrue(preferences[0].startswith('SELECT'), preferences)
+
+    def test_user_save_does_not_save_preferences(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.student.save(update_fields=['last_login'])
+        self.assertEqual(preference_queries(queries), [])
+
+    def test_page_render_takes_theme_from_session(self):
+        self.login()
+        self.client.get(reverse('student_dashboard'))
+        # Session, user, profile, open jobs and the student's applications; job cards come from the cache
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('student_dashboard'))
+        self.assertContains(response, 'data-bs-theme="dark"')
+
+    def test_session_without_theme_loads_it_once(self):
+        self.client.force_login(self.student)
+        session = self.client.session
+        del session['theme']
+        session.save()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('student_dashboard'))
+        self.assertEqual(len(preference_queries(queries)), 1)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('student_dashboard'))
+        self.assertEqual(preference_queries(queries), [])
+        self.assertContains(response, 'data-bs-theme="dark"')
+
+    def test_preferences_saved_only_when_changed(self):
+        self.client.force_login(self.student)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(reverse('preferences'), {'theme': 'dark', 'receive_emails': 'on'})
+        self.assertFalse([sql for sql in preference_queries(queries) if sql.startswith('UPDATE')])
+
+        self.client.post(reverse('preferences'), {'theme': 'light', 'receive_emails': 'on'})
+        self.assertEqual(UserPreference.objects.get(user=self.student).theme, 'light')
+        response = self.client.get(reverse('student_dashboard'))
+        self.assertContains(response, 'data-bs-theme="light"')
+
+
+def blank_pdf(pages=1):
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=612, height=792)
+    buffer = BytesIO()
+    writer.write(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def text_pdf(text):
+    """One-page PDF showing `text` in Helvetica"""
+    stream = f'BT /F1 12 Tf 72 720 Td ({text}) Tj ET'.encode()
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R '
+        b'/Resources << /Font << /F1 5 0 R >> >> >>',
+        b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    pdf = b'%PDF-1.4\n'
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(pdf)
+    pdf += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    pdf += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    pdf += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return pdf
+
+
+real_extract = resume._extract
+
+
+def stalling_extract(data, max_pages, max_chars):
+    """Parses normally unless the upload starts with b'stall' or b'crash'"""
+    if data.startswith(b'stall'):
+        time.sleep(60)
+    if data.startswith(b'crash'):
+        os._exit(1)
+    return real_extract(data, max_pages, max_chars)
+
+
+@skipUnless(multiprocessing.get_start_method() == 'fork', 'patching the parse process needs fork')
+@override_settings(RESUME_PARSE_WORKERS=2, RESUME_PARSE_TIMEOUT=2)
+@mock.patch('career.resume._extract', stalling_extract)
+class ResumeParseTests(TestCase):
+    """Each parse has its own process, so a timeout or crash fails only that upload"""
+
+    def test_parses_pdf_in_process(self):
+        parsed = parse_resume(blank_pdf(pages=2))
+        self.assertEqual((parsed.pages_read, parsed.page_count), (2, 2))
+
+    def test_timeout_does_not_fail_concurrent_parse(self):
+        errors = []
+
+        def stall():
+            try:
+                parse_resume(BytesIO(b'stall'))
+            except ResumeParseError as e:
+                errors.append(e.code)
+
+        stalled = threading.Thread(target=stall)
+        stalled.start()
+        time.sleep(0.5)
+        parsed = parse_resume(blank_pdf())
+        stalled.join()
+        self.assertEqual(errors, ['timeout'])
+        self.assertEqual(parsed.page_count, 1)
+        # The slot the stalled parse held is free again
+        self.assertEqual(parse_resume(blank_pdf()).page_count, 1)
+
+    def test_crashed_parse_is_unreadable(self):
+        with self.assertRaises(ResumeParseError) as raised:
+            parse_resume(BytesIO(b'crash'))
+        self.assertEqual(raised.exception.code, 'unreadable')
+        self.assertEqual(parse_resume(blank_pdf()).page_count, 1)
+
+
+@override_settings(LLM_BACKEND='fake', ATS_BATCH_CONCURRENCY=2)
+class ATSBatchTests(TestCase):
+    """run_batch() rescans only when the resume or the job description changed"""
+
+    def setUp(self):
+        reset_gateways()
+        ats_cache().clear()
+        FakeBackend.script = []
+        FakeBackend.calls = []
+        self.job = make_job()
+        self.applications = []
+        for index in range(3):
+            student = make_student(f'applicant{index}', resume_text=f'Python developer {index}',
+                                   resume_sha256=str(index) * 64)
+            self.applications.append(Application.objects.create(student=student, job=self.job))
+        Application.objects.create(student=make_student('no_resume'), job=self.job)
+
+    def run_batch(self):
+        FakeBackend.calls = []
+        return run_batch(ATSScanBatch.objects.create(job=self.job))
+
+    def test_scores_applicants_with_resumes(self):
+        batch = self.run_batch()
+        self.assertEqual((batch.status, batch.total, batch.processed, batch.skipped, batch.failed),
+                         ('done', 4, 3, 1, 0))
+        self.assertIsNotNone(batch.finished_at)
+        self.assertEqual(Application.objects.filter(ats_score__isnull=False).count(), 3)
+        self.assertEqual(len(FakeBackend.calls), 3)
+
+    def test_unchanged_resumes_are_skipped(self):
+        self.run_batch()
+        batch = self.run_batch()
+        self.assertEqual((batch.processed, batch.skipped), (0, 4))
+        self.assertEqual(FakeBackend.calls, [])
+
+    def test_changed_resume_is_rescanned(self):
+        self.run_batch()
+        StudentProfile.objects.filter(user=self.applications[0].student).update(
+            resume_text='Go developer', resume_sha256='f' * 64,
+        )
+        batch = self.run_batch()
+        self.assertEqual((batch.processed, batch.skipped), (1, 3))
+        self.assertEqual(len(FakeBackend.calls), 1)
+
+    def test_edited_job_description_rescans_everyone(self):
+        self.run_batch()
+        JobPost.objects.filter(pk=self.job.pk).update(job_description='Go, gRPC and Kubernetes')
+        self.job.refresh_from_db()
+        batch = self.run_batch()
+        self.assertEqual((batch.processed, batch.skipped), (3, 1))
+        self.assertEqual(len(FakeBackend.calls), 3)
+        self.assertTrue(all('Kubernetes' in prompt for prompt in FakeBackend.calls))
+
+    def test_rescore_is_served_from_cache(self):
+        self.run_batch()
+        scores = dict(Application.objects.values_list('pk', 'ats_score'))
+        Application.objects.update(ats_score=None)
+        batch = self.run_batch()
+        self.assertEqual(batch.processed, 3)
+        self.assertEqual(FakeBackend.calls, [])
+        self.assertEqual(dict(Application.objects.values_list('pk', 'ats_score')), scores)
+
+    def test_failed_scan_is_counted(self):
+        FakeBackend.script = [ValueError('bad reply')]
+        with override_settings(ATS_BATCH_CONCURRENCY=1):
+            batch = self.run_batch()
+        self.assertEqual((batch.processed, batch.failed), (2, 1))
+
+    def abandoned_batch(self, **fields):
+        return ATSScanBatch.objects.create(
+            job=self.job, status='running', lease_until=timezone.now() - timedelta(seconds=1), **fields,
+        )
+
+    def test_worker_reclaims_abandoned_batch(self):
+        batch = self.abandoned_batch()
+        claimed = claim_next_batch()
+        self.assertEqual(claimed.pk, batch.pk)
+        self.assertGreater(claimed.lease_until, timezone.now())
+        # A live lease keeps other workers off it
+        self.assertIsNone(claim_next_batch())
+
+    def test_reclaimed_batch_restarts_its_counts(self):
+        self.run_batch()
+        batch = run_batch(self.abandoned_batch(processed=3, failed=1))
+        self.assertEqual((batch.status, batch.processed, batch.skipped, batch.failed), ('done', 0, 4, 0))
+
+    def test_queue_batch_replaces_abandoned_batch(self):
+        abandoned = self.abandoned_batch()
+        batch = queue_batch(self.job)
+        self.assertNotEqual(batch.pk, abandoned.pk)
+        self.assertEqual(batch.status, 'queued')
+        abandoned.refresh_from_db()
+        self.assertEqual(abandoned.status, 'failed')
+        self.assertIsNotNone(abandoned.finished_at)
+
+    def test_queue_batch_reuses_live_batch(self):
+        live = ATSScanBatch.objects.create(
+            job=self.job, status='running', lease_until=timezone.now() + timedelta(minutes=5),
+        )
+        self.assertEqual(queue_batch(self.job).pk, live.pk)
+
+    def test_worker_marks_crashed_batch_failed_and_finished(self):
+        batch = ATSScanBatch.objects.create(job=self.job)
+        with mock.patch('career.management.commands.run_ats_batches.run_batch', side_effect=RuntimeError('boom')):
+            call_command('run_ats_batches', stdout=StringIO())
+        batch.refresh_from_db()
+        self.assertEqual(batch.status, 'failed')
+        self.assertIsNotNone(batch.finished_at)
+
+
+@override_settings(LLM_BACKEND='fake',
+                   STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class ChatStreamTests(TestCase):
+    """The chatbot streams from a sync generator under WSGI and an async one under ASGI"""
+
+    def setUp(self):
+        reset_gateways()
+        FakeBackend.script = ['Practise system design questions']
+        FakeBackend.calls = []
+        self.student = make_student('chatter')
+
+    def post(self, client):
+        return client.post(reverse('chatbot_stream'), json.dumps({'message': 'How do I prepare?'}),
+                           content_type='application/json')
+
+    def assertRecorded(self, body):
+        self.assertIn('"delta": "Practise "', body)
+        self.assertTrue(body.endswith('event: done\ndata: {}\n\n'), body)
+        self.assertEqual(list(ChatMessage.objects.values_list('role', 'content')), [
+            ('user', 'How do I prepare?'), ('assistant', 'Practise system design questions'),
+        ])
+
+    def test_wsgi_streams_sync_iterator(self):
+        self.client.force_login(self.student)
+        response = self.post(self.client)
+        self.assertFalse(response.is_async)
+        self.assertRecorded(b''.join(response.streaming_content).decode())
+
+    async def test_asgi_streams_async_iterator(self):
+        client = AsyncClient()
+        await sync_to_async(client.force_login)(self.student)
+        response = await self.post(client)
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        await sync_to_async(self.assertRecorded)(body)
+
+    async def test_asgi_error_becomes_event(self):
+        FakeBackend.script = [ValueError('quota exceeded')]
+        client = AsyncClient()
+        await sync_to_async(client.force_login)(self.student)
+        response = await self.post(client)
+        body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        self.assertIn('event: error', body)
+        self.assertIn('quota exceeded', body)
+
+    def test_chatbot_page_only_renders(self):
+        self.client.force_login(self.student)
+        self.assertEqual(self.client.get(reverse('chatbot')).status_code, 200)
+        self.assertEqual(FakeBackend.calls, [])
+
+
+@override_settings(LLM_BACKEND='fake', LLM_RETRY_BASE_DELAY=0, LLM_MAX_RETRIES=2,
+                   LLM_BREAKER_THRESHOLD=2, LLM_BREAKER_RESET=60)
+class LLMGatewayTests(TestCase):
+    """Retries, circuit breaker, concurrency cap and backend selection of the LLM gateway"""
+
+    def setUp(self):
+        reset_gateways()
+        FakeBackend.script = []
+        FakeBackend.calls = []
+
+    def test_transient_errors_are_retried(self):
+        FakeBackend.script = [TimeoutError, ConnectionError('reset'), 'Score: 80']
+        self.assertEqual(get_backend().generate('prompt', 'model'), 'Score: 80')
+        self.assertEqual(len(FakeBackend.calls), 3)
+        self.assertEqual(llm_stats()['failures'], 0)
+
+    def test_retries_are_bounded(self):
+        FakeBackend.script = [TimeoutError] * 4
+        with self.assertRaises(TimeoutError):
+            get_backend().generate('prompt', 'model')
+        self.assertEqual(len(FakeBackend.calls), 3)
+
+    def test_other_errors_are_not_retried(self):
+        FakeBackend.script = [ValueError('bad request')]
+        with self.assertRaises(ValueError):
+            get_backend().generate('prompt', 'model')
+        self.assertEqual(len(FakeBackend.calls), 1)
+
+    def test_stream_retries_until_first_chunk(self):
+        FakeBackend.script = [TimeoutError, 'streamed reply']
+        self.assertEqual("".join(get_backend().stream('prompt', 'model')), 'streamed reply')
+        self.assertEqual(len(FakeBackend.calls), 2)
+
+    def fail_twice(self, gateway):
+        """Two calls that exhaust their retries on a transient error"""
+        FakeBackend.script = [TimeoutError] * 6
+        for _ in range(2):
+            with self.assertRaises(TimeoutError):
+                gateway.generate('prompt', 'model')
+
+    def test_circuit_opens_after_repeated_failures(self):
+        gateway = get_backend()
+        self.fail_twice(gateway)
+        self.assertEqual(gateway.breaker.state, 'open')
+        self.assertFalse(gateway.available())
+        with self.assertRaises(LLMUnavailable):
+            gateway.generate('prompt', 'model')
+        self.assertEqual(len(FakeBackend.calls), 6)
+        self.assertEqual(llm_stats()['rejected'], 1)
+
+    def test_rejected_prompts_do_not_open_circuit(self):
+        gateway = get_backend()
+        FakeBackend.script = [ValueError('blocked by safety filters')] * 3
+        for _ in range(3):
+            with self.assertRaises(ValueError):
+                gateway.generate('prompt', 'model')
+        self.assertEqual(gateway.breaker.state, 'closed')
+        self.assertEqual(llm_stats()['failures'], 3)
+
+    def test_half_open_circuit_lets_one_trial_through(self):
+        gateway = get_backend()
+        self.fail_twice(gateway)
+        gateway.breaker.opened_at -= 60
+        self.assertEqual(gateway.breaker.state, 'half-open')
+
+        # A failed trial opens the circuit again
+        FakeBackend.script = [ConnectionError('still down')] * 3
+        with self.assertRaises(ConnectionError):
+            gateway.generate('prompt', 'model')
+        self.assertEqual(gateway.breaker.state, 'open')
+
+        # Only one trial runs at a time, and its success closes the circuit
+        gateway.breaker.opened_at -= 60
+        trial = gateway.stream('prompt', 'model')
+        next(trial)
+        with self.assertRaises(LLMUnavailable):
+            gateway.generate('prompt', 'model')
+        "".join(trial)
+        self.assertEqual(gateway.breaker.state, 'closed')
+        gateway.generate('prompt', 'model')
+
+    @override_settings(LLM_MAX_CONCURRENCY=1, LLM_QUEUE_TIMEOUT=0.05)
+    def test_busy_slots_fail_fast(self):
+        reset_gateways()
+        gateway = get_backend()
+        held = gateway.stream('prompt', 'model')
+        next(held)
+        with self.assertRaisesMessage(LLMUnavailable, 'Too many AI requests'):
+            gateway.generate('prompt', 'model')
+        "".join(held)
+        gateway.generate('prompt', 'model')
+
+    @override_settings(LLM_MAX_CONCURRENCY=2, LLM_QUEUE_TIMEOUT=5)
+    def test_semaphore_caps_calls_in_flight(self):
+        reset_gateways()
+        lock = threading.Lock()
+        in_flight = [0]
+        peak = [0]
+
+        def slow_generate(backend, prompt, model, timeout, usage):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.05)
+            with lock:
+                in_flight[0] -= 1
+            return 'reply'
+
+        with mock.patch.object(FakeBackend, 'generate', slow_generate):
+            threads = [threading.Thread(target=get_backend().generate, args=('prompt', 'model')) for _ in range(6)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(peak[0], 2)
+        self.assertEqual(llm_stats()['calls'], 6)
+
+    @override_settings(LLM_BACKEND='gemini', GEMINI_API_KEY='')
+    def test_stub_without_key_in_debug(self):
+        with self.settings(DEBUG=True):
+            reset_gateways()
+            gateway = get_backend()
+            self.assertEqual(gateway.name, 'stub')
+            self.assertTrue(gateway.generate('prompt', 'model').startswith('Score:'))
+        reset_gateways()
+        self.assertEqual(get_backend().name, 'gemini')
+        self.assertFalse(get_backend().is_configured())
+
+
+class CounterTests(TestCase):
+    """Applicant counters survive full saves of a job and repair_counters() fixes drift"""
+
+    def setUp(self):
+        self.job = make_job()
+        for index, status in enumerate(['Applied', 'Applied', 'Shortlisted']):
+            Application.objects.create(student=make_student(f'counted{index}'), job=self.job, status=status)
+
+    def counts(self, job=None):
+        job = JobPost.objects.get(pk=(job or self.job).pk)
+        return [getattr(job, name) for name in JobPost.COUNTER_FIELDS]
+
+    def test_counts_follow_applications(self):
+        self.assertEqual(self.counts(), [3, 2, 1, 0])
+        application = Application.objects.filter(status='Applied').first()
+        application.status = 'Rejected'
+        application.save()
+        self.assertEqual(self.counts(), [3, 1, 1, 1])
+        application.delete()
+        self.assertEqual(self.counts(), [2, 1, 1, 0])
+
+    def test_full_save_keeps_concurrent_increment(self):
+        job = JobPost.objects.get(pk=self.job.pk)
+        Application.objects.create(student=make_student('late'), job=job)
+        job.role = 'Platform Engineer'
+        job.save()
+        job = JobPost.objects.get(pk=self.job.pk)
+        self.assertEqual(job.role, 'Platform Engineer')
+        self.assertEqual(self.counts(), [4, 3, 1, 0])
+
+    def test_form_save_keeps_counts(self):
+        job = JobPost.objects.get(pk=self.job.pk)
+        Application.objects.create(student=make_student('late'), job=job)
+        form = JobPostForm({
+            'company_name': job.company_name, 'role': job.role, 'package_lpa': 14, 'min_cgpa_required': 7,
+            'eligible_branches': 'cse, ece', 'job_description': job.job_description,
+            'deadline': job.deadline.strftime('%Y-%m-%dT%H:%M'), 'is_active': True,
+        }, instance=job)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        job = JobPost.objects.get(pk=self.job.pk)
+        self.assertEqual((job.package_lpa, job.eligible_branch_mask), (14, branch_mask(['CSE', 'ECE'])))
+        self.assertEqual(self.counts(), [4, 3, 1, 0])
+
+    def test_repair_fixes_drifted_jobs_and_totals(self):
+        other = make_job(company_name='Globex')
+        JobPost.objects.filter(pk=self.job.pk).update(application_count=10, rejected_count=4)
+        PlacementTotals.objects.update(applications=99)
+        report = repair_counters(batch_size=1)
+        self.assertEqual((report.jobs_checked, report.jobs_fixed, report.totals_fixed), (2, [self.job.pk], True))
+        self.assertEqual(self.counts(), [3, 2, 1, 0])
+        self.assertEqual(self.counts(other), [0, 0, 0, 0])
+        self.assertEqual((totals().jobs, totals().applications), (2, 3))
+
+        report = repair_counters()
+        self.assertEqual((report.jobs_fixed, report.totals_fixed), ([], False))
+
+    def test_repair_counters_command(self):
+        JobPost.objects.filter(pk=self.job.pk).update(applied_count=0)
+        out = StringIO()
+        call_command('repair_counters', stdout=out)
+        self.assertIn(f'Fixed counts for 1 jobs: {self.job.pk}', out.getvalue())
+        self.assertEqual(self.counts(), [3, 2, 1, 0])
+
+
+class SeasonSummaryTests(TestCase):
+    """Incremental season summaries match a from-scratch rebuild_season() after every change"""
+
+    def setUp(self):
+        self.season = season_of(timezone.now())
+        self.acme = make_job(package_lpa=10)
+        self.globex = make_job(company_name='Globex', package_lpa=20)
+        self.cse = [make_student(f'cse{index}') for index in range(3)]
+        self.ece = make_student('ece0', branch='ECE')
+
+    def summaries(self):
+        branches = SeasonBranchSummary.objects.filter(season=self.season).order_by('branch').values_list(
+            'branch', 'students', 'placed', 'offers', 'median_package')
+        companies = SeasonCompanySummary.objects.filter(season=self.season).order_by('company_name').values_list(
+            'company_name', 'jobs', 'applications', 'offers', 'max_package')
+        return list(branches), list(companies)
+
+    def assertMatchesRebuild(self):
+        incremental = self.summaries()
+        rebuild_season(self.season)
+        self.assertEqual(incremental, self.summaries())
+        return incremental
+
+    def apply(self, student, job, status='Applied'):
+        return Application.objects.create(student=student, job=job, status=status)
+
+    def set_status(self, application, status):
+        application.status = status
+        application.save()
+
+    def test_applications_and_offers(self):
+        first = self.apply(self.cse[0], self.acme)
+        second = self.apply(self.cse[0], self.globex)
+        self.apply(self.cse[1], self.acme)
+        self.apply(self.ece, self.globex, status='Shortlisted')
+        branches, companies = self.assertMatchesRebuild()
+        self.assertEqual(branches, [('CSE', 2, 0, 0, None), ('ECE', 1, 1, 1, 20)])
+        self.assertEqual(companies, [('Acme', 1, 2, 0, 10), ('Globex', 1, 2, 1, 20)])
+
+        self.set_status(first, 'Shortlisted')
+        self.set_status(second, 'Shortlisted')
+        branches, _companies = self.assertMatchesRebuild()
+        self.assertEqual(branches[0], ('CSE', 2, 1, 2, 15))
+
+        self.set_status(first, 'Rejected')
+        self.assertMatchesRebuild()
+        self.set_status(second, 'Applied')
+        self.assertMatchesRebuild()
+        second.delete()
+        self.assertMatchesRebuild()
+        first.delete()
+        self.assertMatchesRebuild()
+
+    def test_last_applicant_removes_branch_row(self):
+        application = self.apply(self.ece, self.acme, status='Shortlisted')
+        application.delete()
+        branches, _companies = self.assertMatchesRebuild()
+        self.assertEqual(branches, [])
+
+    def test_status_change_without_offer_skips_median(self):
+        application = self.apply(self.cse[0], self.acme)
+        with mock.patch('career.seasons.refresh_median') as refresh_median, \
+                mock.patch('career.seasons.refresh_branch') as refresh_branch:
+            self.set_status(application, 'Rejected')
+        refresh_median.assert_not_called()
+        refresh_branch.assert_not_called()
+        self.assertMatchesRebuild()
+
+    def test_job_edits(self):
+        self.apply(self.cse[0], self.acme, status='Shortlisted')
+        self.apply(self.cse[1], self.globex, status='Shortlisted')
+        job = JobPost.objects.get(pk=self.acme.pk)
+        job.package_lpa = 30
+        job.save()
+        branches, companies = self.assertMatchesRebuild()
+        self.assertEqual(branches, [('CSE', 2, 2, 2, 25)])
+        job.company_name = 'Globex'
+        job.save()
+        _branches, companies = self.assertMatchesRebuild()
+        self.assertEqual(companies, [('Globex', 2, 2, 2, 30)])
+
+    def test_job_delete_recounts_only_its_branches(self):
+        self.apply(self.cse[0], self.acme, status='Shortlisted')
+        self.apply(self.cse[0], self.globex)
+        self.apply(self.ece, self.globex)
+        with mock.patch('career.seasons.refresh_branch', wraps=refresh_branch) as refreshed, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.acme.delete()
+        self.assertEqual([call.args[1] for call in refreshed.call_args_list], ['CSE'])
+        branches, companies = self.assertMatchesRebuild()
+        self.assertEqual(branches, [('CSE', 1, 0, 0, None), ('ECE', 1, 0, 0, None)])
+        self.assertEqual(companies, [('Globex', 1, 2, 0, 20)])
+
+
+@override_settings(EXPORT_CHUNK_SIZE=2)
+class ApplicantExportTests(TestCase):
+    """The applicants CSV streams in keyset-paginated chunks without skipping or repeating rows"""
+
+    def setUp(self):
+        self.job = make_job()
+        self.applications = [
+            Application.objects.create(student=make_student(f'exported{index}', skills='Python'), job=self.job)
+            for index in range(5)
+        ]
+        # Three applicants share a timestamp, so chunk boundaries fall inside a tie
+        tied = timezone.now() - timedelta(days=1)
+        Application.objects.filter(pk__in=[a.pk for a in self.applications[1:4]]).update(applied_at=tied)
+        self.expected = list(
+            Application.objects.filter(job=self.job).order_by('-applied_at', '-id')
+            .values_list('student__username', flat=True)
+        )
+
+    def chunked_usernames(self, chunk_size):
+        chunks = list(iter_chunks(Application.objects.filter(job=self.job), ['student__username', 'applied_at'],
+                                  chunk_size))
+        return [len(chunk) for chunk in chunks], [row[0] for chunk in chunks for row in chunk]
+
+    def test_keyset_chunks_cover_ties_once(self):
+        for chunk_size, sizes in [(1, [1] * 5), (2, [2, 2, 1]), (5, [5]), (10, [5])]:
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(self.chunked_usernames(chunk_size), (sizes, self.expected))
+
+    def test_one_query_per_chunk(self):
+        with self.assertNumQueries(3):
+            self.chunked_usernames(2)
+
+    def test_server_side_cursor_path_matches(self):
+        with mock.patch('career.exports.uses_server_side_cursors', return_value=True):
+            self.assertEqual(self.chunked_usernames(2), ([2, 2, 1], self.expected))
+
+    def test_csv_download_streams_rows(self):
+        admin = CustomUser.objects.create_user(username='officer', password='placement-Season-2026', role='admin')
+        self.client.force_login(admin)
+        response = self.client.get(reverse('export_applicants_csv', args=[self.job.pk]))
+        self.assertTrue(response.streaming)
+        pieces = [piece.decode() for piece in response.streaming_content]
+        # The header, then one piece per chunk of two rows
+        self.assertEqual(len(pieces), 4)
+        rows = list(csv.reader(''.join(pieces).splitlines()))
+        self.assertEqual(rows[0], [title for title, _path in APPLICANT_COLUMNS])
+        self.assertEqual([row[0] for row in rows[1:]], self.expected)
+        self.assertEqual(rows[1][2:8], ['CSE', '8.0', '0', 'Python', '', 'Applied'])
+
+
+
+class MultiJobExportTests(TestCase):
+    """ExportJobs written by the run_exports worker, with per-job progress and leases"""
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_root = self.settings(MEDIA_ROOT=media.name)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+        now = timezone.now()
+        self.globex = make_job(company_name='Globex', role='Data Analyst')
+        self.acme = make_job()
+        self.labs = make_job(company_name='Acme Labs', role='SRE')
+        for days_ago, job in [(10, self.globex), (3, self.acme), (1, self.labs)]:
+            JobPost.objects.filter(pk=job.pk).update(posted_at=now - timedelta(days=days_ago))
+        for username, job in [('g1', self.globex), ('a1', self.acme), ('a2', self.acme), ('l1', self.labs)]:
+            Application.objects.create(student=make_student(username), job=job)
+        self.admin = CustomUser.objects.create_user(username='officer', password='placement-Season-2026', role='admin')
+
+    def export(self, **fields):
+        return run_export(ExportJob.objects.create(requested_by=self.admin, status='running', **fields))
+
+    def test_export_jobs_filters(self):
+        today = timezone.localdate()
+        cases = [
+            ({}, [self.globex, self.acme, self.labs]),
+            ({'company': 'acme'}, [self.acme, self.labs]),
+            ({'posted_from': today - timedelta(days=5)}, [self.acme, self.labs]),
+            ({'posted_to': today - timedelta(days=5)}, [self.globex]),
+            ({'posted_from': today - timedelta(days=5), 'company': 'labs'}, [self.labs]),
+        ]
+        for fields, jobs in cases:
+            with self.subTest(**fields):
+                self.assertEqual(list(export_jobs(ExportJob(**fields))), jobs)
+
+    def test_zip_has_one_csv_per_job(self):
+        export = self.export(format='zip', company='acme')
+        export.refresh_from_db()
+        self.assertEqual((export.status, export.total_jobs, export.processed_jobs, export.rows_written), ('done', 2, 2, 3))
+        self.assertEqual(export.progress_percent, 100)
+        header = [title for title, _path in APPLICANT_COLUMNS]
+        with export.file.open('rb') as handle, zipfile.ZipFile(handle) as archive:
+            self.assertEqual(archive.namelist(), [
+                f'{self.acme.pk}_Acme_Backend_Engineer.csv', f'{self.labs.pk}_Acme_Labs_SRE.csv',
+            ])
+            files = [list(csv.reader(archive.read(name).decode().splitlines())) for name in archive.namelist()]
+        self.assertEqual([rows[0] for rows in files], [header, header])
+        self.assertEqual([[row[0] for row in rows[1:]] for rows in files], [['a2', 'a1'], ['l1']])
+
+    def test_csv_combines_jobs_oldest_posting_first(self):
+        export = self.export(format='csv')
+        self.assertEqual((export.total_jobs, export.processed_jobs, export.rows_written), (3, 3, 4))
+        with export.file.open('rb') as handle:
+            rows = list(csv.reader(handle.read().decode().splitlines()))
+        self.assertEqual(rows[0], ['Company', 'Role', *(title for title, _path in APPLICANT_COLUMNS)])
+        self.assertEqual([row[:3] for row in rows[1:]], [
+            ['Globex', 'Data Analyst', 'g1'],
+            ['Acme', 'Backend Engineer', 'a2'],
+            ['Acme', 'Backend Engineer', 'a1'],
+            ['Acme Labs', 'SRE', 'l1'],
+        ])
+        self.assertRegex(export.file.name, r'^exports/[0-9a-f]{32}/applicants_\d{8}_\d{4}\.csv$')
+
+    def test_xlsx_combines_jobs(self):
+        export = self.export(format='xlsx', company='acme')
+        with export.file.open('rb') as handle:
+            sheet = load_workbook(BytesIO(handle.read()), read_only=True)['Applicants']
+            rows = [row for row in sheet.iter_rows(values_only=True)]
+        self.assertEqual(rows[0][:3], ('Company', 'Role', 'Username'))
+        self.assertEqual([row[:3] for row in rows[1:]], [
+            ('Acme', 'Backend Engineer', 'a2'), ('Acme', 'Backend Engineer', 'a1'), ('Acme Labs', 'SRE', 'l1'),
+        ])
+        self.assertEqual(export.rows_written, 3)
+
+    def test_progress_and_lease_recorded_after_each_job(self):
+        export = ExportJob.objects.create(format='csv', status='running')
+        seen = []
+        real_rows = applicant_rows
+
+        def rows(job):
+            stored = ExportJob.objects.get(pk=export.pk)
+            seen.append((stored.processed_jobs, stored.rows_written, stored.lease_until > timezone.now()))
+            return real_rows(job)
+
+        with mock.patch('career.exports.applicant_rows', side_effect=rows):
+            run_export(export)
+        self.assertEqual(seen, [(0, 0, True), (1, 1, True), (2, 3, True)])
+
+    def test_claim_reclaims_abandoned_exports(self):
+        expired = timezone.now() - timedelta(seconds=1)
+        abandoned = ExportJob.objects.create(
+            format='csv', status='running', lease_until=expired, processed_jobs=2, rows_written=7,
+        )
+        live = ExportJob.objects.create(format='csv', status='running', lease_until=timezone.now() + timedelta(minutes=5))
+        queued = ExportJob.objects.create(format='zip')
+
+        claimed = claim_next_export()
+        self.assertEqual(claimed, abandoned)
+        self.assertGreater(claimed.lease_until, timezone.now())
+        self.assertEqual(claim_next_export(), queued)
+        self.assertIsNone(claim_next_export())
+
+        call_command('run_exports', stdout=StringIO())  # Nothing left to claim
+        ExportJob.objects.filter(pk=abandoned.pk).update(lease_until=expired)
+        call_command('run_exports', stdout=StringIO())
+        abandoned.refresh_from_db()
+        self.assertEqual((abandoned.status, abandoned.processed_jobs, abandoned.rows_written), ('done', 3, 4))
+        live.refresh_from_db()
+        self.assertEqual(live.status, 'running')
+
+    def test_status_and_download(self):
+        self.client.force_login(self.admin)
+        export = ExportJob.objects.create(format='csv', company='acme', status='running')
+        status = self.client.get(reverse('export_status', args=[export.pk])).json()
+        self.assertEqual(status, {
+            'status': 'running', 'total_jobs': 0, 'processed_jobs': 0, 'rows_written': 0, 'progress_percent': 0,
+        })
+        self.assertEqual(self.client.get(reverse('export_download', args=[export.pk])).status_code, 404)
+
+        run_export(export)
+        status = self.client.get(reverse('export_status', args=[export.pk])).json()
+        self.assertEqual(status, {
+            'status': 'done', 'total_jobs': 2, 'processed_jobs': 2, 'rows_written': 3, 'progress_percent': 100,
+        })
+        response = self.client.get(reverse('export_download', args=[export.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('attachment; filename="applicants_', response['Content-Disposition'])
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual([row[2] for row in rows[1:]], ['a2', 'a1', 'l1'])
+        self.assertEqual(self.client.get(reverse('export_download', args=[export.pk + 1])).status_code, 404)
+
+class PageCacheCheckTests(TestCase):
+    """Page caching across several workers is refused on a per-process cache"""
+    LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    SHARED = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://cache:6379/0'}}
+
+    def errors(self, **overrides):
+        with self.settings(**overrides):
+            return [error.id for error in check_page_cache_shared(None)]
+
+    def test_locmem_with_several_workers_fails(self):
+        self.assertEqual(self.errors(CACHES=self.LOCMEM, WEB_CONCURRENCY=2, PAGE_CACHE_TTL=300), ['career.E001'])
+
+    def test_single_worker_shared_cache_or_no_page_cache_pass(self):
+        self.assertEqual(self.errors(CACHES=self.LOCMEM, WEB_CONCURRENCY=1, PAGE_CACHE_TTL=300), [])
+        self.assertEqual(self.errors(CACHES=self.SHARED, WEB_CONCURRENCY=4, PAGE_CACHE_TTL=300), [])
+        self.assertEqual(self.errors(CACHES=self.LOCMEM, WEB_CONCURRENCY=4, PAGE_CACHE_TTL=0), [])
+
+
+@override_settings(RESUME_PARSE_WORKERS=0)
+class ResumeTextTests(TestCase):
+    """Resume text is extracted once per file content and reused until the file changes"""
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_root = self.settings(MEDIA_ROOT=media.name)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+        self.profile = make_student('uploader').profile
+
+    def upload(self, text, name='resume.pdf'):
+        form = StudentProfileForm(
+            {'branch': 'CSE', 'current_cgpa': 8, 'backlogs': 0},
+            {'resume': SimpleUploadedFile(name, text_pdf(text), content_type='application/pdf')},
+            instance=StudentProfile.objects.get(pk=self.profile.pk),
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        return form.save()
+
+    def test_upload_stores_text_and_hash(self):
+        profile = self.upload('Python developer')
+        profile.refresh_from_db()
+        self.assertEqual(profile.resume_text, 'Python developer')
+        self.assertEqual(len(profile.resume_sha256), 64)
+
+    def test_same_file_is_not_parsed_again(self):
+        sha256 = self.upload('Python developer').resume_sha256
+        with mock.patch('career.resume._extract') as extract:
+            profile = self.upload('Python developer', name='renamed.pdf')
+        extract.assert_not_called()
+        profile.refresh_from_db()
+        self.assertEqual((profile.resume_text, profile.resume_sha256), ('Python developer', sha256))
+
+    def test_new_file_replaces_text(self):
+        first = self.upload('Python developer').resume_sha256
+        profile = self.upload('Rust engineer')
+        profile.refresh_from_db()
+        self.assertEqual(profile.resume_text, 'Rust engineer')
+        self.assertNotEqual(profile.resume_sha256, first)
+
+    def test_cached_text_backfills_old_profiles(self):
+        self.upload('Python developer')
+        StudentProfile.objects.filter(pk=self.profile.pk).update(resume_text='', resume_sha256='')
+        profile = StudentProfile.objects.get(pk=self.profile.pk)
+        self.assertEqual(cached_resume_text(profile), 'Python developer')
+        self.assertEqual(StudentProfile.objects.get(pk=self.profile.pk).resume_text, 'Python developer')
+        with mock.patch('career.resume._extract') as extract:
+            self.assertEqual(cached_resume_text(profile), 'Python developer')
+        extract.assert_not_called()
+
+
+class MatchingTests(TestCase):
+    """BM25 ranking of applicants against the job description"""
+
+    def test_matching_document_scores_higher(self):
+        scores = score_documents('Django developer with PostgreSQL and C++', [
+            'Gardening and landscape design',
+            'Built Django REST APIs on PostgreSQL; some C++',
+            '',
+        ])
+        self.assertGreater(scores[1], scores[0])
+        self.assertEqual((scores[0], scores[2]), (0, 0))
+
+    def test_empty_query_or_documents(self):
+        self.assertEqual(list(score_documents('the and of', ['Django developer'])), [0])
+        self.assertEqual(len(score_documents('Django', [])), 0)
+
+    def test_rank_applications(self):
+        job = make_job(job_description='Backend engineer: Python, Django and SQL')
+        matching = make_student('pythonista', skills='Python, Django', resume_text='Django and SQL services')
+        unrelated = make_student('painter', skills='Watercolour', resume_text='Portraits and landscapes')
+        blank = make_student('blank')
+        no_profile = CustomUser.objects.create_user(username='noprofile', role='student')
+        for student in [blank, unrelated, no_profile, matching]:
+            Application.objects.create(student=student, job=job)
+
+        ranked = rank_applications(job, Application.objects.filter(job=job).select_related('student__profile'))
+        self.assertEqual(ranked[0].student, matching)
+        self.assertEqual(ranked[0].match_score, 100)
+        self.assertEqual({a.student.username: a.match_score for a in ranked[1:]},
+                         {'painter': 0, 'blank': 0, 'noprofile': 0})
+
+
+@override_settings(CHAT_HISTORY_MESSAGES=4, CHAT_SUMMARY_MAX_CHARS=120)
+class ChatHistoryTests(TestCase):
+    """Turns beyond the recent window are folded into a bounded summary"""
+
+    def setUp(self):
+        self.student = make_student('mentee')
+        self.request = RequestFactory().post('/chatbot/stream/')
+        self.request.user = self.student
+        self.request.session = SessionStore()
+
+    def talk(self, turns):
+        for number in range(turns):
+            chat, _prompt = prepare_turn(self.request, f'question {number}')
+            record_turn(chat, f'question {number}', f'answer {number} ' + 'detail ' * 5)
+        return ChatSession.objects.get(pk=chat.pk)
+
+    def test_short_history_is_not_compacted(self):
+        chat = self.talk(2)
+        self.assertEqual(chat.summary, '')
+        self.assertEqual(chat.messages.count(), 4)
+
+    def test_history_past_the_window_is_folded(self):
+        chat = self.talk(4)
+        recent = list(chat.messages.values_list('content', flat=True))
+        self.assertEqual(recent, ['question 2', 'answer 2 ' + 'detail ' * 5,
+                                  'question 3', 'answer 3 ' + 'detail ' * 5])
+        self.assertLessEqual(len(chat.summary), 120)
+        self.assertIn('- Student asked: question 1', chat.summary)
+        self.assertIn('- You answered: answer 1', chat.summary)
+        # The oldest lines give way once the summary budget is full
+        self.assertNotIn('question 0', chat.summary)
+
+    def test_prompt_carries_summary_and_recent_turns(self):
+        self.talk(3)
+        chat, prompt = prepare_turn(self.request, 'question 3')
+        self.assertIn('Summary of the earlier conversation:\n' + chat.summary, prompt)
+        self.assertIn('User: question 2', prompt)
+        self.assertIn('Assistant: answer 2', prompt)
+        self.assertTrue(prompt.endswith('User: question 3'))
+        self.assertEqual(prompt, build_session_prompt(chat, 'question 3'))
+
+
+RESUME = """Asha Rao
+asha@example.com | +91 98765 43210
+EDUCATION
+B.Tech Computer Science, 2021-2025
+CGPA 8.6
+SKILLS
+- Python, Django, PostgreSQL
+- Docker, AWS
+EXPERIENCE
+- Backend intern at Acme: built REST APIs serving 2k requests per second
+- Moved nightly reports to Celery
+PROJECTS
+- Placement portal with BM25 resume matching
+HOBBIES
+- Chess
+- Trekking in the Western Ghats
+"""
+
+
+class PromptBudgetTests(SimpleTestCase):
+    """Prompt text is cleaned and cut to its token budget, most useful resume sections first"""
+
+    def test_normalise_text(self):
+        lines = normalise_text(
+            "Pro\ufb01cient in Python\n\u2022   Built   data pipe-\nlines\n3\nPage 2 of 3\n"
+            "PROFICIENT IN PYTHON\n\n\u25aa\n"
+        )
+        self.assertEqual(lines, ['Proficient in Python', '- Built data pipelines'])
+
+    def test_text_below_budget_is_kept(self):
+        excerpt = text_excerpt(RESUME, 1000)
+        self.assertEqual(excerpt.text, '\n'.join(normalise_text(RESUME)))
+        self.assertLessEqual(excerpt.tokens, 1000)
+
+        excerpt = resume_excerpt(RESUME, 1000)
+        self.assertEqual(excerpt.sections, ['skills', 'experience', 'projects', 'education', 'preamble', 'other'])
+        for line in normalise_text(RESUME):
+            if line not in {'EDUCATION', 'SKILLS', 'EXPERIENCE', 'PROJECTS', 'HOBBIES'}:
+                self.assertIn(line, excerpt.text)
+
+    def test_text_excerpt_cuts_at_a_line(self):
+        excerpt = text_excerpt(RESUME, 20)
+        self.assertLessEqual(count_tokens(excerpt.text), 20)
+        self.assertTrue(excerpt.text)
+        self.assertTrue('\n'.join(normalise_text(RESUME)).startswith(excerpt.text))
+
+    def test_resume_excerpt_keeps_priority_sections(self):
+        for budget in (25, 40, 60):
+            with self.subTest(budget=budget):
+                excerpt = resume_excerpt(RESUME, budget)
+                self.assertLessEqual(count_tokens(excerpt.text), budget)
+                self.assertEqual(excerpt.sections[0], 'skills')
+                self.assertTrue(excerpt.text.startswith('SKILLS:\n- Python, Django, PostgreSQL'))
+        # Experience outranks education: at 60 tokens the first experience
+        # bullet is kept while education and the hobbies are dropped.
+        excerpt = resume_excerpt(RESUME, 60)
+        self.assertEqual(excerpt.sections[:3], ['skills', 'experience', 'projects'])
+        self.assertIn('built REST APIs', excerpt.text)
+        self.assertNotIn('B.Tech', excerpt.text)
+        self.assertNotIn('Chess', excerpt.text)
+
+
+class WikiSearchTests(TestCase):
+    """Ranked wiki search through the full-text index the signals maintain"""
+
+    def wiki(self, company_name, questions='Arrays and graphs', tips='Revise DSA'):
+        return CompanyWiki.objects.create(
+            company_name=company_name, year=2024, interview_questions=questions, senior_tips=tips,
+        )
+
+    def ids(self, text):
+        return [wiki.pk for wiki in WikiSearchResults(text)[:]]
+
+    def test_results_ranked_by_relevance(self):
+        tip = self.wiki('Acme', tips='Zephyr asked about caching')
+        question = self.wiki('Globex', questions='Design Zephyr rate limiting')
+        name = self.wiki('Zephyr Labs')
+        self.wiki('Initech')
+        # company_name outweighs interview_questions, which outweighs senior_tips
+        self.assertEqual(self.ids('zephyr'), [name.pk, question.pk, tip.pk])
+        self.assertEqual(WikiSearchResults('zephyr').count(), 3)
+        self.assertEqual(self.ids('zeph'), [name.pk, question.pk, tip.pk])
+
+    def test_tied_results_page_stably(self):
+        tied = [self.wiki(f'Umbrella {i}') for i in range(5)]
+        paginator = Paginator(WikiSearchResults('umbrella'), 2)
+        pages = [[wiki.pk for wiki in paginator.page(number).object_list] for number in paginator.page_range]
+        self.assertEqual(pages, [[tied[4].pk, tied[3].pk], [tied[2].pk, tied[1].pk], [tied[0].pk]])
+        self.assertEqual(self.ids('umbrella'), [wiki.pk for wiki in reversed(tied)])
+
+    def test_edited_and_deleted_entries_drop_out(self):
+        kept = self.wiki('Hooli Search')
+        edited = self.wiki('Hooli Cloud')
+        deleted = self.wiki('Hooli Phone')
+        edited.company_name = 'Pied Piper'
+        edited.save()
+        deleted.delete()
+        self.assertEqual(self.ids('hooli'), [kept.pk])
+        self.assertEqual(self.ids('piper'), [edited.pk])
+        self.assertEqual(WikiSearchResults('hooli').count(), 1)
+
+    def test_empty_query_matches_nothing(self):
+        self.wiki('Acme')
+        results = WikiSearchResults('!!')
+        self.assertEqual(results.count(), 0)
+        self.assertEqual(results[:10], [])
+
+
+class JobAnalyticsTests(TestCase):
+    """Grouped applicant counts and velocity, cached per job until an application changes"""
+
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        self.job = make_job(eligible_branches='CSE,IT,ECE')
+        JobPost.objects.filter(pk=self.job.pk).update(posted_at=now - timedelta(days=5))
+        self.job.refresh_from_db()
+        no_profile = CustomUser.objects.create_user(username='np', email='np@example.com', password='x', role='student')
+        fixture = [
+            (make_student('cse1', 'CSE', 8.5), 'Applied', 4),
+            (make_student('cse2', 'CSE', 9.2), 'Shortlisted', 4),
+            (make_student('it1', 'IT', 7.5), 'Shortlisted', 3),
+            (make_student('ece1', 'ECE', 6.5), 'Rejected', 2),
+            (no_profile, 'Applied', 0),
+        ]
+        self.applications = []
+        for student, status, days_ago in fixture:
+            application = Application.objects.create(student=student, job=self.job, status=status)
+            Application.objects.filter(pk=application.pk).update(applied_at=now - timedelta(days=days_ago))
+            self.applications.append(application)
+        self.today = timezone.localdate()
+
+    def test_grouped_counts(self):
+        analytics = job_analytics(self.job)
+        self.assertEqual(analytics['total'], 5)
+        self.assertEqual(
+            [(bucket['status'], bucket['count'], bucket['percent']) for bucket in analytics['status']],
+            [('Applied', 2, 40.0), ('Shortlisted', 2, 40.0), ('Rejected', 1, 20.0)],
+        )
+        branches = {branch['code']: branch for branch in analytics['branches']}
+        self.assertEqual(analytics['branches'][0]['code'], 'CSE')
+        self.assertEqual(
+            {code: (branch['count'], branch['shortlisted'], branch['percent']) for code, branch in branches.items()},
+            {'CSE': (2, 1, 40.0), 'IT': (1, 1, 20.0), 'ECE': (1, 0, 20.0), 'No profile': (1, 0, 20.0)},
+        )
+        self.assertEqual(
+            [(band['label'], band['count']) for band in analytics['cgpa']],
+            [('Below 6', 0), ('6 - 7', 1), ('7 - 8', 1), ('8 - 9', 1), ('9 and above', 1)],
+        )
+
+    def test_velocity_fills_gaps_since_posting(self):
+        velocity = job_analytics(self.job)['velocity']
+        counts = {5: 0, 4: 2, 3: 1, 2: 1, 1: 0, 0: 1}
+        self.assertEqual(
+            velocity['days'],
+            [{'day': self.today - timedelta(days=days_ago), 'count': count} for days_ago, count in counts.items()],
+        )
+        self.assertEqual(velocity['per_day'], 0.8)
+        self.assertEqual(velocity['last_7_days'], 5)
+        self.assertEqual(velocity['peak'], {'day': self.today - timedelta(days=4), 'count': 2})
+
+    def test_no_applications(self):
+        job = make_job(company_name='Globex')
+        analytics = job_analytics(job)
+        self.assertEqual(analytics['total'], 0)
+        self.assertEqual(analytics['branches'], [])
+        self.assertEqual(analytics['velocity'], {'days': [], 'per_day': 0, 'last_7_days': 0, 'peak': None})
+
+    def test_cached_until_an_application_changes(self):
+        first = job_analytics(self.job)
+        with self.assertNumQueries(0):
+            self.assertEqual(job_analytics(self.job), first)
+
+        Application.objects.create(student=make_student('it2', 'IT', 8.1), job=self.job)
+        analytics = job_analytics(self.job)
+        self.assertEqual(analytics['total'], 6)
+        self.assertEqual(analytics['status'][0]['count'], 3)
+
+        application = self.applications[0]
+        application.status = 'Shortlisted'
+        application.save()
+        analytics = job_analytics(self.job)
+        self.assertEqual([bucket['count'] for bucket in analytics['status']], [2, 3, 1])
+
+        self.applications[3].delete()
+        analytics = job_analytics(self.job)
+        self.assertEqual(analytics['total'], 5)
+        self.assertNotIn('ECE', [branch['code'] for branch in analytics['branches']])
+
+    def test_other_jobs_keep_their_cache(self):
+        other = make_job(company_name='Globex')
+        job_analytics(other)
+        Application.objects.create(student=make_student('it2', 'IT', 8.1), job=self.job)
+        with self.assertNumQueries(0):
+            job_analytics(other)
+
+
+class ImportTests(TestCase):
+    """Bulk CSV imports validate every row, insert in batches and send no per-row signals"""
+    STUDENTS = (
+        'username,email,password,branch,current_cgpa,skills\n'
+        'riya,riya@example.com,placement-Season-2026,CSE,8.4,Python\n'
+        'kabir,kabir@example,placement-Season-2026,CSE,11,\n'
+        'meera,meera@example.com,placement-Season-2026,IT,7.9,\n'
+    )
+    JOBS = (
+        'company_name,role,package_lpa,min_cgpa_required,eligible_branches,deadline,job_description,is_active\n'
+        'Acme,Backend Engineer,12,7,"cse, it",2030-01-01 10:00,Python and Django,\n'
+        'Globex,Analyst,lots,7,CSE,2030-01-01 10:00,SQL,\n'
+        'Initech,Platform Engineer,18,8,CSE,2030-02-01 10:00,Kubernetes,true\n'
+        'Hooli,Hardware Engineer,15,7,ECE,2030-02-01 10:00,Verilog,true\n'
+    )
+
+    def write_csv(self, text):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'import.csv')
+        with open(path, 'w', newline='') as handle:
+            handle.write(text)
+        return path
+
+    def import_students(self, text, **options):
+        return import_students(read_rows(StringIO(text)), hash_workers=2, **options)
+
+    def test_import_students_command(self):
+        out = StringIO()
+        call_command('import_students', self.write_csv(self.STUDENTS), '--hash-workers', '2', stdout=out)
+        output = out.getvalue()
+        self.assertIn('Line 3: email: Enter a valid email address.; current_cgpa:', output)
+        self.assertIn('Imported 2 students, skipped 1 rows.', output)
+
+        riya = CustomUser.objects.get(username='riya')
+        self.assertEqual(riya.role, 'student')
+        self.assertTrue(riya.check_password('placement-Season-2026'))
+        # The file has no backlogs column, so the model default applies
+        self.assertEqual((riya.profile.branch, riya.profile.backlogs, riya.profile.skills), ('CSE', 0, 'Python'))
+        self.assertFalse(CustomUser.objects.filter(username='kabir').exists())
+        self.assertEqual(
+            sorted(UserPreference.objects.values_list('user__username', flat=True)), ['meera', 'riya'],
+        )
+
+    def test_blank_backlogs_default_to_zero(self):
+        report = self.import_students(
+            'username,email,password,branch,current_cgpa,backlogs\n'
+            'riya,riya@example.com,placement-Season-2026,CSE,8.4,\n'
+            'meera,meera@example.com,placement-Season-2026,IT,7.9,2\n'
+            'kabir,kabir@example.com,placement-Season-2026,IT,7.9,-1\n'
+        )
+        self.assertEqual([user.username for user in report.created], ['riya', 'meera'])
+        self.assertEqual([line for line, _message in report.errors], [4])
+        self.assertEqual(
+            dict(StudentProfile.objects.values_list('user__username', 'backlogs')), {'riya': 0, 'meera': 2},
+        )
+
+    def test_duplicate_usernames(self):
+        make_student('taken')
+        report = self.import_students(
+            'username,email,password,branch,current_cgpa\n'
+            'Taken,taken2@example.com,placement-Season-2026,CSE,8\n'
+            'dup,dup@example.com,placement-Season-2026,CSE,8\n'
+            'DUP,dup2@example.com,placement-Season-2026,CSE,8\n',
+            batch_size=2,
+        )
+        self.assertEqual([user.username for user in report.created], ['dup'])
+        self.assertEqual(report.errors, [
+            (2, 'username: A user with username Taken already exists.'),
+            (4, 'username: DUP appears earlier in the file.'),
+        ])
+        self.assertEqual(CustomUser.objects.filter(username__iexact='dup').count(), 1)
+
+    def test_student_batches_use_a_fixed_number_of_queries(self):
+        def rows(prefix, count):
+            return 'username,email,password,branch,current_cgpa\n' + ''.join(
+                f'{prefix}{index},{prefix}{index}@example.com,placement-Season-2026,CSE,8\n' for index in range(count)
+            )
+
+        with CaptureQueriesContext(connection) as small:
+            self.import_students(rows('student', 2))
+        with CaptureQueriesContext(connection) as large:
+            self.import_students(rows('pupil', 6))
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(UserPreference.objects.count(), 8)
+
+    def test_dry_run_creates_nothing(self):
+        report = self.import_students(self.STUDENTS, dry_run=True)
+        self.assertEqual([user.username for user in report.created], ['riya', 'meera'])
+        self.assertFalse(CustomUser.objects.exists())
+        out = StringIO()
+        call_command('import_jobs', self.write_csv(self.JOBS), '--dry-run', stdout=out)
+        self.assertIn('Would import 3 jobs, skipped 1 rows.', out.getvalue())
+        self.assertFalse(JobPost.objects.exists())
+
+    def test_import_jobs_sets_branch_mask(self):
+        report = import_jobs(read_rows(StringIO(self.JOBS)), batch_size=2)
+        self.assertEqual([line for line, _message in report.errors], [3])
+        self.assertIn('package_lpa:', report.errors[0][1])
+        acme = JobPost.objects.get(company_name='Acme')
+        self.assertEqual(acme.eligible_branches, 'CSE,IT')
+        self.assertEqual(acme.eligible_branch_mask, branch_mask(['CSE', 'IT']))
+        self.assertTrue(acme.is_active)
+        self.assertEqual(
+            sorted(JobPost.objects.for_branch('IT').values_list('company_name', flat=True)), ['Acme'],
+        )
+        self.assertEqual(
+            sorted(JobPost.objects.for_branch('CSE').values_list('company_name', flat=True)), ['Acme', 'Initech'],
+        )
+
+    def test_import_jobs_command_queues_one_digest_per_student(self):
+        make_student('cse', 'CSE', 8.5)
+        make_student('it', 'IT', 8.5)
+        make_student('low', 'CSE', 6.0)
+        quiet = make_student('quiet', 'CSE', 9.0)
+        UserPreference.objects.filter(user=quiet).update(receive_emails=False)
+
+        # Any per-job alert would be queued on commit, so run the callbacks
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('import_jobs', self.write_csv(self.JOBS), stdout=StringIO())
+        self.assertEqual(JobPost.objects.count(), 3)
+        self.assertFalse(OutboundEmail.objects.exists())
+        self.assertEqual(PlacementTotals.objects.values_list('jobs', 'active_jobs').get(), (3, 3))
+        self.assertEqual(
+            [job.company_name for job in filter_jobs(JobPost.objects.all(), {'q': 'kubernetes'})], ['Initech'],
+        )
+
+        JobPost.objects.all().delete()
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('import_jobs', self.write_csv(self.JOBS), '--notify', stdout=out)
+        self.assertIn('Queued 2 job digest emails.', out.getvalue())
+        digests = {email.recipients[0]: email for email in OutboundEmail.objects.all()}
+        self.assertEqual(sorted(digests), ['cse@example.com', 'it@example.com'])
+        self.assertEqual(digests['cse@example.com'].subject, 'New Job Alerts: 2 new openings on UniCareer')
+        self.assertIn('Platform Engineer at Initech', digests['cse@example.com'].body)
+        self.assertIn('Backend Engineer at Acme', digests['cse@example.com'].body)
+        self.assertEqual(digests['it@example.com'].subject, 'New Job Alerts: 1 new openings on UniCareer')
+
+
+class PageCacheInvalidationTests(TestCase):
+    """Each cached fragment is served until a change it shows, then rendered afresh"""
+
+    def setUp(self):
+        cache.clear()
+        self.job = make_job()
+        self.profile = make_student('reader').profile
+
+    def card(self):
+        (_job, html), = page_cache.job_cards(JobPost.objects.eligible_for(self.profile).filter(pk=self.job.pk))
+        return html
+
+    def detail(self):
+        job = JobPost.objects.eligible_for(self.profile).get(pk=self.job.pk)
+        return page_cache.job_detail_body(job, lambda: '|'.join(
+            [job.job_description, *(update.message for update in job.updates.all())]
+        ))
+
+    def wiki_page(self):
+        return page_cache.wiki_list('1', lambda: ','.join(CompanyWiki.objects.values_list('company_name', flat=True)))
+
+    def test_job_card_follows_job_changes(self):
+        self.assertIn('Acme - Backend Engineer', self.card())
+        # A queryset update sends no signals, so the cached card is still served
+        JobPost.objects.filter(pk=self.job.pk).update(role='Data Engineer')
+        self.assertIn('Acme - Backend Engineer', self.card())
+        self.job.refresh_from_db()
+        self.job.role = 'Platform Engineer'
+        self.job.save()
+        self.assertIn('Acme - Platform Engineer', self.card())
+        # Applying changes the student's outcome, which is part of the key
+        Application.objects.create(student=self.profile.user, job=self.job)
+        self.assertIn('Applied', self.card())
+
+    def test_job_detail_follows_job_and_update_changes(self):
+        self.assertEqual(self.detail(), 'Python, Django and SQL')
+        update = JobUpdate.objects.create(job=self.job, message='Test on Friday')
+        self.assertEqual(self.detail(), 'Python, Django and SQL|Test on Friday')
+        JobUpdate.objects.filter(pk=update.pk).update(message='Test on Monday')
+        self.assertEqual(self.detail(), 'Python, Django and SQL|Test on Friday')
+        update.refresh_from_db()
+        update.save()
+        self.assertEqual(self.detail(), 'Python, Django and SQL|Test on Monday')
+        update.delete()
+        self.assertEqual(self.detail(), 'Python, Django and SQL')
+        self.job.job_description = 'Go and Kafka'
+        self.job.save()
+        self.assertEqual(self.detail(), 'Go and Kafka')
+
+    def test_wiki_list_follows_wiki_changes(self):
+        self.assertEqual(self.wiki_page(), '')
+        wiki = CompanyWiki.objects.create(company_name='Acme', year=2024, interview_questions='DSA', senior_tips='Revise')
+        self.assertEqual(self.wiki_page(), 'Acme')
+        CompanyWiki.objects.filter(pk=wiki.pk).update(company_name='Globex')
+        self.assertEqual(self.wiki_page(), 'Acme')
+        wiki.company_name = 'Initech'
+        wiki.save()
+        self.assertEqual(self.wiki_page(), 'Initech')
+        wiki.delete()
+        self.assertEqual(self.wiki_page(), '')
+
+    def test_admin_stats_follow_job_and_application_changes(self):
+        self.assertEqual(page_cache.admin_stats()['total_applications'], 0)
+        application = Application.objects.create(student=self.profile.user, job=self.job)
+        self.assertEqual(page_cache.admin_stats()['total_applications'], 1)
+        with self.assertNumQueries(0):
+            page_cache.admin_stats()
+        application.status = 'Shortlisted'
+        application.save()
+        with self.assertNumQueries(2):
+            page_cache.admin_stats()
+        application.delete()
+        self.assertEqual(page_cache.admin_stats()['total_applications'], 0)
+        self.job.is_active = False
+        self.job.save()
+        stats = page_cache.admin_stats()
+        self.assertEqual((stats['total_jobs'], stats['active_jobs']), (1, 0))
+        self.assertFalse(stats['jobs'][0].is_active)
+
+    def test_other_jobs_keep_their_fragments(self):
+        other = make_job(company_name='Globex')
+        self.card()
+        version = page_cache.job_versions([other.pk])[other.pk]
+        self.job.save()
+        self.assertEqual(page_cache.job_versions([other.pk])[other.pk], version)
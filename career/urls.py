@@ -12,6 +12,7 @@ urlpatterns = [
     path('dashboard/', views.dashboard, name='dashboard'),
     path('admin-dashboard/', views.admin_dashboard, name='admin_dashboard'),
     path('student-dashboard/', views.student_dashboard, name='student_dashboard'),
+    path('jobs/search/', views.job_search, name='job_search'),
     
     # Admin - Job Management
     path('job/create/', views.create_job, name='create_job'),
@@ -20,6 +21,12 @@ urlpatterns = [
     path('job/<int:job_id>/applicants/', views.job_applicants, name='job_applicants'),
     path('job/<int:job_id>/export-csv/', views.export_applicants_csv, name='export_applicants_csv'),
     path('job/<int:job_id>/add-update/', views.add_job_update, name='add_job_update'),
+    path('job/<int:job_id>/ats-scan/', views.start_ats_batch, name='start_ats_batch'),
+    path('ats-batch/<int:batch_id>/status/', views.ats_batch_status, name='ats_batch_status'),
+    path('reports/seasons/', views.season_report, name='season_report'),
+    path('exports/', views.bulk_export, name='bulk_export'),
+    path('exports/<int:export_id>/status/', views.export_status, name='export_status'),
+    path('exports/<int:export_id>/download/', views.export_download, name='export_download'),
     path('application/<int:application_id>/update-status/', views.update_application_status, name='update_application_status'),
     
     # Student
@@ -27,6 +34,8 @@ urlpatterns = [
     path('job/<int:job_id>/apply/', views.apply_job, name='apply_job'),
     path('ats-scanner/', views.ats_scanner, name='ats_scanner'),
     path('chatbot/', views.chatbot, name='chatbot'),
+    path('chatbot/stream/', views.chatbot_stream, name='chatbot_stream'),
+    path('chatbot/reset/', views.chatbot_reset, name='chatbot_reset'),
     path('preferences/', views.preferences_view, name='preferences'),
     
     # Common
@@ -1,22 +1,34 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.utils import timezone
-from django.http import HttpResponse, JsonResponse
-from django.db.models import Q
-import csv
-import io
+from django.http import FileResponse, Http404, JsonResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.core.paginator import Paginator
 import json
-from pypdf import PdfReader
-import google.generativeai as genai
+from asgiref.sync import sync_to_async
 from django.conf import settings
 
-from .models import CustomUser, StudentProfile, JobPost, Application, CompanyWiki, JobUpdate, UserPreference
+from .models import (CustomUser, StudentProfile, JobPost, Application, CompanyWiki, UserPreference, ATSScanBatch,
+                     ExportJob, SeasonBranchSummary, SeasonCompanySummary)
 from .forms import (StudentRegistrationForm, StudentProfileForm, JobPostForm, 
-                    ApplicationStatusForm, CompanyWikiForm, ResumeUploadForm, JobUpdateForm, UserPreferenceForm)
-from .decorators import admin_required, student_required
-from django.core.mail import send_mail
+                    ApplicationStatusForm, CompanyWikiForm, ResumeUploadForm, JobUpdateForm, UserPreferenceForm,
+                    JobSearchForm, ExportJobForm)
+from .decorators import admin_required, async_login_required, student_required
+from .audience import opted_in
+from .context_processors import THEME_SESSION_KEY
+from .analytics import job_analytics
+from .ats import ascan_resume, cache_stats as ats_cache_stats, queue_batch
+from .chat import CHAT_MODEL, end_session, prepare_turn, record_turn, session_history
+from .exports import APPLICANT_COLUMNS, applicant_rows, csv_stream, ranked_applicant_rows
+from .llm import LLMUnavailable, get_backend, llm_stats
+from .mail import queue_mass_email
+from . import page_cache
+from .matching import rank_applications
+from .resume import ResumeParseError, aparse_resume, cached_resume_text, file_sha256
+from .search import WikiSearchResults, filter_jobs, job_facets, keyset_page
+from .seasons import season_label
 
 
 def home(request):
@@ -92,16 +104,12 @@ def dashboard(request):
 @admin_required
 def admin_dashboard(request):
     """Admin dashboard view"""
-    jobs = JobPost.objects.all()
-    total_jobs = jobs.count()
-    active_jobs = jobs.filter(is_active=True).count()
-    total_applications = Application.objects.count()
-    
+    # Totals and the latest 10 jobs, cached until a job or application changes
     context = {
-        'jobs': jobs[:10],  # Show latest 10 jobs
-        'total_jobs': total_jobs,
-        'active_jobs': active_jobs,
-        'total_applications': total_applications,
+        **page_cache.admin_stats(),
+        'page_cache': page_cache.cache_stats(),
+        'ats_cache': ats_cache_stats(),
+        'llm': llm_stats(),
     }
     return render(request, 'career/admin_dashboard.html', context)
 
@@ -157,40 +165,137 @@ def job_applicants(request, job_id):
     job = get_object_or_404(JobPost, id=job_id)
     applications = Application.objects.filter(job=job).select_related('student', 'student__profile')
     
+    # Optionally rank by local resume-to-job match score
+    sort = request.GET.get('sort', '')
+    if sort == 'match':
+        applications = rank_applications(job, applications)
+    
+    page = Paginator(applications, settings.APPLICANTS_PAGE_SIZE).get_page(request.GET.get('page'))
+    
     context = {
         'job': job,
-        'applications': applications,
+        'applications': page.object_list,
+        'page': page,
+        'sort': sort,
+        'ats_batch': job.ats_batches.first(),
+        'analytics': job_analytics(job),
     }
     return render(request, 'career/job_applicants.html', context)
 
 
 @admin_required
 def export_applicants_csv(request, job_id):
-    """Export applicants data to CSV"""
+    """Export applicants data to CSV, streamed as it is read"""
     job = get_object_or_404(JobPost, id=job_id)
-    applications = Application.objects.filter(job=job).select_related('student', 'student__profile')
+    header = [title for title, _path in APPLICANT_COLUMNS]
     
-    response = HttpResponse(content_type='text/csv')
+    if request.GET.get('sort') == 'match':
+        # Ranking scores every applicant at once, so this order cannot be streamed from the database
+        applications = Application.objects.filter(job=job).select_related('student', 'student__profile')
+        chunks = ranked_applicant_rows(job, rank_applications(job, applications))
+        header.append('Match Score')
+    else:
+        chunks = applicant_rows(job)
+    
+    response = StreamingHttpResponse(csv_stream(header, chunks), content_type='text/csv')
     response['Content-Disposition'] = f'attachment; filename="{job.company_name}_{job.role}_applicants.csv"'
+    return response
+
+
+@admin_required
+def bulk_export(request):
+    """Queue an applicant export across many jobs and list recent ones"""
+    if request.method == 'POST':
+        form = ExportJobForm(request.POST)
+        if form.is_valid():
+            export = form.save(commit=False)
+            export.requested_by = request.user
+            export.save()
+            messages.success(request, 'Export queued. The download link will appear here when it is ready.')
+            return redirect('bulk_export')
+    else:
+        form = ExportJobForm()
     
-    writer = csv.writer(response)
-    writer.writerow(['Username', 'Email', 'Branch', 'CGPA', 'Backlogs', 'Skills', 'LinkedIn', 'Status', 'Applied At'])
-    
-    for app in applications:
-        profile = app.student.profile
-        writer.writerow([
-            app.student.username,
-            app.student.email,
-            profile.branch,
-            profile.current_cgpa,
-            profile.backlogs,
-            profile.skills,
-            profile.linkedin_url or '',
-            app.status,
-            app.applied_at.strftime('%Y-%m-%d %H:%M:%S')
-        ])
+    exports = ExportJob.objects.select_related('requested_by')[:20]
+    return render(request, 'career/bulk_export.html', {'form': form, 'exports': exports})
+
+
+@admin_required
+def export_status(request, export_id):
+    """Progress of a multi-job export as JSON"""
+    export = get_object_or_404(ExportJob, id=export_id)
+    return JsonResponse({
+        'status': export.status,
+        'total_jobs': export.total_jobs,
+        'processed_jobs': export.processed_jobs,
+        'rows_written': export.rows_written,
+        'progress_percent': export.progress_percent,
+    })
+
+
+@admin_required
+def export_download(request, export_id):
+    """Download a finished multi-job export"""
+    export = get_object_or_404(ExportJob, id=export_id)
+    if export.status != 'done' or not export.file:
+        raise Http404('Export is not ready')
+    return FileResponse(export.file.open('rb'), as_attachment=True, filename=export.file.name.rsplit('/', 1)[-1])
+
+
+@admin_required
+def season_report(request):
+    """Placement-season report, read only from the season summary tables"""
+    seasons = list(
+        SeasonBranchSummary.objects.order_by('-season').values_list('season', flat=True).distinct()
+    )
+    try:
+        season = int(request.GET.get('season', ''))
+    except ValueError:
+        season = seasons[0] if seasons else None
+    
+    branches = list(SeasonBranchSummary.objects.filter(season=season))
+    totals = {
+        'students': sum(row.students for row in branches),
+        'placed': sum(row.placed for row in branches),
+        'offers': sum(row.offers for row in branches),
+    }
+    totals['unplaced'] = totals['students'] - totals['placed']
     
-    return response
+    context = {
+        'season': season,
+        'season_label': season_label(season) if season else '',
+        'seasons': [(value, season_label(value)) for value in seasons],
+        'branches': branches,
+        'companies': SeasonCompanySummary.objects.filter(season=season),
+        'totals': totals,
+    }
+    return render(request, 'career/season_report.html', context)
+
+
+@admin_required
+def start_ats_batch(request, job_id):
+    """Queue a bulk ATS scan of every applicant to a job"""
+    job = get_object_or_404(JobPost, id=job_id)
+    
+    if request.method == 'POST':
+        queue_batch(job, requested_by=request.user)
+        messages.success(request, 'ATS scan queued for all applicants. Scores will appear as they are computed.')
+    
+    return redirect('job_applicants', job_id=job.id)
+
+
+@admin_required
+def ats_batch_status(request, batch_id):
+    """Progress of a bulk ATS scan as JSON"""
+    batch = get_object_or_404(ATSScanBatch, id=batch_id)
+    return JsonResponse({
+        'status': batch.status,
+        'total': batch.total,
+        'processed': batch.processed,
+        'skipped': batch.skipped,
+        'failed': batch.failed,
+        'progress_percent': batch.progress_percent,
+    })
 
 
 @admin_required
@@ -219,34 +324,75 @@ def student_dashboard(request):
         messages.warning(request, 'Please complete your profile first.')
         return redirect('edit_profile')
     
-    # Get active jobs
-    active_jobs = JobPost.objects.filter(is_active=True, deadline__gte=timezone.now())
-    
-    # Get student's applications
-    applied_job_ids = Application.objects.filter(student=request.user).values_list('job_id', flat=True)
-    
-    # Categorize jobs
-    jobs_with_eligibility = []
-    for job in active_jobs:
-        is_eligible = job.is_student_eligible(profile)
-        has_applied = job.id in applied_job_ids
-        jobs_with_eligibility.append({
-            'job': job,
-            'is_eligible': is_eligible,
-            'has_applied': has_applied,
-        })
+    # Get active jobs with eligibility and application state resolved in SQL
+    jobs = JobPost.objects.open().eligible_for(profile)
     
     # Get student's applications
     my_applications = Application.objects.filter(student=request.user).select_related('job')
     
     context = {
         'profile': profile,
-        'jobs_with_eligibility': jobs_with_eligibility,
+        # Cards are rendered once per job version and eligibility outcome
+        'job_cards': page_cache.job_cards(jobs),
         'my_applications': my_applications,
     }
     return render(request, 'career/student_dashboard.html', context)
 
 
+@student_required
+def job_search(request):
+    """Search open jobs with filters, facet counts and keyset pagination"""
+    try:
+        profile = request.user.profile
+    except StudentProfile.DoesNotExist:
+        messages.warning(request, 'Please complete your profile first.')
+        return redirect('edit_profile')
+    
+    form = JobSearchForm(request.GET or None)
+    filters = form.cleaned_data if form.is_valid() else {}
+    sort = filters.get('sort') or 'deadline'
+    
+    jobs = filter_jobs(JobPost.objects.open(), filters, profile)
+    facets = job_facets(jobs, profile)
+    results, next_cursor = keyset_page(
+        jobs.eligible_for(profile), sort, filters.get('cursor'), settings.JOB_SEARCH_PAGE_SIZE
+    )
+    
+    next_query = None
+    if next_cursor:
+        params = request.GET.copy()
+        params['cursor'] = next_cursor
+        next_query = params.urlencode()
+    
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'results': [
+                {
+                    'id': job.id,
+                    'company_name': job.company_name,
+                    'role': job.role,
+                    'package_lpa': job.package_lpa,
+                    'deadline': job.deadline.isoformat(),
+                    'is_eligible': job.is_eligible,
+                    'has_applied': job.has_applied,
+                }
+                for job in results
+            ],
+            'facets': facets,
+            'next_cursor': next_cursor,
+            'errors': form.errors if form.is_bound else {},
+        })
+    
+    context = {
+        'form': form,
+        'profile': profile,
+        'jobs': results,
+        'facets': facets,
+        'next_query': next_query,
+    }
+    return render(request, 'career/job_search.html', context)
+
+
 @student_required
 def edit_profile(request):
     """Edit student profile"""
@@ -272,22 +418,23 @@ def edit_profile(request):
 @student_required
 def apply_job(request, job_id):
     """Apply for a job"""
-    job = get_object_or_404(JobPost, id=job_id)
+    try:
+        profile = request.user.profile
+    except StudentProfile.DoesNotExist:
+        messages.error(request, 'Please complete your profile first.')
+        return redirect('edit_profile')
+    
+    job = get_object_or_404(JobPost.objects.eligible_for(profile), id=job_id)
     
     # Check if already applied
-    if Application.objects.filter(student=request.user, job=job).exists():
+    if job.has_applied:
         messages.warning(request, 'You have already applied for this job.')
         return redirect('student_dashboard')
     
     # Check eligibility
-    try:
-        profile = request.user.profile
-        if not job.is_student_eligible(profile):
-            messages.error(request, 'You are not eligible for this job.')
-            return redirect('student_dashboard')
-    except StudentProfile.DoesNotExist:
-        messages.error(request, 'Please complete your profile first.')
-        return redirect('edit_profile')
+    if not job.is_eligible:
+        messages.error(request, 'You are not eligible for this job.')
+        return redirect('student_dashboard')
     
     # Create application
     Application.objects.create(student=request.user, job=job)
@@ -295,98 +442,113 @@ def apply_job(request, job_id):
     return redirect('student_dashboard')
 
 
+def _ats_scan_input(request):
+    """Validate an ATS scan POST
+
+    Returns (form, job, resume_text, upload). job is None when there is
+    nothing to scan; upload is set when the file still needs parsing.
+    """
+    form = ResumeUploadForm(request.POST, request.FILES)
+    job_id = request.POST.get('job_id')
+    if not (form.is_valid() and job_id):
+        return form, None, None, None
+    
+    job = get_object_or_404(JobPost, id=job_id)
+    resume_file = form.cleaned_data['resume']
+    profile = getattr(request.user, 'profile', None)
+    
+    # Reuse the stored text when the upload matches the profile resume
+    if resume_file:
+        if profile is not None and file_sha256(resume_file) == profile.resume_sha256:
+            return form, job, profile.resume_text, None
+        return form, job, None, resume_file
+    if profile is not None and profile.resume:
+        return form, job, cached_resume_text(profile), None
+    
+    messages.error(request, 'Please upload a resume or add one to your profile.')
+    return form, None, None, None
+
+
 @student_required
-def ats_scanner(request):
-    """ATS Resume Scanner view"""
+async def ats_scanner(request):
+    """ATS Resume Scanner view
+    
+    Async so the LLM round-trip does not hold a worker under ASGI; database
+    and template work run in a thread and PDF parsing in its own process.
+    """
     jobs = JobPost.objects.filter(is_active=True)
+    form = ResumeUploadForm()
     
     if request.method == 'POST':
-        job_id = request.POST.get('job_id')
-        form = ResumeUploadForm(request.POST, request.FILES)
+        form, job, resume_text, upload = await sync_to_async(_ats_scan_input)(request)
         
-        if form.is_valid() and job_id:
-            job = get_object_or_404(JobPost, id=job_id)
-            resume_file = form.cleaned_data['resume']
-            
-            # Extract text from PDF
+        if job is not None:
             try:
-                pdf_reader = PdfReader(io.BytesIO(resume_file.read()))
-                resume_text = ""
-                for page in pdf_reader.pages:
-                    resume_text += page.extract_text()
+                if upload is not None:
+                    resume_text = (await aparse_resume(upload)).text
                 
-                # Call Gemini API
-                if settings.GEMINI_API_KEY:
-                    genai.configure(api_key=settings.GEMINI_API_KEY)
-                    model = genai.GenerativeModel('models/gemini-2.5-flash')
-                    
-                    prompt = f"""
-                    Compare this resume against the job description and provide:
-                    1. A match score from 0-100
-                    2. List exactly 3 missing keywords that would improve the match
-                    
-                    Job Description:
-                    {job.job_description}
-                    
-                    Resume Text:
-                    {resume_text[:4000]}  # Limit text to avoid token limits
-                    
-                    Format your response as:
-                    Score: [number]
-                    Missing Keywords: [keyword1], [keyword2], [keyword3]
-                    """
-                    
-                    response = model.generate_content(prompt)
-                    result_text = response.text
+                # Call the LLM (repeat scans are served from the result cache)
+                if get_backend().is_configured():
+                    result_text, from_cache = await ascan_resume(resume_text, job.job_description)
                     
                     context = {
                         'jobs': jobs,
                         'selected_job': job,
                         'result': result_text,
+                        'from_cache': from_cache,
                         'resume_text': resume_text[:500],  # Show preview
                     }
-                    return render(request, 'career/ats_scanner.html', context)
+                    return await sync_to_async(render)(request, 'career/ats_scanner.html', context)
                 else:
                     messages.error(request, 'Gemini API key not configured.')
             
+            except ResumeParseError as e:
+                messages.error(request, e.message)
+            except LLMUnavailable as e:
+                messages.error(request, str(e))
             except Exception as e:
                 messages.error(request, f'Error processing resume: {str(e)}')
-    else:
-        form = ResumeUploadForm()
     
     context = {
         'form': form,
         'jobs': jobs,
     }
-    return render(request, 'career/ats_scanner.html', context)
+    return await sync_to_async(render)(request, 'career/ats_scanner.html', context)
 
 
 @login_required
 def job_detail(request, job_id):
     """View job details"""
-    job = get_object_or_404(JobPost, id=job_id)
-    updates = job.updates.all()
-    
-    is_eligible = False
-    has_applied = False
+    jobs = JobPost.objects.all()
     update_form = None
     
     if request.user.role == 'student':
         try:
-            profile = request.user.profile
-            is_eligible = job.is_student_eligible(profile)
-            has_applied = Application.objects.filter(student=request.user, job=job).exists()
+            jobs = jobs.eligible_for(request.user.profile)
         except StudentProfile.DoesNotExist:
             pass
     elif request.user.role == 'admin':
         update_form = JobUpdateForm()
     
+    job = get_object_or_404(jobs, id=job_id)
+    # Only annotated when the student has a profile
+    is_eligible = getattr(job, 'is_eligible', False)
+    
+    def render_body():
+        return render_to_string('career/job_detail_body.html', {
+            'job': job,
+            'updates': job.updates.all(),
+            'is_eligible': is_eligible,
+            'student': request.user.role == 'student',
+            'update_form': update_form,
+        }, request=request)
+    
     context = {
         'job': job,
-        'updates': updates,
+        # Students share the body per job version and eligibility; the admin one carries a form
+        'job_body': page_cache.job_detail_body(job, render_body) if update_form is None else render_body(),
         'is_eligible': is_eligible,
-        'has_applied': has_applied,
-        'update_form': update_form,
+        'has_applied': getattr(job, 'has_applied', False),
     }
     return render(request, 'career/job_detail.html', context)
 
@@ -403,35 +565,28 @@ def add_job_update(request, job_id):
             update.job = job
             update.save()
             
-            # Send email to all applicants
-            applicants = Application.objects.filter(job=job).select_related('student')
-            recipient_list = []
-            for app in applicants:
-                if app.student.email:
-                    # Check preferences
-                    if hasattr(app.student, 'preferences') and not app.student.preferences.receive_emails:
-                        continue
-                    recipient_list.append(app.student.email)
+            # Queue one email per opted-in applicant
+            recipient_list = opted_in(
+                CustomUser.objects.filter(applications__job=job)
+            ).values_list('email', flat=True)
             
-            if recipient_list:
-                subject = f"Update: {job.role} at {job.company_name}"
-                message = f"""
-                Dear Candidate,
-                
-                There is a new update regarding the job opening for {job.role} at {job.company_name}.
-                
-                Update:
-                {update.message}
-                
-                Visit the portal for more details.
-                
-                Best regards,
-                UniCareer Team
-                """
-                # Send mass mail or loop (using loop for simplicity/console backend)
-                send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, recipient_list, fail_silently=True)
+            subject = f"Update: {job.role} at {job.company_name}"
+            message = f"""
+            Dear Candidate,
+            
+            There is a new update regarding the job opening for {job.role} at {job.company_name}.
             
-            messages.success(request, 'Update posted and emails sent to applicants!')
+            Update:
+            {update.message}
+            
+            Visit the portal for more details.
+            
+            Best regards,
+            UniCareer Team
+            """
+            queued = queue_mass_email(subject, message, recipient_list)
+            
+            messages.success(request, f'Update posted and {queued} email(s) queued for applicants!')
             return redirect('job_detail', job_id=job.id)
             
     return redirect('job_detail', job_id=job.id)
@@ -439,17 +594,23 @@ def add_job_update(request, job_id):
 
 @login_required
 def company_wiki_list(request):
-    """View all company wiki entries"""
-    wikis = CompanyWiki.objects.all()
-    
-    # Filter by company name if provided
-    company_filter = request.GET.get('company', '')
-    if company_filter:
-        wikis = wikis.filter(company_name__icontains=company_filter)
+    """View company wiki entries, or ranked full-text search results"""
+    # 'company' is the old name-only filter parameter
+    query = request.GET.get('q', request.GET.get('company', '')).strip()
+    page_number = request.GET.get('page', '')
+    page_number = page_number if page_number.isdigit() else '1'
+    
+    def render_list():
+        wikis = WikiSearchResults(query) if query else CompanyWiki.objects.all()
+        page = Paginator(wikis, settings.WIKI_PAGE_SIZE).get_page(page_number)
+        if not page.object_list:
+            return ''
+        return render_to_string('career/wiki_cards.html', {'wikis': page.object_list, 'page': page, 'query': query})
     
     context = {
-        'wikis': wikis,
-        'company_filter': company_filter,
+        # Browse pages are cached until an entry changes; search results are not
+        'wiki_list': render_list() if query else page_cache.wiki_list(page_number, render_list),
+        'query': query,
     }
     return render(request, 'career/company_wiki_list.html', context)
 
@@ -478,81 +639,81 @@ def create_company_wiki(request):
 
 @login_required
 def chatbot(request):
-    """AI Chatbot view"""
+    """AI Chatbot page; replies are streamed by chatbot_stream"""
+    return render(request, 'career/chatbot.html', {'history': session_history(request)})
+
+
+@login_required
+def chatbot_reset(request):
+    """Start a new chatbot conversation"""
     if request.method == 'POST':
-        try:
-            data = json.loads(request.body)
-            user_message = data.get('message', '')
-            
-            if not settings.GEMINI_API_KEY:
-                return JsonResponse({'error': 'Gemini API key not configured'}, status=500)
-            
-            genai.configure(api_key=settings.GEMINI_API_KEY)
-            model = genai.GenerativeModel('models/gemini-2.5-flash')
-            
-            # Fetch student profile context
-            student_context = ""
-            if request.user.role == 'student':
-                try:
-                    profile = request.user.profile
-                    
-                    # Extract resume text if available
-                    resume_text = "Not available"
-                    if profile.resume:
-                        try:
-                            pdf_reader = PdfReader(profile.resume.path)
-                            text = ""
-                            for page in pdf_reader.pages:
-                                text += page.extract_text()
-                            resume_text = text[:2000] + "..." if len(text) > 2000 else text
-                        except Exception:
-                            resume_text = "Error reading resume file"
-
-                    student_context = f"""
-                    Student Profile Context:
-                    - Name: {request.user.username}
-                    - Branch: {profile.get_branch_display()}
-                    - CGPA: {profile.current_cgpa}
-                    - Backlogs: {profile.backlogs}
-                    - Skills: {profile.skills}
-                    - Resume Content: {resume_text}
-                    """
-                except StudentProfile.DoesNotExist:
-                    student_context = f"Student Name: {request.user.username} (Profile incomplete)"
-
-            # Create a chat session (stateless for now, but could be improved)
-            chat = model.start_chat(history=[])
-            
-            # Add system context
-            system_prompt = f"""
-            You are UniCareer AI, an expert career mentor and placement assistant dedicated to helping university students succeed in their career journey on the UniCareer portal.
-
-            {student_context}
-
-            Your Core Responsibilities:
-            1. **Personalized Guidance**: Use the student's profile (Branch, CGPA, Skills) to give specific advice. 
-               - If CGPA is low (< 7.0), suggest ways to compensate with projects/skills.
-               - If they have backlogs, advise on clearing them before placement season.
-               - Suggest roles relevant to their branch ({profile.branch if request.user.role == 'student' and hasattr(request.user, 'profile') else 'their field'}).
-            2. **Resume & Profile Optimization**: Provide actionable advice to make resumes ATS-friendly. Suggest strong action verbs and keywords for specific roles.
-            3. **Internship & Job Strategy**: Guide students on how to prepare for internships and placements.
-            4. **Interview Preparation**: Offer tips for Technical, HR, and Managerial rounds. Explain the STAR method for behavioral questions.
-            5. **Portal Navigation**: Encourage them to use UniCareer features like the 'ATS Scanner' for resume checks and 'Company Wiki' for past interview experiences.
-
-            **Tone & Style:**
-            - Professional, motivating, and student-friendly.
-            - Address the student by name if possible.
-            - Use clear formatting (bullet points, bold text) for readability.
-            """
-            
-            response = chat.send_message(system_prompt + "\n\nUser: " + user_message)
-            
-            return JsonResponse({'response': response.text})
-            
-        except Exception as e:
-            return JsonResponse({'error': str(e)}, status=500)
-            
-    return render(request, 'career/chatbot.html')
+        end_session(request)
+    return redirect('chatbot')
+
+
+def sse_event(data, event=None):
+    """Format one server-sent event"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+def chat_events(backend, chat, prompt, user_message):
+    """Reply events for the WSGI path, from the blocking stream"""
+    # Headers are already sent once streaming starts, so errors become an event
+    chunks = []
+    try:
+        for chunk in backend.stream(prompt, CHAT_MODEL):
+            chunks.append(chunk)
+            yield sse_event({'delta': chunk})
+        record_turn(chat, user_message, "".join(chunks))
+    except Exception as e:
+        yield sse_event({'error': str(e)}, event='error')
+        return
+    yield sse_event({}, event='done')
+
+
+async def achat_events(backend, chat, prompt, user_message):
+    """chat_events() for ASGI: awaits each chunk instead of holding a thread"""
+    chunks = []
+    try:
+        async for chunk in backend.astream(prompt, CHAT_MODEL):
+            chunks.append(chunk)
+            yield sse_event({'delta': chunk})
+        await sync_to_async(record_turn)(chat, user_message, "".join(chunks))
+    except Exception as e:
+        yield sse_event({'error': str(e)}, event='error')
+        return
+    yield sse_event({}, event='done')
+
+
+@async_login_required
+async def chatbot_stream(request):
+    """AI Chatbot reply streamed as server-sent events"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST required'}, status=405)
+    
+    try:
+        user_message = json.loads(request.body).get('message', '')
+    except ValueError:
+        return JsonResponse({'error': 'Invalid request body'}, status=400)
+    
+    backend = get_backend()
+    if not backend.is_configured():
+        return JsonResponse({'error': 'Gemini API key not configured'}, status=500)
+    if not backend.available():
+        return JsonResponse({'error': 'The AI service is temporarily unavailable. Please try again shortly.'}, status=503)
+    
+    chat, prompt = await sync_to_async(prepare_turn)(request, user_message)
+    
+    # Under WSGI Django buffers async iterators whole, so keep the blocking stream there
+    if isinstance(request, ASGIRequest):
+        events = achat_events(backend, chat, prompt, user_message)
+    else:
+        events = chat_events(backend, chat, prompt, user_message)
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Stop nginx buffering the stream
+    return response
 
 
 @login_required
@@ -565,7 +726,10 @@ def preferences_view(request):
     if request.method == 'POST':
         form = UserPreferenceForm(request.POST, instance=request.user.preferences)
         if form.is_valid():
-            form.save()
+            # Write only what changed; the theme in the session follows the form
+            if form.has_changed():
+                form.save()
+            request.session[THEME_SESSION_KEY] = form.instance.theme
             messages.success(request, 'Preferences updated successfully.')
             return redirect('preferences')
     else:
@@ -69,6 +69,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'career.context_processors.theme',
             ],
         },
     },
@@ -96,6 +97,39 @@ if 'postgresql' in DATABASES['default']['ENGINE']:
     DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
 
 
+# Caches
+# CACHE_URL picks the default cache: locmem:// (per process), file:///path/to/dir (shared by the
+# processes on one host) or redis://host:6379/0 (Redis or a compatible server; needs the redis package).
+# Run more than one worker process on a shared cache, or signal invalidation only reaches one of them.
+CACHE_URL = os.getenv('CACHE_URL', 'locmem://')
+# Worker processes per server (uvicorn and gunicorn take their default worker count from it);
+# the career.E001 check fails when it is above 1 and page caching runs on locmem://
+WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', '1'))
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+    'rediss': 'django.core.cache.backends.redis.RedisCache',
+}
+_cache_scheme, _cache_location = CACHE_URL.split('://', 1)
+# LocMemCache evicts least-recently-used entries once MAX_ENTRIES is reached
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[_cache_scheme],
+        'LOCATION': CACHE_URL if _cache_scheme.startswith('redis') else _cache_location,
+        'KEY_PREFIX': 'unicareer',
+    },
+    'ats': {
+        'BACKEND': os.getenv('ATS_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('ATS_CACHE_LOCATION', 'ats-results'),
+        'TIMEOUT': int(os.getenv('ATS_CACHE_TTL', str(7 * 24 * 3600))),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('ATS_CACHE_MAX_ENTRIES', '5000')),
+        },
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -155,6 +189,70 @@ LOGOUT_REDIRECT_URL = 'login'
 # Google Gemini API Key
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
 
+# LLM backend: 'gemini' for the real API, 'stub' for deterministic offline replies,
+# 'fake' for scripted replies in tests
+LLM_BACKEND = os.getenv('LLM_BACKEND', 'gemini')
+# Simulated latency for the stub backend, in seconds
+LLM_STUB_FIRST_TOKEN_DELAY = float(os.getenv('LLM_STUB_FIRST_TOKEN_DELAY', '0'))
+LLM_STUB_TOKEN_DELAY = float(os.getenv('LLM_STUB_TOKEN_DELAY', '0'))
+# Gateway limits: in-flight calls per process and seconds to wait for a free slot
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '8'))
+LLM_QUEUE_TIMEOUT = float(os.getenv('LLM_QUEUE_TIMEOUT', '5'))
+# Per-attempt timeout in seconds, and retries of timeouts/rate limits/5xx with jittered backoff
+LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', '30'))
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', '2'))
+LLM_RETRY_BASE_DELAY = float(os.getenv('LLM_RETRY_BASE_DELAY', '0.5'))
+# Calls in a row failing with a transient error before the circuit opens, and seconds before it tries again
+LLM_BREAKER_THRESHOLD = int(os.getenv('LLM_BREAKER_THRESHOLD', '5'))
+LLM_BREAKER_RESET = float(os.getenv('LLM_BREAKER_RESET', '30'))
+
+# Company wiki entries, job search results and job applicants per page
+WIKI_PAGE_SIZE = int(os.getenv('WIKI_PAGE_SIZE', '12'))
+JOB_SEARCH_PAGE_SIZE = int(os.getenv('JOB_SEARCH_PAGE_SIZE', '20'))
+APPLICANTS_PAGE_SIZE = int(os.getenv('APPLICANTS_PAGE_SIZE', '50'))
+
+# Chatbot messages sent verbatim each turn; older ones are summarised within the char cap
+CHAT_HISTORY_MESSAGES = int(os.getenv('CHAT_HISTORY_MESSAGES', '6'))
+CHAT_SUMMARY_MAX_CHARS = int(os.getenv('CHAT_SUMMARY_MAX_CHARS', '1500'))
+
+# Seconds cached page fragments (job cards, wiki list, admin stats) live; signals retire them sooner. 0 disables them
+PAGE_CACHE_TTL = int(os.getenv('PAGE_CACHE_TTL', '300'))
+
+# Seconds a job's applicant analytics stay cached; application changes drop the entry sooner
+JOB_ANALYTICS_CACHE_TTL = int(os.getenv('JOB_ANALYTICS_CACHE_TTL', '600'))
+
+# Month a placement season starts in (career/seasons.py); 7 makes July-June seasons such as 2025-26
+PLACEMENT_SEASON_START_MONTH = int(os.getenv('PLACEMENT_SEASON_START_MONTH', '7'))
+
+# Rows fetched per query when streaming CSV exports (see career/exports.py)
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '2000'))
+# Seconds a worker holds a running multi-job export without finishing a job before another worker may reclaim it
+EXPORT_LEASE_SECONDS = 600
+
+# Rows inserted per transaction by the import_students and import_jobs commands (see career/imports.py)
+IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', '500'))
+
+# Concurrent LLM calls per bulk ATS batch
+ATS_BATCH_CONCURRENCY = int(os.getenv('ATS_BATCH_CONCURRENCY', '4'))
+# Seconds a worker holds a running batch without progress before another worker may reclaim it
+ATS_BATCH_LEASE_SECONDS = 300
+
+# ATS scan result cache (see career/ats.py)
+ATS_CACHE_ALIAS = 'ats'
+ATS_CACHE_TTL = CACHES['ats']['TIMEOUT']
+
+# Resume parsing limits (each PDF is parsed in its own process, at most RESUME_PARSE_WORKERS at once; 0 parses inline)
+RESUME_PARSE_WORKERS = int(os.getenv('RESUME_PARSE_WORKERS', '2'))
+RESUME_PARSE_TIMEOUT = float(os.getenv('RESUME_PARSE_TIMEOUT', '10'))
+RESUME_MAX_BYTES = 5 * 1024 * 1024
+RESUME_MAX_PAGES = 10
+RESUME_TEXT_MAX_CHARS = 12000  # Text kept for the prompt builder to pick sections from
+
+# Prompt token budgets (estimated locally, see career/prompts.py)
+ATS_RESUME_TOKENS = int(os.getenv('ATS_RESUME_TOKENS', '900'))
+ATS_JOB_TOKENS = int(os.getenv('ATS_JOB_TOKENS', '400'))
+CHAT_RESUME_TOKENS = int(os.getenv('CHAT_RESUME_TOKENS', '450'))
+
 # Email Configuration (SMTP Backend for Production/Real Emails)
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'
@@ -163,3 +261,28 @@ EMAIL_USE_TLS = True
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = 'UniCareer <unicareer.portal@gmail.com>'
+
+# Email outbox (drained by `python manage.py send_queued_emails`)
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', '50'))
+EMAIL_RATE_PER_MINUTE = int(os.getenv('EMAIL_RATE_PER_MINUTE', '300'))  # 0 disables throttling
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', '5'))
+EMAIL_OUTBOX_BACKOFF_SECONDS = 60
+EMAIL_OUTBOX_MAX_BACKOFF_SECONDS = 3600
+EMAIL_OUTBOX_LEASE_SECONDS = 300
+
+# Logging
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'career': {
+            'handlers': ['console'],
+            'level': os.getenv('CAREER_LOG_LEVEL', 'INFO'),
+        },
+    },
+}